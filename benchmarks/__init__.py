@@ -0,0 +1,3 @@
+"""Benchmarks for the plugin's hot paths."""
+
+from __future__ import annotations
@@ -0,0 +1,17 @@
+"""Timing helpers shared by the benchmarks."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+def measure(repeat: int, func: Callable[[], Any]) -> list[float]:
+    """Call *func* *repeat* times and return the duration of every call in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
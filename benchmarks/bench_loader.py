@@ -0,0 +1,67 @@
+"""Compare spec parse times of the available loader backends.
+
+Run with ``python -m benchmarks.bench_loader``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from benchmarks._timing import measure
+from benchmarks.specgen import generate_spec, write_spec
+from swagger_plugin_for_sphinx._spec_loader import json_backend_names, parse_spec
+
+
+def _best_of(repeat: int, func: Callable[[], Any]) -> float:
+    return min(measure(repeat, func))
+
+
+def _legacy_load(raw: bytes) -> Any:
+    """The loader before format detection: JSON first, then pure Python YAML."""
+    text = raw.decode("utf-8")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return yaml.safe_load(text)
+
+
+def _candidates(raw: bytes, path: Path) -> dict[str, Callable[[], Any]]:
+    candidates: dict[str, Callable[[], Any]] = {"legacy": lambda: _legacy_load(raw)}
+    if path.suffix == ".json":
+        for backend in json_backend_names():
+            candidates[backend] = partial(parse_spec, raw, path, json_backend=backend)
+        return candidates
+    candidates["yaml.SafeLoader"] = partial(yaml.load, raw, Loader=yaml.SafeLoader)
+    if yaml.__with_libyaml__:
+        candidates["yaml.CSafeLoader"] = partial(parse_spec, raw, path)
+    return candidates
+
+
+def main() -> None:
+    """Print parse times per backend for a large YAML and JSON spec."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--schemas", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spec = generate_spec(paths=args.paths, schemas=args.schemas)
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".yaml", ".json"):
+            path = write_spec(spec, Path(tmp) / f"spec{suffix}")
+            raw = path.read_bytes()
+            print(f"{path.name} ({len(raw) / 1024 / 1024:.1f} MiB)")
+            for name, func in _candidates(raw, path).items():
+                print(f"  {name:<20} {_best_of(args.repeat, func):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
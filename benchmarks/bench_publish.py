@@ -0,0 +1,88 @@
+"""Compare published spec sizes and client parse cost of YAML and minified JSON.
+
+Run with ``python -m benchmarks.bench_publish``. The client parse cost is
+measured with Node.js (``JSON.parse`` and, if it can be required, ``js-yaml``
+as used by Swagger UI) when ``node`` is on the ``PATH``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from benchmarks.specgen import generate_spec, write_spec
+from swagger_plugin_for_sphinx._publish import publish_spec
+
+_NODE_SCRIPT = """
+const fs = require("fs");
+const [file, kind, repeat] = process.argv.slice(1);
+const text = fs.readFileSync(file, "utf8");
+let parse;
+if (kind === "json") {
+  parse = JSON.parse;
+} else {
+  try {
+    parse = require("js-yaml").load;
+  } catch (e) {
+    console.log("null");
+    process.exit(0);
+  }
+}
+let best = Infinity;
+for (let i = 0; i < Number(repeat); i++) {
+  const start = process.hrtime.bigint();
+  parse(text);
+  best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e9);
+}
+console.log(best);
+"""
+
+
+def _client_parse_seconds(path: Path, kind: str, repeat: int) -> float | None:
+    node = shutil.which("node")
+    if not node:
+        return None
+    result = subprocess.run(
+        [node, "-e", _NODE_SCRIPT, str(path), kind, str(repeat)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    value = json.loads(result.stdout)
+    return float(value) if value is not None else None
+
+
+def _describe(path: Path, kind: str, repeat: int) -> str:
+    data = path.read_bytes()
+    gzipped = len(gzip.compress(data))
+    seconds = _client_parse_seconds(path, kind, repeat)
+    parse = f"{seconds * 1000:8.1f} ms" if seconds is not None else "     n/a"
+    return f"{len(data) / 1024:10.0f} KiB {gzipped / 1024:10.0f} KiB {parse}"
+
+
+def main() -> None:
+    """Print sizes and client parse times of a spec published as YAML and as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--schemas", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_spec(
+            generate_spec(paths=args.paths, schemas=args.schemas),
+            Path(tmp) / "spec.yaml",
+        )
+        published = publish_spec(source, Path(tmp) / "out" / "spec.yaml", "json")
+        print(f"{'':<16} {'size':>14} {'gzipped':>14} {'client parse':>12}")
+        print(f"{'YAML (source)':<16} {_describe(source, 'yaml', args.repeat)}")
+        print(f"{'minified JSON':<16} {_describe(published, 'json', args.repeat)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the doctree size and build time of a page embedding a large spec.
+
+Run with ``python -m benchmarks.bench_search_index``. Extra arguments of the
+form ``name=value`` are added to ``conf.py``, e.g. ``swagger_search_max_operations=1000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sphinx.application import Sphinx
+
+from benchmarks.specgen import generate_spec, write_spec
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+
+
+def _build(docs: Path, build: Path) -> float:
+    app = Sphinx(
+        docs,
+        docs,
+        build,
+        build / ".doctrees",
+        "html",
+        status=None,
+        warning=None,
+        freshenv=True,
+    )
+    start = time.perf_counter()
+    app.build(force_all=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print the doctree size, search index size and build times for a large spec."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=2500)
+    parser.add_argument("--schemas", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("conf", nargs="*", default=[])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = Path(tmp) / "docs"
+        docs.mkdir()
+        build = Path(tmp) / "build"
+        write_spec(
+            generate_spec(paths=args.paths, schemas=args.schemas),
+            docs / "openapi.json",
+        )
+        (docs / "conf.py").write_text(
+            "\n".join(["extensions = ['swagger_plugin_for_sphinx']", *args.conf]),
+            encoding="utf-8",
+        )
+        (docs / "index.rst").write_text(
+            "API\n===\n\n.. swagger-plugin:: openapi.json\n", encoding="utf-8"
+        )
+
+        timings = []
+        for _ in range(args.repeat):
+            # Measure the plugin, not the spec cache of earlier rounds.
+            spec_cache.clear()
+            timings.append(_build(docs, build))
+        doctree = build / ".doctrees" / "index.doctree"
+        searchindex = build / "searchindex.js"
+        print(f"operations:     {args.paths * 2}, schemas: {args.schemas}")
+        print(f"doctree:        {doctree.stat().st_size / 1024:10.0f} KiB")
+        print(f"searchindex.js: {searchindex.stat().st_size / 1024:10.0f} KiB")
+        print(f"build (best):   {min(timings) * 1000:10.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Time the plugin's hot paths on synthetic specs and record the results as JSON.
+
+Run with ``python -m benchmarks.run --output results.json``. Passing an earlier
+result file with ``--compare`` prints the change of every timing, so
+regressions can be compared across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import sphinx
+from sphinx.application import Sphinx
+
+from benchmarks._timing import measure
+from benchmarks.specgen import VERSIONS, generate_spec, write_spec
+from swagger_plugin_for_sphinx._openapi_index import (
+    load_openapi_file,
+    openapi_lines_for_search,
+)
+from swagger_plugin_for_sphinx._plugin import SwaggerPluginDirective
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+from swagger_plugin_for_sphinx._templates import get_template
+
+_FORMATS = ("yaml", "json")
+
+
+def _result(name: str, timings: list[float], **labels: Any) -> dict[str, Any]:
+    return {"name": name, **labels, "seconds": min(timings), "runs": timings}
+
+
+def _write_project(root: Path, spec: Path, pages: int) -> Path:
+    docs = root / "docs"
+    docs.mkdir()
+    (docs / spec.name).write_bytes(spec.read_bytes())
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']\n", encoding="utf-8"
+    )
+    toctree = "\n".join(f"   page{index}" for index in range(pages))
+    (docs / "index.rst").write_text(
+        f"Project\n=======\n\n.. toctree::\n\n{toctree}\n", encoding="utf-8"
+    )
+    for index in range(pages):
+        (docs / f"page{index}.rst").write_text(
+            f"Page {index}\n=======\n\n.. swagger-plugin:: {spec.name}\n   :id: api{index}\n",
+            encoding="utf-8",
+        )
+    return docs
+
+
+@contextmanager
+def _timed_directive(cold: list[float], warm: list[float]) -> Iterator[None]:
+    """Record the duration of the first and of later directive runs."""
+    original = SwaggerPluginDirective.run
+    first = True
+
+    @functools.wraps(original)
+    def run(self: SwaggerPluginDirective) -> Any:
+        """Run the directive and record its duration."""
+        nonlocal first
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            (cold if first else warm).append(time.perf_counter() - start)
+            first = False
+
+    SwaggerPluginDirective.run = run  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        SwaggerPluginDirective.run = original  # type: ignore[method-assign]
+
+
+def _bench_in_process(
+    docs: Path, out: Path, repeat: int, labels: dict[str, Any]
+) -> list[dict[str, Any]]:
+    cold: list[float] = []
+    warm: list[float] = []
+    app: Sphinx | None = None
+    for round_ in range(repeat):
+        # Every round parses the spec again, as a fresh build process would.
+        spec_cache.clear()
+        app = Sphinx(
+            docs,
+            docs,
+            out / f"html{round_}",
+            out / f"doctrees{round_}",
+            "html",
+            status=None,
+            warning=None,
+        )
+        with _timed_directive(cold, warm):
+            app.build()
+    assert app is not None
+    template = get_template(app, "loader_template.j2")
+    defaults = app.config.swagger_default_options
+    results = [
+        # The first directive of a build parses the spec, later ones hit the cache.
+        _result("directive_run_cold", cold, **labels),
+        _result(
+            "template_render",
+            measure(repeat * 10, lambda: template.render(defaults=defaults)),
+            **labels,
+        ),
+    ]
+    if warm:
+        results.append(_result("directive_run_warm", warm, **labels))
+    return results
+
+
+def _bench_sphinx_build(
+    docs: Path, out: Path, jobs: int, repeat: int, labels: dict[str, Any]
+) -> dict[str, Any]:
+    timings = []
+    for round_ in range(repeat):
+        command = [
+            sys.executable,
+            "-m",
+            "sphinx",
+            "-b",
+            "html",
+            "-q",
+            "-E",
+            "-j",
+            str(jobs),
+            "-d",
+            str(out / f"doctrees-j{jobs}-{round_}"),
+            str(docs),
+            str(out / f"html-j{jobs}-{round_}"),
+        ]
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        timings.append(time.perf_counter() - start)
+    return _result("sphinx_build", timings, jobs=jobs, **labels)
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _key(result: dict[str, Any]) -> tuple[Any, ...]:
+    return tuple(result.get(label) for label in ("name", "version", "format", "jobs"))
+
+
+def _label(result: dict[str, Any]) -> str:
+    labels = [str(value) for value in _key(result) if value is not None]
+    return " ".join(labels)
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    with baseline_path.open(encoding="utf-8") as handle:
+        baseline = {_key(result): result for result in json.load(handle)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(_key(result))
+        if before is None:
+            continue
+        change = (result["seconds"] - before["seconds"]) / before["seconds"] * 100
+        print(
+            f"  {_label(result):<40} {before['seconds'] * 1000:10.3f} ms -> "
+            f"{result['seconds'] * 1000:10.3f} ms {change:+7.1f}%"
+        )
+
+
+def main() -> None:
+    """Run all benchmarks and print and optionally store the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=500)
+    parser.add_argument("--operations-per-path", type=int, default=2)
+    parser.add_argument("--schemas", type=int, default=300)
+    parser.add_argument("--description-length", type=int, default=200)
+    parser.add_argument("--versions", nargs="+", choices=VERSIONS, default=VERSIONS)
+    parser.add_argument("--formats", nargs="+", choices=_FORMATS, default=_FORMATS)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-build", action="store_true", help="skip sphinx-build runs"
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for version in args.versions:
+            spec = generate_spec(
+                paths=args.paths,
+                schemas=args.schemas,
+                description_length=args.description_length,
+                operations_per_path=args.operations_per_path,
+                version=version,
+            )
+            for spec_format in args.formats:
+                labels = {"version": version, "format": spec_format}
+                root = Path(tmp) / f"{version}-{spec_format}"
+                root.mkdir()
+                path = write_spec(spec, root / f"openapi.{spec_format}")
+                parsed = load_openapi_file(path)
+                results.append(
+                    _result(
+                        "load_openapi_file",
+                        measure(
+                            args.repeat, functools.partial(load_openapi_file, path)
+                        ),
+                        **labels,
+                    )
+                )
+                results.append(
+                    _result(
+                        "openapi_lines_for_search",
+                        measure(
+                            args.repeat,
+                            functools.partial(openapi_lines_for_search, parsed),
+                        ),
+                        **labels,
+                    )
+                )
+                docs = _write_project(root, path, args.pages)
+                results.extend(
+                    _bench_in_process(docs, root / "out", args.repeat, labels)
+                )
+                if args.no_build:
+                    continue
+                for jobs in dict.fromkeys((1, args.jobs)):
+                    results.append(
+                        _bench_sphinx_build(
+                            docs, root / "out", jobs, args.repeat, labels
+                        )
+                    )
+
+    for result in results:
+        print(f"{_label(result):<40} {result['seconds'] * 1000:10.3f} ms")
+    if args.output:
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "sphinx": sphinx.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "parameters": {
+                    key: value
+                    for key, value in vars(args).items()
+                    if key not in {"output", "compare"}
+                },
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Generate synthetic OpenAPI specifications of configurable size."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+_WORDS = ("pet", "store", "order", "user", "inventory", "tag", "category", "photo")
+
+
+def _text(index: int, length: int) -> str:
+    words = []
+    total = 0
+    position = index
+    while total < length:
+        word = _WORDS[position % len(_WORDS)]
+        words.append(word)
+        total += len(word) + 1
+        position += 3
+    return " ".join(words)[:length]
+
+
+_METHODS = ("get", "put", "post", "delete", "patch")
+VERSIONS = ("2.0", "3.0.3", "3.1.0")
+
+
+def _operation(
+    index: int, method: str, ref: dict[str, str], version: str, description_length: int
+) -> dict[str, Any]:
+    operation: dict[str, Any] = {
+        "operationId": f"{method}Resource{index}",
+        "summary": f"{method.capitalize()} resource {index}",
+        "description": _text(index, description_length),
+        "tags": [_WORDS[index % len(_WORDS)]],
+    }
+    if version == "2.0":
+        operation["produces"] = ["application/json"]
+        operation["responses"] = {"200": {"description": "OK", "schema": ref}}
+        if method in {"put", "post", "patch"}:
+            operation["parameters"] = [
+                {"name": "body", "in": "body", "required": True, "schema": ref}
+            ]
+        return operation
+    operation["responses"] = {
+        "200": {"description": "OK", "content": {"application/json": {"schema": ref}}}
+    }
+    if method in {"put", "post", "patch"}:
+        operation["requestBody"] = {"content": {"application/json": {"schema": ref}}}
+    return operation
+
+
+def generate_spec(
+    paths: int = 100,
+    schemas: int = 50,
+    description_length: int = 200,
+    *,
+    operations_per_path: int = 2,
+    version: str = "3.0.3",
+) -> dict[str, Any]:
+    """Return an OpenAPI document with *paths* paths of *operations_per_path* operations.
+
+    *version* is one of :data:`VERSIONS`; ``2.0`` documents use ``definitions``.
+    """
+    if version not in VERSIONS:
+        raise ValueError(f"Unsupported OpenAPI version: {version}")
+    schema_names = [f"Model{index}" for index in range(max(schemas, 1))]
+    prefix = "#/definitions/" if version == "2.0" else "#/components/schemas/"
+    spec: dict[str, Any] = (
+        {"swagger": version} if version == "2.0" else {"openapi": version}
+    )
+    spec["info"] = {"title": "Synthetic API", "version": "1.0.0"}
+    spec["paths"] = {}
+    models: dict[str, Any] = {}
+    for index in range(paths):
+        ref = {"$ref": prefix + schema_names[index % len(schema_names)]}
+        parameter: dict[str, Any] = {"name": "id", "in": "path", "required": True}
+        if version == "2.0":
+            parameter["type"] = "string"
+        else:
+            parameter["schema"] = {"type": "string"}
+        path_item: dict[str, Any] = {"parameters": [parameter]}
+        for method in _METHODS[: max(min(operations_per_path, len(_METHODS)), 1)]:
+            path_item[method] = _operation(
+                index, method, ref, version, description_length
+            )
+        spec["paths"][f"/resource{index}/{{id}}"] = path_item
+    for index, name in enumerate(schema_names[:schemas]):
+        count: dict[str, Any] = {"type": "integer", "format": "int64"}
+        if version == "3.1.0":
+            count["examples"] = [index]
+        models[name] = {
+            "type": "object",
+            "title": f"Model number {index}",
+            "description": _text(index, description_length),
+            "properties": {
+                "id": {"type": "string"},
+                "name": {"type": "string", "description": _text(index + 1, 40)},
+                "count": count,
+            },
+        }
+    if version == "2.0":
+        spec["definitions"] = models
+    else:
+        spec["components"] = {"schemas": models}
+    return spec
+
+
+def write_spec(spec: dict[str, Any], path: Path) -> Path:
+    """Write *spec* as JSON or YAML, depending on the suffix of *path*."""
+    if path.suffix == ".json":
+        path.write_text(json.dumps(spec, indent=2), encoding="utf-8")
+    else:
+        path.write_text(
+            yaml.dump(spec, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper)),
+            encoding="utf-8",
+        )
+    return path
@@ -3,5 +3,6 @@
 from __future__ import annotations
 
 from swagger_plugin_for_sphinx._plugin import setup
+from swagger_plugin_for_sphinx._spec_loader import register_json_backend
 
-__all__ = ("setup",)
+__all__ = ("register_json_backend", "setup")
@@ -0,0 +1,91 @@
+"""Mirror the Swagger UI assets through a persistent, revalidating download cache."""
+
+from __future__ import annotations
+
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib import error, request
+
+from sphinx.errors import ExtensionError
+from sphinx.util import logging
+from sphinx.util.osutil import ensuredir
+
+from swagger_plugin_for_sphinx._fileutil import read_manifest, write_atomic
+
+logger = logging.getLogger(__name__)
+_TIMEOUT = 30
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory shared by all Sphinx projects."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "swagger-plugin-for-sphinx" / "assets"
+
+
+def fetch_asset(uri: str, cache_dir: Path) -> Path:
+    """Return the cached copy of *uri*, downloading or revalidating it first.
+
+    A cached copy is revalidated with its ``ETag`` and ``Last-Modified``
+    headers. If the server cannot be reached, a cached copy is used as is.
+    """
+    ensuredir(cache_dir)
+    key = hashlib.sha256(uri.encode("utf-8")).hexdigest()
+    body = cache_dir / key
+    meta_path = cache_dir / f"{key}.json"
+    meta = read_manifest(meta_path) if body.is_file() else {}
+
+    headers = {}
+    if etag := meta.get("etag"):
+        headers["If-None-Match"] = str(etag)
+    if last_modified := meta.get("last_modified"):
+        headers["If-Modified-Since"] = str(last_modified)
+
+    try:
+        with request.urlopen(
+            request.Request(uri, headers=headers), timeout=_TIMEOUT
+        ) as response:
+            data = response.read()
+            new_meta = {
+                "uri": uri,
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+    except error.HTTPError as exc:
+        exc.close()
+        if exc.code == 304 and meta:
+            logger.info("Swagger asset is up to date: %s.", uri)
+            return body
+        failure: OSError = exc
+    except OSError as exc:
+        failure = exc
+    else:
+        write_atomic(body, data)
+        write_atomic(meta_path, json.dumps(new_meta).encode("utf-8"))
+        logger.info("Downloaded Swagger asset: %s.", uri)
+        return body
+
+    if body.is_file():
+        logger.warning("Could not revalidate %s, using cached copy: %s", uri, failure)
+        return body
+    raise ExtensionError(f"Could not download {uri}: {failure}") from failure
+
+
+def mirror_assets(uris: Iterable[str], static_dir: Path, cache_dir: Path) -> None:
+    """Fetch *uris* concurrently and copy them to *static_dir* under their file names."""
+    unique = list(dict.fromkeys(uris))
+    with ThreadPoolExecutor(max_workers=max(len(unique), 1)) as pool:
+        cached = list(pool.map(lambda uri: fetch_asset(uri, cache_dir), unique))
+
+    ensuredir(static_dir)
+    for uri, path in zip(unique, cached, strict=True):
+        filename = Path(uri).name
+        target = static_dir / filename
+        if not target.is_file() or not filecmp.cmp(path, target, shallow=False):
+            shutil.copyfile(path, target)
+        logger.info("Adding to _static output path: %s (from %s).", filename, uri)
@@ -0,0 +1,63 @@
+"""Decide once per build which work the active builder can use."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sphinx.application import Sphinx
+from sphinx.builders._epub_base import EpubBuilder
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+_ATTRIBUTE = "swagger_plugin_build_needs"
+
+
+@dataclass(frozen=True, slots=True)
+class BuildNeeds:
+    """The work on specs whose results end up in the output of a builder."""
+
+    # Specs are published to the static output directory and shown by Swagger UI.
+    publish: bool
+    # Spec text is added to the search index of the builder.
+    search_index: bool
+
+    def covers(self, other: BuildNeeds) -> bool:
+        """Return whether everything *other* needs is also needed by this."""
+        return (self.publish or not other.publish) and (
+            self.search_index or not other.search_index
+        )
+
+
+def _compute(app: Sphinx) -> BuildNeeds:
+    builder = app.builder
+    # E-books are read offline, where Swagger UI cannot load its assets.
+    publish = isinstance(builder, StandaloneHTMLBuilder) and not isinstance(
+        builder, EpubBuilder
+    )
+    search_index = (
+        publish
+        and bool(getattr(builder, "search", False))
+        and app.config.swagger_search_global_index
+    )
+    return BuildNeeds(publish=publish, search_index=search_index)
+
+
+def get_build_needs(app: Sphinx) -> BuildNeeds:
+    """Return the needs of the active builder, computing them on first use."""
+    needs: BuildNeeds | None = getattr(app.builder, _ATTRIBUTE, None)
+    if needs is None:
+        needs = _compute(app)
+        setattr(app.builder, _ATTRIBUTE, needs)
+    return needs
+
+
+def init_build_needs(app: Sphinx) -> None:
+    """Compute the needs of the builder and report skipped work."""
+    needs = get_build_needs(app)
+    if not needs.publish:
+        logger.info(
+            "Builder %s does not show Swagger UI, specs are not parsed or published.",
+            app.builder.name,
+        )
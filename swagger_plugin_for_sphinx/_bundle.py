@@ -0,0 +1,204 @@
+"""Resolve references to other files so a spec can be published as one document."""
+
+from __future__ import annotations
+
+import copy
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote, unquote, urlsplit
+
+from sphinx.errors import ExtensionError
+
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+
+# A "$ref" whose value does not start with "#" may point to another file.
+_EXTERNAL_REF = re.compile(rb"""["']?\$ref["']?\s*:\s*["']?[^#"'\s]""")
+
+_WINDOWS_PATH = re.compile(r"^[A-Za-z]:[\\/]")
+_CHUNK_SIZE = 1024 * 1024
+# The end of a chunk kept for references continuing in the next one.
+_OVERLAP = 4096
+
+# Whether specs possibly reference other files, by content digest, for one build.
+_scanned: dict[str, bool] = {}
+
+_Key = tuple[Path, str]
+
+
+def may_have_external_refs(raw: bytes) -> bool:
+    """Return whether the spec source possibly references other files.
+
+    This is a cheap check on the source, so specs without such references
+    need not be parsed and walked.
+    """
+    return _EXTERNAL_REF.search(raw) is not None
+
+
+def _file_may_have_external_refs(path: Path) -> bool:
+    """Like :func:`may_have_external_refs`, reading *path* in chunks.
+
+    The result is remembered by the content digest of *path*, so further
+    directives for the same spec do not read it again.
+    """
+    digest = spec_cache.digest(path)
+    found = _scanned.get(digest)
+    if found is not None:
+        return found
+    found = False
+    tail = b""
+    with path.open("rb") as handle:
+        while not found and (chunk := handle.read(_CHUNK_SIZE)):
+            window = tail + chunk
+            found = may_have_external_refs(window)
+            tail = window[-_OVERLAP:]
+    _scanned[digest] = found
+    return found
+
+
+def forget_scanned_specs() -> None:
+    """Forget which specs earlier builds of this process found to reference other files."""
+    _scanned.clear()
+
+
+def _is_url(ref: str) -> bool:
+    return bool(urlsplit(ref).scheme) and not _WINDOWS_PATH.match(ref)
+
+
+def _resolve_pointer(document: Any, fragment: str, key: _Key) -> Any:
+    node = document
+    if not fragment:
+        return node
+    if not fragment.startswith("/"):
+        raise ExtensionError(f"Invalid reference {key[0]}#{fragment}.")
+    for token in fragment[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        try:
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ExtensionError(
+                f"Unresolvable reference {key[0]}#{fragment}."
+            ) from None
+    return node
+
+
+class _Bundler:
+    """Inline references to other files, hoisting recursive ones into the spec."""
+
+    def __init__(self, root: Path, spec: dict[str, Any], stats: Counter[str]) -> None:
+        """Prepare bundling *spec*, loaded from *root*."""
+        self.root = root
+        self.stats = stats
+        self._documents: dict[Path, Any] = {root: spec}
+        self._stack: list[_Key] = []
+        self._hoisted: dict[_Key, str] = {}
+        self._components: dict[str, Any] = {}
+        # Where recursive references are hoisted to, by OpenAPI version.
+        self._container = (
+            ["definitions"] if "swagger" in spec else ["components", "schemas"]
+        )
+
+    @property
+    def files(self) -> list[Path]:
+        """Return the referenced files, in the order they were first loaded."""
+        return list(self._documents)[1:]
+
+    def bundle(self) -> dict[str, Any]:
+        """Return a copy of the spec with references to other files inlined."""
+        bundled: dict[str, Any] = self._walk(self._documents[self.root], self.root)
+        if self._components:
+            container = bundled
+            for name in self._container:
+                container = container.setdefault(name, {})
+            container.update(self._components)
+        return bundled
+
+    def _document(self, path: Path) -> Any:
+        if path not in self._documents:
+            if not path.is_file():
+                raise ExtensionError(f"Referenced file not found: {path}.")
+            self._documents[path] = spec_cache.load(path, self.stats)
+        return self._documents[path]
+
+    def _walk(self, node: Any, base: Path) -> Any:
+        if isinstance(node, list):
+            return [self._walk(item, base) for item in node]
+        if not isinstance(node, dict):
+            return node
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            key = self._target(ref, base)
+            if key is not None:
+                siblings = {
+                    k: self._walk(v, base) for k, v in node.items() if k != "$ref"
+                }
+                if key[0] == self.root:
+                    # References back into the spec become local references.
+                    return {"$ref": "#" + quote(key[1], safe="/~")} | siblings
+                resolved = self._inline(key)
+                if siblings and isinstance(resolved, dict):
+                    return resolved | siblings
+                return resolved
+        return {key: self._walk(value, base) for key, value in node.items()}
+
+    def _target(self, ref: str, base: Path) -> _Key | None:
+        """Return the file and fragment to inline, or ``None`` to keep the reference."""
+        if _is_url(ref):
+            return None
+        file_part, _, fragment = ref.partition("#")
+        fragment = unquote(fragment)
+        if not file_part:
+            # Local references of the spec itself stay valid after bundling.
+            return None if base == self.root else (base, fragment)
+        return (base.parent / unquote(file_part)).resolve(), fragment
+
+    def _inline(self, key: _Key) -> Any:
+        if key in self._stack:
+            name = self._hoisted.get(key)
+            if name is None:
+                name = self._unique_name(key)
+                self._hoisted[key] = name
+            return {"$ref": "#/" + "/".join(self._container) + "/" + name}
+        self._stack.append(key)
+        try:
+            target = _resolve_pointer(self._document(key[0]), key[1], key)
+            resolved = self._walk(target, key[0])
+        finally:
+            self._stack.pop()
+        if key in self._hoisted and self._hoisted[key] not in self._components:
+            # A copy, so YAML output does not use anchors for the second occurrence.
+            self._components[self._hoisted[key]] = copy.deepcopy(resolved)
+        return resolved
+
+    def _unique_name(self, key: _Key) -> str:
+        existing: Any = self._documents[self.root]
+        for name in self._container:
+            existing = existing.get(name, {}) if isinstance(existing, dict) else {}
+        taken = set(existing) | set(self._hoisted.values())
+        base = key[1].rsplit("/", 1)[-1] or key[0].stem
+        name, index = base, 1
+        while name in taken:
+            index += 1
+            name = f"{base}{index}"
+        return name
+
+
+def bundle_spec(
+    source: Path, stats: Counter[str] | None = None
+) -> tuple[dict[str, Any] | None, list[Path]]:
+    """Return the spec with references to other files inlined, and those files.
+
+    Returns ``None`` instead of a spec if the spec does not reference other
+    files. References that form a cycle are hoisted into the schemas of the
+    spec and referenced locally.
+    """
+    if not _file_may_have_external_refs(source):
+        return None, []
+    stats = Counter() if stats is None else stats
+    source = source.resolve()
+    bundler = _Bundler(source, spec_cache.load(source, stats), stats)
+    bundled = bundler.bundle()
+    if not bundler.files:
+        return None, []
+    return bundled, bundler.files
@@ -0,0 +1,54 @@
+"""Server configuration snippets marking fingerprinted specs as immutable."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+
+from swagger_plugin_for_sphinx._publish import FINGERPRINT_LENGTH, write_if_changed
+
+CACHE_HEADER_FORMATS = ("headers", "nginx")
+# File names of the snippets, relative to the output directory.
+HEADERS_FILE = "_headers"
+NGINX_FILE = "swagger-plugin-nginx.conf"
+
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_BEGIN = "# BEGIN swagger-plugin-for-sphinx"
+_END = "# END swagger-plugin-for-sphinx"
+
+
+def headers_rules(paths: Iterable[str]) -> str:
+    """Return ``_headers`` rules for the specs at *paths*, relative to ``_static``."""
+    lines = [_BEGIN]
+    for path in sorted(set(paths)):
+        lines.extend((f"/_static/{path}", f"  Cache-Control: {_CACHE_CONTROL}"))
+    lines.append(_END)
+    return "\n".join(lines) + "\n"
+
+
+def nginx_rules() -> str:
+    """Return an nginx ``location`` block for all fingerprinted specs."""
+    return (
+        f'location ~ "/_static/.+\\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}\\.[A-Za-z]+$" {{\n'
+        f'    add_header Cache-Control "{_CACHE_CONTROL}";\n'
+        "}\n"
+    )
+
+
+def write_headers_file(path: Path, rules: str) -> bool:
+    """Write *rules* into the ``_headers`` file at *path*.
+
+    Rules of the project in the same file, e.g. copied by ``html_extra_path``,
+    are kept; only the block written by an earlier build is replaced.
+    """
+    text = path.read_text(encoding="utf-8") if path.is_file() else ""
+    before, begin, rest = text.partition(_BEGIN)
+    after = rest.partition(_END + "\n")[2] if begin else ""
+    if before and not before.endswith("\n"):
+        before += "\n"
+    return write_if_changed(path, (before + rules + after).encode("utf-8"))
+
+
+def write_nginx_file(path: Path) -> bool:
+    """Write the nginx snippet to *path*."""
+    return write_if_changed(path, nginx_rules().encode("utf-8"))
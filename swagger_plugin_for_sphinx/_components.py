@@ -0,0 +1,156 @@
+"""Find the reusable components of a spec that parts of it reference."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+from urllib.parse import unquote
+
+# Sections of Swagger 2.0 specs holding components referenced by "$ref".
+_SWAGGER_SECTIONS = ("definitions", "parameters", "responses")
+# Components referenced by name instead of "$ref", which are always kept.
+_UNREFERENCED_SECTIONS = frozenset(("securitySchemes",))
+
+# The location of a component, e.g. ("components", "schemas", "Pet").
+Location = tuple[str, ...]
+
+
+def _mapping_refs(discriminator: Any) -> Iterator[str]:
+    """Yield the schemas a discriminator maps to, given as references or names."""
+    mapping = discriminator.get("mapping") if isinstance(discriminator, dict) else None
+    for value in mapping.values() if isinstance(mapping, dict) else ():
+        if isinstance(value, str):
+            yield value if value.startswith("#/") else f"#/components/schemas/{value}"
+
+
+def _local_refs(node: Any) -> Iterator[str]:
+    """Yield the local references in *node*, e.g. ``#/components/schemas/Pet``."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/"):
+                yield ref
+            yield from _mapping_refs(node.get("discriminator"))
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _location(ref: str) -> Location | None:
+    tokens = [
+        unquote(token).replace("~1", "/").replace("~0", "~")
+        for token in ref[2:].split("/")
+    ]
+    if tokens[0] == "components" and len(tokens) >= 3:
+        return tuple(tokens[:3])
+    if tokens[0] in _SWAGGER_SECTIONS and len(tokens) >= 2:
+        return tuple(tokens[:2])
+    return None
+
+
+def _lookup(spec: dict[str, Any], location: Location) -> Any:
+    node: Any = spec
+    for token in location:
+        if not isinstance(node, dict) or token not in node:
+            return None
+        node = node[token]
+    return node
+
+
+def _schemas(spec: dict[str, Any]) -> Iterator[tuple[Location, Any]]:
+    for prefix in (("components", "schemas"), ("definitions",)):
+        section = _lookup(spec, prefix)
+        for name, schema in section.items() if isinstance(section, dict) else ():
+            yield (*prefix, name), schema
+
+
+def _subtypes(spec: dict[str, Any], reached: set[Location]) -> list[Location]:
+    """Return the schemas extending a reached schema with an unmapped discriminator.
+
+    Such subtypes reference their base schema with ``allOf``, but are not
+    referenced by it.
+    """
+    bases = set()
+    for location in reached:
+        schema = _lookup(spec, location)
+        if (
+            isinstance(schema, dict)
+            and "discriminator" in schema
+            and next(_mapping_refs(schema["discriminator"]), None) is None
+        ):
+            bases.add(location)
+    return [
+        location
+        for location, schema in _schemas(spec)
+        if location not in reached
+        and isinstance(schema, dict)
+        and any(_location(ref) in bases for ref in _local_refs(schema.get("allOf")))
+    ]
+
+
+def reachable_components(spec: dict[str, Any], roots: Iterable[Any]) -> set[Location]:
+    """Return the components of *spec* that *roots* reference, directly or not.
+
+    Schemas named by a discriminator mapping count as referenced, as do the
+    subtypes of a schema with a discriminator but no mapping.
+    """
+    reached: set[Location] = set()
+    stack = list(roots)
+    while stack:
+        for ref in _local_refs(stack.pop()):
+            location = _location(ref)
+            if location is None or location in reached:
+                continue
+            component = _lookup(spec, location)
+            if component is not None:
+                reached.add(location)
+                stack.append(component)
+        if not stack:
+            for location in _subtypes(spec, reached):
+                reached.add(location)
+                stack.append(_lookup(spec, location))
+    return reached
+
+
+def component_roots(spec: dict[str, Any]) -> list[Any]:
+    """Return the parts of *spec* outside its components, which reference them."""
+    return [
+        value
+        for key, value in spec.items()
+        if key != "components" and key not in _SWAGGER_SECTIONS
+    ]
+
+
+def _keep(
+    section: dict[str, Any], prefix: Location, keep: set[Location]
+) -> dict[str, Any]:
+    return {name: value for name, value in section.items() if (*prefix, name) in keep}
+
+
+def prune_components(spec: dict[str, Any], keep: set[Location]) -> dict[str, Any]:
+    """Return a shallow copy of *spec* with only the components in *keep*.
+
+    Security schemes are kept, as they are referenced by name. Sections left
+    empty are removed.
+    """
+    pruned = dict(spec)
+    components = spec.get("components")
+    if isinstance(components, dict):
+        pruned["components"] = {}
+        for section, entries in components.items():
+            if section in _UNREFERENCED_SECTIONS or not isinstance(entries, dict):
+                pruned["components"][section] = entries
+            elif kept := _keep(entries, ("components", section), keep):
+                pruned["components"][section] = kept
+        if not pruned["components"]:
+            del pruned["components"]
+    for section in _SWAGGER_SECTIONS:
+        entries = spec.get(section)
+        if isinstance(entries, dict):
+            if kept := _keep(entries, (section,), keep):
+                pruned[section] = kept
+            else:
+                del pruned[section]
+    return pruned
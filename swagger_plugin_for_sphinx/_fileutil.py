@@ -0,0 +1,110 @@
+"""File helpers shared by the plugin's caches and output writers."""
+
+from __future__ import annotations
+
+import contextlib
+import filecmp
+import json
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# How place_file may give a target the content of a source.
+PLACE_METHODS = ("copy", "hardlink", "reflink")
+# The Linux ioctl cloning a file, FICLONE in <linux/fs.h>.
+_FICLONE = 0x40049409
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write *data* to *path* so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def read_manifest(path: Path) -> dict[str, object]:
+    """Return the JSON object at *path*, or an empty one if it cannot be read."""
+    try:
+        with path.open(encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(path: Path, manifest: dict[str, object]) -> None:
+    """Write *manifest* to *path*, ignoring locations that are not writable.
+
+    Manifests only save work in later builds, so failing to write one must not
+    fail the build.
+    """
+    with contextlib.suppress(OSError):
+        write_atomic(path, json.dumps(manifest, indent=1).encode("utf-8"))
+
+
+def _same_content(source: Path, target: Path) -> bool:
+    try:
+        if source.samefile(target):
+            return True
+        if source.stat().st_size != target.stat().st_size:
+            return False
+        return filecmp.cmp(source, target, shallow=False)
+    except OSError:
+        return False
+
+
+def _clone(source: Path, target: Path) -> None:
+    if sys.platform == "linux":
+        import fcntl  # pylint: disable=import-outside-toplevel
+
+        with source.open("rb") as src, target.open("xb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return
+    raise OSError("Reflinks are only supported on Linux")
+
+
+def _link(source: Path, target: Path, method: str) -> bool:
+    """Link *target* to *source* with *method*, return whether that worked."""
+    try:
+        if method == "hardlink":
+            os.link(source, target)
+        else:
+            _clone(source, target)
+    except OSError:
+        # E.g. across file systems, or on file systems without reflinks.
+        target.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def place_file(source: Path, target: Path, method: str = "copy") -> str:
+    """Give *target* the content of *source* and return how it was done.
+
+    *method* is one of PLACE_METHODS. Hard links and reflinks fall back to
+    copying where they are not possible. Returns ``"unchanged"`` without
+    writing if *target* already has the content, otherwise the method used.
+    The target is replaced, never written through, so a target that is a hard
+    link of another file does not change that file.
+    """
+    if _same_content(source, target):
+        return "unchanged"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        if method == "copy" or not _link(source, tmp, method):
+            method = "copy"
+            shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+    return method
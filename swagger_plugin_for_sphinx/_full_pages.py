@@ -0,0 +1,69 @@
+"""Skip rewriting full pages whose inputs did not change since they were written."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+import jinja2
+
+from swagger_plugin_for_sphinx._fileutil import read_manifest, write_manifest
+
+
+def inputs_digest(params: dict[str, Any], template: jinja2.Template) -> str | None:
+    """Return a digest of what a full page is rendered from.
+
+    Returns ``None`` if the template source cannot be read, so the page is
+    always rendered.
+    """
+    if template.filename is None:
+        return None
+    try:
+        source = Path(template.filename).read_bytes()
+    except OSError:
+        return None
+    hasher = hashlib.sha256(source)
+    hasher.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _stamp(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class PageManifest:
+    """The input digest and output file stamp of each full page written.
+
+    A page is up to date if its inputs are unchanged and its output file is
+    still the one written for them. Sphinx overwrites that file when it writes
+    the document again, which changes the stamp.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Load the manifest at *path*, written by an earlier build."""
+        self._path = path
+        self._known = read_manifest(path)
+        self._entries: dict[str, object] = {}
+
+    def up_to_date(self, outfile: Path, digest: str | None) -> bool:
+        """Return whether *outfile* was written from inputs with *digest*."""
+        entry = self._known.get(str(outfile))
+        if digest is None or entry != [digest, _stamp(outfile)]:
+            return False
+        self._entries[str(outfile)] = entry
+        return True
+
+    def record(self, outfile: Path, digest: str | None) -> None:
+        """Remember that *outfile* was written from inputs with *digest*."""
+        self._entries[str(outfile)] = [digest, _stamp(outfile)]
+
+    def save(self) -> None:
+        """Write the pages up to date or written in this build, if they changed."""
+        if self._entries != self._known:
+            write_manifest(self._path, self._entries)
@@ -0,0 +1,205 @@
+"""Read selected fields of a JSON document without holding the whole document."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, BinaryIO, TypeAlias
+
+_CHUNK_SIZE = 256 * 1024
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Everything up to the next bracket, including complete strings, while skipping a container.
+_PLAIN = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*')
+# A number or literal, up to the next delimiter.
+_SCALAR = re.compile(r"[^,:\]}\s]+")
+
+# Keep the whole value.
+KEEP = None
+# The selection for any key not named in a mapping.
+ANY = "*"
+
+# What to read of a value: KEEP, or a mapping of keys to the selection of their
+# values. Values not selected are skipped, objects where a mapping selection
+# expects an object are replaced by ``None``.
+Selection: TypeAlias = Mapping[str, "Selection"] | None
+
+
+class _Reader:
+    """A JSON scanner over a window of the file, refilled as it is consumed."""
+
+    def __init__(self, handle: BinaryIO) -> None:
+        """Scan *handle* from its current position."""
+        self._handle = handle
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the window, dropping what was consumed."""
+        if self._eof:
+            return False
+        chunk = self._handle.read(_CHUNK_SIZE)
+        self._eof = not chunk
+        self._buf = self._buf[self._pos :] + self._decoder.decode(chunk, self._eof)
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message} in JSON document")
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, or an empty string at the end."""
+        while True:
+            found = _WHITESPACE.match(self._buf, self._pos)
+            assert found is not None
+            self._pos = found.end()
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos : self._pos + 1]
+
+    def expect(self, char: str) -> None:
+        """Consume *char*, the next non-whitespace character."""
+        if self.peek() != char:
+            raise self._error(f"Expected {char!r}")
+        self._pos += 1
+
+    def string(self) -> str:
+        """Consume and return a string."""
+        if self.peek() != '"':
+            raise self._error("Expected a string")
+        while True:
+            try:
+                value, self._pos = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            return str(value)
+
+    def value(self) -> Any:
+        """Consume and return any value."""
+        if self.peek() not in {'"', "{", "["}:
+            # A number at the end of the window may continue in the next chunk.
+            return json.loads(self._scalar())
+        while True:
+            try:
+                value, self._pos = self._json.raw_decode(self._buf, self._pos)
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def skip(self) -> None:
+        """Consume a value without decoding it."""
+        char = self.peek()
+        if char == '"':
+            self.string()
+        elif char in {"{", "["}:
+            self._skip_container()
+        else:
+            self._scalar()
+
+    def _scalar(self) -> str:
+        """Consume and return the text of a number or literal."""
+        while True:
+            found = _SCALAR.match(self._buf, self._pos)
+            if found is None:
+                raise self._error("Expected a value")
+            if found.end() < len(self._buf) or not self._fill():
+                self._pos = found.end()
+                return found.group()
+
+    def _skip_container(self) -> None:
+        depth = 0
+        while True:
+            found = _PLAIN.match(self._buf, self._pos)
+            assert found is not None
+            self._pos = found.end()
+            if self._pos == len(self._buf):
+                if not self._fill():
+                    raise self._error("Unexpected end")
+                continue
+            char = self._buf[self._pos]
+            if char == '"':
+                # A string continuing in the next chunk.
+                self.string()
+                continue
+            self._pos += 1
+            depth += 1 if char in "{[" else -1
+            if not depth:
+                return
+
+    def select(self, selection: Selection) -> Any:
+        """Consume a value and return the selected part of it."""
+        if selection is KEEP:
+            return self.value()
+        if self.peek() != "{":
+            self.skip()
+            return None
+        try:
+            value, end = self._json.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            # The object continues after the window, or is invalid.
+            pass
+        else:
+            self._pos = end
+            return _project(value, selection)
+        self._pos += 1
+        result: dict[str, Any] = {}
+        if self.peek() == "}":
+            self._pos += 1
+            return result
+        while True:
+            key = self.string()
+            self.expect(":")
+            if key in selection:
+                result[key] = self.select(selection[key])
+            elif ANY in selection:
+                result[key] = self.select(selection[ANY])
+            else:
+                self.skip()
+            if self.peek() == "}":
+                self._pos += 1
+                return result
+            self.expect(",")
+
+    def end(self) -> None:
+        """Check that only whitespace follows."""
+        if self.peek():
+            raise self._error("Extra data")
+
+
+def _project(value: Any, selection: Selection) -> Any:
+    """Return the *selection* of a decoded value, like :meth:`_Reader.select`."""
+    if selection is KEEP:
+        return value
+    if not isinstance(value, dict):
+        return None
+    return {
+        key: _project(item, selection[key] if key in selection else selection[ANY])
+        for key, item in value.items()
+        if key in selection or ANY in selection
+    }
+
+
+def load_json_fields(path: Path, selection: Mapping[str, Selection]) -> dict[str, Any]:
+    """Return the *selection* of the JSON object at *path*, reading it in chunks.
+
+    Memory use is bounded by the chunk size and the selected values, not the
+    size of the document. Raises :class:`ValueError` if the document is not a
+    JSON object.
+    """
+    with path.open("rb") as handle:
+        reader = _Reader(handle)
+        if reader.peek() != "{":
+            raise ValueError("JSON document is not an object")
+        try:
+            result: dict[str, Any] = reader.select(selection)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{exc.msg} in JSON document") from None
+        reader.end()
+    return result
@@ -0,0 +1,74 @@
+"""The nodes of the swagger-plugin directive and how HTML builders write them."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from docutils import nodes
+from sphinx.writers.html5 import HTML5Translator
+
+
+class SwaggerSearchIndex(nodes.Element):
+    """OpenAPI text for full-text search; not rendered in HTML."""
+
+
+def visit_swagger_search_index(
+    self: nodes.NodeVisitor, _node: SwaggerSearchIndex
+) -> None:
+    """Suppress rendering; search indexing walks the doctree separately."""
+    raise nodes.SkipNode()
+
+
+class SwaggerContainer(nodes.container):
+    """The container Swagger UI is mounted into, configured by data attributes."""
+
+
+def _data_attributes(config: dict[str, Any]) -> dict[str, str]:
+    """Return the data attributes the loader script configures Swagger UI from."""
+    attributes = {"data-swagger-url": config["url_path"]}
+    if config["swagger_options"]:
+        attributes["data-swagger-options"] = json.dumps(
+            config["swagger_options"], sort_keys=True
+        )
+    if config["urls"]:
+        attributes["data-swagger-urls"] = json.dumps(config["urls"], sort_keys=True)
+    if config["lazy"]:
+        attributes["data-swagger-lazy"] = ""
+    if config["search_url"]:
+        attributes["data-swagger-search"] = config["search_url"]
+    return attributes
+
+
+def visit_swagger_container(self: HTML5Translator, node: SwaggerContainer) -> None:
+    """Open the container, with an embedded spec if it is small enough."""
+    config = node.get("swagger")
+    attributes: dict[str, Any] = {} if config is None else _data_attributes(config)
+    self.body.append(
+        self.starttag(
+            node,
+            "div",
+            CLASS="docutils container swagger-plugin-container",
+            **attributes,
+        )
+    )
+    if config is not None and config["spec_json"]:
+        self.body.append(
+            '<script type="application/json" class="swagger-plugin-spec">'
+            f'{config["spec_json"]}</script>\n'
+        )
+
+
+def depart_swagger_container(self: HTML5Translator, _node: SwaggerContainer) -> None:
+    """Close the container."""
+    self.body.append("</div>\n")
+
+
+class SwaggerOverview(nodes.General, nodes.Element):
+    """Static HTML summary of a spec, replaced by Swagger UI once it mounts."""
+
+
+def visit_swagger_overview(self: HTML5Translator, node: SwaggerOverview) -> None:
+    """Write the pre-rendered summary into the container."""
+    self.body.append(node["html"])
+    raise nodes.SkipNode()
@@ -2,26 +2,89 @@
 
 from __future__ import annotations
 
-import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import yaml
+from sphinx.config import Config
 from sphinx.errors import ExtensionError
 
-_HTTP_METHODS = frozenset(
+from swagger_plugin_for_sphinx._json_stream import (
+    ANY,
+    KEEP,
+    Selection,
+    load_json_fields,
+)
+from swagger_plugin_for_sphinx._spec_loader import parse_spec
+
+HTTP_METHODS = frozenset(
     ("get", "post", "put", "delete", "patch", "head", "options", "trace")
 )
-_DESCRIPTION_MAX_LEN = 500
+DEFAULT_DESCRIPTION_LENGTH = 500
+# Version of the search lines and entries derived from specs. Bump it whenever
+# they change, so lines persisted by an earlier version are not reused.
+SEARCH_FORMAT_VERSION = 2
+_WHITESPACE = re.compile(r"\s")
+_NON_WORD = re.compile(r"\W")
+
+
+@dataclass(frozen=True, slots=True)
+class SearchLimits:
+    """Bounds on the text taken from a spec for the search index."""
+
+    # Operations and schemas beyond these counts are not indexed; None means all.
+    max_operations: int | None = None
+    max_schemas: int | None = None
+    # Longer descriptions are truncated; 0 leaves descriptions out.
+    description_length: int = DEFAULT_DESCRIPTION_LENGTH
+
+    @property
+    def key(self) -> str:
+        """Return a file name friendly representation for cache keys."""
+        return "-".join(
+            str(value)
+            for value in (
+                self.max_operations,
+                self.max_schemas,
+                self.description_length,
+            )
+        )
+
+
+DEFAULT_SEARCH_LIMITS = SearchLimits()
+
 
+def search_limits(config: Config) -> SearchLimits:
+    """Return the search limits set in the Sphinx *config*."""
+    return SearchLimits(
+        max_operations=config.swagger_search_max_operations,
+        max_schemas=config.swagger_search_max_schemas,
+        description_length=config.swagger_search_description_length,
+    )
 
-def _append_description_line(lines: list[str], desc: Any, *, compare_to: str) -> None:
+
+def _limit_reached(count: int, limit: int | None) -> bool:
+    return limit is not None and count >= limit
+
+
+def _append_description_line(
+    lines: list[str], desc: Any, *, compare_to: str, limits: SearchLimits
+) -> None:
     """Append a description line to the text for the search index."""
+    max_length = limits.description_length
     # Skip if identical to the summary/title to avoid duplication.
-    if isinstance(desc, str) and desc.strip() and desc.strip() != compare_to.strip():
+    if (
+        max_length > 0
+        and isinstance(desc, str)
+        and desc.strip()
+        and desc.strip() != compare_to.strip()
+    ):
         snippet = desc.strip()
-        if len(snippet) > _DESCRIPTION_MAX_LEN:
-            snippet = snippet[: _DESCRIPTION_MAX_LEN - 3] + "..."
+        if len(snippet) > max_length:
+            snippet = snippet[: max(max_length - 3, 0)] + "..."
         lines.append(snippet)
 
 
@@ -40,38 +103,74 @@ def _get_schemas(spec: dict[str, Any]) -> dict[str, Any] | None:
     return None
 
 
-def _extend_schema_lines(spec: dict[str, Any], lines: list[str]) -> None:
-    """Add key fields from the schema objects to the search index."""
+def _iter_schemas(
+    spec: dict[str, Any], limits: SearchLimits
+) -> Iterator[tuple[str, dict[str, Any], str, str]]:
+    """Yield the name, object, search line and title of the schemas to index."""
     schemas = _get_schemas(spec)
     if not schemas:
         return
+    count = 0
     for name, schema in schemas.items():
         if not isinstance(schema, dict):
             continue
+        if _limit_reached(count, limits.max_schemas):
+            return
+        count += 1
         raw_title = schema.get("title")
         title_str = raw_title.strip() if isinstance(raw_title, str) else ""
         suffix = f" — {title_str}" if title_str and title_str != str(name) else ""
-        lines.append(f"Schema {name}{suffix}")
+        yield str(name), schema, f"Schema {name}{suffix}", title_str or str(name)
+
+
+def _extend_schema_lines(
+    spec: dict[str, Any], lines: list[str], limits: SearchLimits
+) -> None:
+    """Add key fields from the schema objects to the search index."""
+    for _name, schema, line, title in _iter_schemas(spec, limits):
+        lines.append(line)
         _append_description_line(
-            lines, schema.get("description"), compare_to=title_str or str(name)
+            lines, schema.get("description"), compare_to=title, limits=limits
         )
 
 
-def load_openapi_file(path: Path) -> dict[str, Any]:
+def load_openapi_file(path: Path, *, json_backend: str | None = None) -> dict[str, Any]:
     """Load a JSON or YAML OpenAPI file."""
-    raw = path.read_text(encoding="utf-8")
+    raw = path.read_bytes()
     try:
-        data: Any = json.loads(raw)
-    except json.JSONDecodeError:
-        try:
-            data = yaml.safe_load(raw)
-        except yaml.YAMLError as exc:
-            raise ExtensionError(f"Could not parse OpenAPI file {path}: {exc}") from exc
+        data = parse_spec(raw, path, json_backend=json_backend)
+    except (ValueError, yaml.YAMLError) as exc:
+        raise ExtensionError(f"Could not parse OpenAPI file {path}: {exc}") from exc
     if not isinstance(data, dict):
         raise ExtensionError(f"OpenAPI document must be a mapping: {path}")
     return data
 
 
+_OPERATION_FIELDS: Selection = dict.fromkeys(
+    ("summary", "operationId", "description", "tags"), KEEP
+)
+_SCHEMA_FIELDS: Selection = dict.fromkeys(("title", "description"), KEEP)
+# The fields of a spec read by openapi_lines_for_search and openapi_search_entries.
+_INDEX_FIELDS: dict[str, Selection] = {
+    "info": dict.fromkeys(("title", "version"), KEEP),
+    "paths": {ANY: {ANY: _OPERATION_FIELDS}},
+    "components": {"schemas": {ANY: _SCHEMA_FIELDS}},
+    "definitions": {ANY: _SCHEMA_FIELDS},
+}
+
+
+def load_openapi_index_fields(path: Path) -> dict[str, Any]:
+    """Load the fields of a JSON OpenAPI file that are used for search.
+
+    The file is read in chunks and other fields are skipped, so memory use
+    does not grow with the size of the spec.
+    """
+    try:
+        return load_json_fields(path, _INDEX_FIELDS)
+    except ValueError as exc:
+        raise ExtensionError(f"Could not parse OpenAPI file {path}: {exc}") from exc
+
+
 def _handle_openapi_info(spec: dict[str, Any], lines: list[str]) -> None:
     info = spec.get("info")
     if not isinstance(info, dict):
@@ -83,30 +182,90 @@ def _handle_openapi_info(spec: dict[str, Any], lines: list[str]) -> None:
     lines.append(f"{title} {version}" if version else str(title))
 
 
-def _handle_paths(spec: dict[str, Any], lines: list[str]) -> None:
+def _iter_operations(
+    spec: dict[str, Any], limits: SearchLimits
+) -> Iterator[tuple[str, str, dict[str, Any], str, str]]:
+    """Yield the path, method, object, search line and summary of the operations to index."""
     paths = spec.get("paths")
     if not isinstance(paths, dict):
         return
+    count = 0
     for path, path_item in paths.items():
         if not isinstance(path_item, dict):
             continue
         for method, op in path_item.items():
-            if method.lower() not in _HTTP_METHODS or not isinstance(op, dict):
+            if method.lower() not in HTTP_METHODS or not isinstance(op, dict):
                 continue
+            if _limit_reached(count, limits.max_operations):
+                return
+            count += 1
             raw_summary = op.get("summary")
             summary = raw_summary.strip() if isinstance(raw_summary, str) else ""
             raw_op_id = op.get("operationId")
             op_id = raw_op_id.strip() if isinstance(raw_op_id, str) else ""
             label = summary or op_id
             suffix = f" — {label}" if label else ""
-            lines.append(f"{method.upper()} {path}{suffix}")
-            _append_description_line(lines, op.get("description"), compare_to=summary)
+            yield str(path), method, op, f"{method.upper()} {path}{suffix}", summary
+
+
+def _handle_paths(spec: dict[str, Any], lines: list[str], limits: SearchLimits) -> None:
+    for _path, _method, op, line, summary in _iter_operations(spec, limits):
+        lines.append(line)
+        _append_description_line(
+            lines, op.get("description"), compare_to=summary, limits=limits
+        )
+
+
+def _deep_link(value: str) -> str:
+    # Swagger UI replaces whitespace in tags and operation IDs of deep links.
+    return _WHITESPACE.sub("_", value.strip())
 
 
-def openapi_lines_for_search(spec: dict[str, Any]) -> list[str]:
+def _operation_link(path: str, method: str, op: dict[str, Any]) -> tuple[str, str]:
+    """Return the tag and operation ID Swagger UI uses in the deep link of *op*."""
+    tags = op.get("tags")
+    tag = (
+        tags[0] if isinstance(tags, list) and tags and isinstance(tags[0], str) else ""
+    )
+    op_id = op.get("operationId")
+    if not isinstance(op_id, str) or not op_id.strip():
+        op_id = f"{method.lower()}_{_NON_WORD.sub('_', path)}"
+    return _deep_link(tag or "default"), _deep_link(op_id)
+
+
+def openapi_lines_for_search(
+    spec: dict[str, Any], limits: SearchLimits = DEFAULT_SEARCH_LIMITS
+) -> list[str]:
     """Build human-readable lines from the spec for the search index."""
     lines: list[str] = []
     _handle_openapi_info(spec, lines)
-    _handle_paths(spec, lines)
-    _extend_schema_lines(spec, lines)
+    _handle_paths(spec, lines, limits)
+    _extend_schema_lines(spec, lines, limits)
     return lines
+
+
+def openapi_search_entries(
+    spec: dict[str, Any], limits: SearchLimits = DEFAULT_SEARCH_LIMITS
+) -> list[dict[str, str]]:
+    """Build search entries for the operations and schemas of the spec.
+
+    Operation entries carry the ``tag`` and ``operation`` of their Swagger UI
+    deep link, schema entries the ``model`` name.
+    """
+    entries: list[dict[str, str]] = []
+    for path, method, op, line, summary in _iter_operations(spec, limits):
+        text: list[str] = []
+        _append_description_line(
+            text, op.get("description"), compare_to=summary, limits=limits
+        )
+        tag, operation = _operation_link(path, method, op)
+        entries.append(
+            {"title": line, "text": "".join(text), "tag": tag, "operation": operation}
+        )
+    for name, schema, line, title in _iter_schemas(spec, limits):
+        text = []
+        _append_description_line(
+            text, schema.get("description"), compare_to=title, limits=limits
+        )
+        entries.append({"title": line, "text": "".join(text), "model": name})
+    return entries
@@ -0,0 +1,68 @@
+"""Summarize a spec for the static overview shown until Swagger UI mounts."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from swagger_plugin_for_sphinx._openapi_index import HTTP_METHODS
+from swagger_plugin_for_sphinx._tag_shards import operation_tags, tag_order
+
+
+@dataclass(frozen=True, slots=True)
+class OverviewOperation:
+    """An operation as listed in the overview."""
+
+    method: str
+    path: str
+    summary: str
+    deprecated: bool
+
+
+def _text(value: Any) -> str:
+    # YAML reads versions like 1.0 as numbers.
+    return str(value).strip() if isinstance(value, str | int | float) else ""
+
+
+def _operations(spec: dict[str, Any]) -> list[tuple[dict[str, Any], OverviewOperation]]:
+    paths = spec.get("paths")
+    operations = []
+    for path, item in paths.items() if isinstance(paths, dict) else ():
+        if not isinstance(item, dict):
+            continue
+        for method, operation in item.items():
+            if method.lower() in HTTP_METHODS and isinstance(operation, dict):
+                entry = OverviewOperation(
+                    method.upper(),
+                    str(path),
+                    _text(operation.get("summary")),
+                    operation.get("deprecated") is True,
+                )
+                operations.append((operation, entry))
+    return operations
+
+
+def overview(spec: dict[str, Any], max_operations: int) -> dict[str, Any]:
+    """Return the title, version and operations of *spec*, grouped by tag.
+
+    Groups follow the order of Swagger UI. Operations with several tags are
+    listed under each of them. At most *max_operations* are listed, the number
+    of further operations is returned as ``omitted``.
+    """
+    info = spec.get("info")
+    info = info if isinstance(info, dict) else {}
+    groups: dict[str, list[OverviewOperation]] = {tag: [] for tag in tag_order(spec)}
+    listed = omitted = 0
+    for operation, entry in _operations(spec):
+        for tag in operation_tags(operation):
+            if listed < max_operations:
+                groups[tag].append(entry)
+                listed += 1
+            else:
+                omitted += 1
+    return {
+        "title": _text(info.get("title")),
+        "version": _text(info.get("version")),
+        "groups": [(tag, entries) for tag, entries in groups.items() if entries],
+        "omitted": omitted,
+    }
@@ -0,0 +1,180 @@
+"""Record where build time goes, per directive and spec, and report it."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+# The phases of a directive, in the order of the report columns.
+PHASES = (
+    "resolve",
+    "bundle",
+    "shake",
+    "publish",
+    "parse",
+    "index",
+    "shard",
+    "inline",
+    "overview",
+    "render",
+)
+
+
+@dataclass(slots=True)
+class Span:
+    """A timed phase, with monotonic start and duration in nanoseconds."""
+
+    name: str
+    start_ns: int
+    duration_ns: int
+
+
+@dataclass(slots=True)
+class Profile:
+    """The spans and counters of one directive or rendered script."""
+
+    docname: str
+    # The spec relative to the source directory; empty for rendered scripts.
+    spec: str = ""
+    pid: int = field(default_factory=os.getpid)
+    tid: int = field(default_factory=threading.get_ident)
+    spans: list[Span] = field(default_factory=list)
+    counters: Counter[str] = field(default_factory=Counter)
+
+
+_active: ContextVar[Profile | None] = ContextVar("swagger_plugin_profile", default=None)
+
+
+@contextmanager
+def profiling(profile: Profile | None) -> Iterator[None]:
+    """Record spans and counters of the block into *profile*, unless it is ``None``."""
+    if profile is None:
+        yield
+        return
+    token = _active.set(profile)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record the duration of the block in the active profile, if any."""
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        profile.spans.append(Span(name, start, time.perf_counter_ns() - start))
+
+
+def count(name: str, value: int) -> None:
+    """Add *value* to the counter *name* of the active profile, if any."""
+    profile = _active.get()
+    if profile is not None:
+        profile.counters[name] += value
+
+
+def describe(spec: str) -> None:
+    """Set the spec of the active profile, if any."""
+    profile = _active.get()
+    if profile is not None:
+        profile.spec = spec
+
+
+def summarize(profiles: Iterable[Profile]) -> list[dict[str, Any]]:
+    """Return the time per phase and the counters per spec, slowest spec first.
+
+    Times are in milliseconds. ``total`` is the time of the directives; the
+    phases may overlap, e.g. parsing happens while bundling or indexing.
+    Rendering the loader script is summarized in the row with an empty spec.
+    """
+    rows: dict[str, dict[str, Any]] = {}
+    for profile in profiles:
+        row = rows.setdefault(
+            profile.spec,
+            {"spec": profile.spec, "count": 0, "total": 0.0}
+            | dict.fromkeys(PHASES, 0.0),
+        )
+        row["count"] += 1
+        for item in profile.spans:
+            milliseconds = item.duration_ns / 1e6
+            if item.name == "directive":
+                row["total"] += milliseconds
+            else:
+                row[item.name] = row.get(item.name, 0.0) + milliseconds
+        for name, value in profile.counters.items():
+            row[name] = row.get(name, 0) + value
+    for row in rows.values():
+        # Scripts are only rendered, their total is the rendering time.
+        row["total"] = row["total"] or row["render"]
+    return sorted(rows.values(), key=lambda row: row["total"], reverse=True)
+
+
+def format_summary(rows: list[dict[str, Any]], limit: int = 20) -> list[str]:
+    """Format *rows* of :func:`summarize` as a table."""
+    header = f"{'spec':<40} {'count':>5} {'total':>9}" + "".join(
+        f" {phase:>8}" for phase in PHASES
+    )
+    lines = [header + f" {'bytes':>10} {'lines':>7}"]
+    for row in rows[:limit]:
+        name = row["spec"] or "(loader script)"
+        lines.append(
+            f"{name[-40:]:<40} {row['count']:>5} {row['total']:>9.1f}"
+            + "".join(f" {row[phase]:>8.1f}" for phase in PHASES)
+            + f" {row.get('bytes_published', 0):>10} {row.get('lines_indexed', 0):>7}"
+        )
+    if len(rows) > limit:
+        lines.append(f"... and {len(rows) - limit} more specs")
+    return lines
+
+
+def profiles_json(profiles: Iterable[Profile]) -> bytes:
+    """Return the raw *profiles* and their summary as JSON."""
+    profiles = list(profiles)
+    report = {
+        "summary": summarize(profiles),
+        "profiles": [
+            {
+                "docname": profile.docname,
+                "spec": profile.spec,
+                "pid": profile.pid,
+                "tid": profile.tid,
+                "spans": [asdict(item) for item in profile.spans],
+                "counters": dict(profile.counters),
+            }
+            for profile in profiles
+        ],
+    }
+    return json.dumps(report, indent=2).encode("utf-8")
+
+
+def chrome_trace(profiles: Iterable[Profile]) -> bytes:
+    """Return the spans of *profiles* in the Chrome trace event format."""
+    events = [
+        {
+            "name": item.name,
+            "cat": "swagger",
+            "ph": "X",
+            "ts": item.start_ns / 1000,
+            "dur": item.duration_ns / 1000,
+            "pid": profile.pid,
+            "tid": profile.tid,
+            "args": {"docname": profile.docname, "spec": profile.spec},
+        }
+        for profile in profiles
+        for item in profile.spans
+    ]
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}).encode("utf-8")
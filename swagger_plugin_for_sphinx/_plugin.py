@@ -3,53 +3,101 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterator
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from importlib.metadata import version
 from pathlib import Path
-from typing import Any
-from urllib import request
+from typing import Any, cast
 
-import jinja2
 from docutils import nodes
 from docutils.parsers.rst import directives
 from sphinx.application import Sphinx
+from sphinx.builders.html import StandaloneHTMLBuilder
+from sphinx.config import ENUM
+from sphinx.environment import BuildEnvironment
 from sphinx.errors import ExtensionError
 from sphinx.util import logging
 from sphinx.util.docutils import SphinxDirective
-from sphinx.util.osutil import copyfile, ensuredir
-from sphinx.writers.html5 import HTML5Translator
 from typing_extensions import override
 
+from swagger_plugin_for_sphinx._assets import default_cache_dir, mirror_assets
+from swagger_plugin_for_sphinx._build_needs import get_build_needs, init_build_needs
+from swagger_plugin_for_sphinx._bundle import bundle_spec, forget_scanned_specs
+from swagger_plugin_for_sphinx._cache_headers import (
+    CACHE_HEADER_FORMATS,
+    HEADERS_FILE,
+    NGINX_FILE,
+    headers_rules,
+    write_headers_file,
+    write_nginx_file,
+)
+from swagger_plugin_for_sphinx._fileutil import PLACE_METHODS
+from swagger_plugin_for_sphinx._full_pages import PageManifest, inputs_digest
+from swagger_plugin_for_sphinx._nodes import (
+    SwaggerContainer,
+    SwaggerOverview,
+    SwaggerSearchIndex,
+    depart_swagger_container,
+    visit_swagger_container,
+    visit_swagger_overview,
+    visit_swagger_search_index,
+)
 from swagger_plugin_for_sphinx._openapi_index import (
-    load_openapi_file,
-    openapi_lines_for_search,
+    DEFAULT_DESCRIPTION_LENGTH,
+    SearchLimits,
+    openapi_search_entries,
+    search_limits,
+)
+from swagger_plugin_for_sphinx._overview import overview
+from swagger_plugin_for_sphinx._perf import (
+    Profile,
+    chrome_trace,
+    count,
+    describe,
+    format_summary,
+    profiles_json,
+    profiling,
+    span,
+    summarize,
+)
+from swagger_plugin_for_sphinx._precompress import precompress
+from swagger_plugin_for_sphinx._preparse import preparse_specs
+from swagger_plugin_for_sphinx._publish import (
+    SPEC_FORMATS,
+    inline_spec,
+    publish_search_shard,
+    publish_spec,
+    remove_stale_fingerprints,
+    write_if_changed,
+)
+from swagger_plugin_for_sphinx._registry import get_registry, merge_info, purge_doc
+from swagger_plugin_for_sphinx._spec_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_STREAM_MIN_BYTES,
+    spec_cache,
+)
+from swagger_plugin_for_sphinx._tag_shards import split_by_tag
+from swagger_plugin_for_sphinx._templates import get_template
+from swagger_plugin_for_sphinx._tree_shake import (
+    forget_shaken_specs,
+    shake_options,
+    shake_spec_once,
 )
 
 logger = logging.getLogger(__name__)
-_HERE = Path(__file__).parent.resolve()
-
-
-class SwaggerSearchIndex(nodes.Element):
-    """OpenAPI text for full-text search; not rendered in HTML."""
-
-
-def _visit_swagger_search_index_html(
-    self: HTML5Translator, _node: SwaggerSearchIndex
-) -> None:
-    """Suppress rendering; search indexing walks the doctree separately."""
-    raise nodes.SkipNode()
+# The script mounting Swagger UI, in the static output directory.
+LOADER_NAME = "swagger-plugin-loader.js"
+# Overviews of larger specs list the first operations only, to keep pages small.
+_OVERVIEW_MAX_OPERATIONS = 200
 
 
 def _build_search_index_node(
     lines: list[str], directive: SwaggerPluginDirective
 ) -> SwaggerSearchIndex:
-    """Wrap *lines* as paragraphs for ``IndexBuilder``, hidden from HTML output."""
-    block = SwaggerSearchIndex()
+    """Wrap *lines* as a single text node for ``IndexBuilder``, hidden from HTML output."""
+    # One text node keeps the pickled doctree small, however large the spec is.
+    block = SwaggerSearchIndex("", nodes.Text("\n".join(lines)))
     directive.set_source_info(block)
-    for line in lines:
-        para = nodes.paragraph("", line)
-        directive.set_source_info(para)
-        block.append(para)
     return block
 
 
@@ -64,6 +112,8 @@ class SwaggerPluginDirective(SphinxDirective):
         "id": directives.unchanged,
         "classes": directives.class_option,
         "full-page": directives.flag,
+        "lazy": directives.flag,
+        "split-by-tag": directives.flag,
         "page-title": directives.unchanged,
         "swagger-options": directives.unchanged,
     }
@@ -72,16 +122,20 @@ class SwaggerPluginDirective(SphinxDirective):
     @override
     def run(self) -> list[nodes.Node]:
         app: Sphinx = self.state.document.settings.env.app
-        metadata = self.env.metadata[self.env.docname]
-        configs = metadata.setdefault("swagger_plugin", [])
+        if not _build_report_enabled(app):
+            return self._run(app)
+        profile = Profile(self.env.docname, self.arguments[0] if self.arguments else "")
+        with profiling(profile), span("directive"):
+            result = self._run(app)
+        get_registry(self.env).profiles.setdefault(self.env.docname, []).append(profile)
+        return result
+
+    def _run(self, app: Sphinx) -> list[nodes.Node]:
+        registry = get_registry(self.env)
+        registry.configs.setdefault(self.env.docname, [])
         # The static dir is created by Sphinx and is not available from a variable or function.
         # https://github.com/sphinx-doc/sphinx/blob/v8.1.3/sphinx/builders/html/__init__.py#L897
         static_dir = Path(app.builder.outdir).joinpath("_static")
-        path_offset = (
-            1
-            if app.builder.name == "dirhtml" and app.env.docname.split("/") != ["index"]
-            else 0
-        )
 
         if len(self.arguments) != 1:
             raise ExtensionError(
@@ -89,70 +143,454 @@ class SwaggerPluginDirective(SphinxDirective):
                 f"{app.env.doc2path(app.env.docname)}:{self.lineno}."
             )
 
-        relpath, abspath = self.env.relfn2path(self.arguments[0])
-        # Use dot-dot to address referencing specs from parents of the Sphinx source directory.
-        # Otherwise, the spec is copied to a parent of the output directory.
-        relpath = relpath.replace("..", "dot-dot")
-        spec = Path(abspath).resolve()
-        if not spec.exists():
-            raise ExtensionError(
-                f"In file '{app.env.doc2path(app.env.docname)}:{self.lineno}', "
-                f"file not found: {self.arguments[0]}."
+        with span("resolve"):
+            relpath, abspath = self.env.relfn2path(self.arguments[0])
+            describe(relpath)
+            # Use dot-dot to address referencing specs from parents of the Sphinx source
+            # directory. Otherwise, the spec is copied to a parent of the output directory.
+            relpath = relpath.replace("..", "dot-dot")
+            spec = Path(abspath).resolve()
+            if not spec.exists():
+                raise ExtensionError(
+                    f"In file '{app.env.doc2path(app.env.docname)}:{self.lineno}', "
+                    f"file not found: {self.arguments[0]}."
+                )
+
+        needs = get_build_needs(app)
+        registry.needs[self.env.docname] = needs
+        stats = registry.cache_stats.setdefault(self.env.docname, Counter())
+        with span("bundle"):
+            bundled, referenced = (
+                bundle_spec(spec, stats)
+                if needs.publish and app.config.swagger_bundle_refs
+                else (None, [])
             )
 
-        logger.info("Adding to _static output path: %s.", spec)
+        with span("resolve"):
+            digests = self._note_dependencies((spec, *referenced))
+        # Identifies the published content, so other directives need not publish it again.
+        digest = "-".join([*digests, shake_options(app.config).key])
 
-        # Preserve the source directory structure to avoid name collisions.
-        outfile = static_dir.joinpath(relpath)
-        ensuredir(str(outfile.parent))
-        copyfile(str(spec), str(outfile))
-
-        if app.config.swagger_mirror_external_resources:
-            for uri in (
-                app.config.swagger_present_uri,
-                app.config.swagger_bundle_uri,
-                app.config.swagger_css_uri,
-            ):
-                filename = Path(uri).name
-                mirrored_file = static_dir.joinpath(filename)
-                request.urlretrieve(uri, mirrored_file)
-                logger.info(
-                    "Adding to _static output path: %s (from %s).", filename, uri
-                )
+        div_id = self.options.get("id", "swagger-ui-container")
+        node = SwaggerContainer(ids=[div_id], classes=self.options.get("classes", []))
+        self.set_source_info(node)
+        if not needs.publish:
+            # Without Swagger UI, neither the published spec nor its text is used.
+            return [] if "full-page" in self.options else [node]
+        bundled = self._shaken(spec, stats, bundled, digest)
 
-        # The range - 1 is to skip the RST or MD document itself.
-        url_path = (
-            "".join(
-                [
-                    "../"
-                    for _ in range(len(app.env.docname.split("/")) - 1 + path_offset)
-                ]
+        # Preserve the source directory structure to avoid name collisions.
+        target = static_dir.joinpath(relpath)
+        with span("publish"):
+            published = publish_spec(
+                spec,
+                target,
+                app.config.swagger_spec_format,
+                stats,
+                document=bundled,
+                fingerprint=app.config.swagger_fingerprint_specs,
+                digest=digest,
+                method=app.config.swagger_publish_method,
             )
-            + "_static/"
-            + relpath
-        )
+        count("bytes_published", published.stat().st_size)
+        relpath = published.relative_to(static_dir).as_posix()
+        registry.published.setdefault(self.env.docname, []).append(relpath)
+
+        static_url = _static_url(app)
 
         config = {
             "full_page": "full-page" in self.options,
-            "url_path": url_path,
+            "url_path": static_url + relpath,
             "swagger_options": json.loads(self.options.get("swagger-options", "{}")),
             "page_title": self.options.get("page-title", "OpenAPI Specification"),
+            "urls": (
+                self._publish_tag_shards(
+                    spec,
+                    spec_cache.load(spec, stats) if bundled is None else bundled,
+                    target,
+                    static_url,
+                    digest,
+                )
+                if "split-by-tag" in self.options
+                else None
+            ),
         }
-        configs.append(config)
+        registry.add_config(self.env.docname, config)
 
         if config["full_page"]:
             return []
 
-        # Add the title, operations, and schema objects to the Sphinx search index.
-        spec_data = load_openapi_file(spec)
-        search_lines = openapi_lines_for_search(spec_data)
-        index_node = _build_search_index_node(search_lines, self)
+        limits = search_limits(app.config)
+        result: list[nodes.Node] = []
+        if needs.search_index:
+            # Add the title, operations, and schema objects to the Sphinx search index.
+            search_lines = spec_cache.search_lines(spec, stats, limits)
+            count("lines_indexed", len(search_lines))
+            result.append(_build_search_index_node(search_lines, self))
+
+        # Settings only the container uses stay out of the environment, so an inlined
+        # spec is pickled with the doctree only.
+        node["swagger"] = attributes = config | {
+            "search_url": None,
+            "lazy": "lazy" in self.options or app.config.swagger_lazy_load,
+        }
+        if app.config.swagger_search_shards:
+            shard_relpath = self._publish_search_shard(
+                spec_cache.load(spec, stats) if bundled is None else bundled,
+                target,
+                static_dir,
+                limits,
+            )
+            attributes["search_url"] = static_url + shard_relpath
+
+        with span("inline"):
+            # Swagger UI fetches the shard of the selected tag instead of the spec.
+            attributes["spec_json"] = (
+                None
+                if config["urls"]
+                else inline_spec(
+                    spec,
+                    app.config.swagger_inline_spec_max_bytes,
+                    stats,
+                    document=bundled,
+                )
+            )
+        node += self._overview_nodes(spec, stats, bundled)
+        result.append(node)
+        return result
+
+    def _shaken(
+        self,
+        spec: Path,
+        stats: Counter[str],
+        bundled: dict[str, Any] | None,
+        digest: str,
+    ) -> dict[str, Any] | None:
+        """Return the document to publish instead of *spec*.
+
+        The document is ``None`` if *spec* is published as it is.
+        """
+        options = shake_options(self.config)
+        if not options.enabled:
+            return bundled
+        with span("shake"):
+            shaken = shake_spec_once(
+                spec,
+                lambda: spec_cache.load(spec, stats) if bundled is None else bundled,
+                options,
+                digest,
+            )
+        return shaken.spec
+
+    def _overview_nodes(
+        self, spec: Path, stats: Counter[str], bundled: dict[str, Any] | None
+    ) -> list[SwaggerOverview]:
+        """Return the static overview of *spec*, if enabled."""
+        app = self.env.app
+        if not app.config.swagger_static_overview:
+            return []
+        document = spec_cache.load(spec, stats) if bundled is None else bundled
+        with span("overview"):
+            html = get_template(app, "overview_template.j2").render(
+                overview(document, _OVERVIEW_MAX_OPERATIONS)
+            )
+        return [SwaggerOverview(html=html)]
+
+    def _note_dependencies(self, paths: Iterable[Path]) -> list[str]:
+        """Re-read this document whenever one of *paths* changes; return their digests."""
+        registry = get_registry(self.env)
+        digests = []
+        for path in paths:
+            self.env.note_dependency(str(path))
+            digests.append(spec_cache.digest(path))
+            registry.spec_docs.setdefault(str(path), {})[self.env.docname] = digests[-1]
+        return digests
+
+    def _publish_tag_shards(
+        self,
+        spec: Path,
+        document: dict[str, Any],
+        target: Path,
+        static_url: str,
+        digest: str,
+    ) -> list[dict[str, str]] | None:
+        """Publish a spec per tag of *document* next to *target*; return their URLs.
+
+        *digest* identifies the content of *document*, see :func:`publish_spec`.
+        """
+        registry = get_registry(self.env)
+        static_dir = Path(self.env.app.builder.outdir, "_static")
+        urls = []
+        with span("publish"):
+            for shard in split_by_tag(document):
+                path = publish_spec(
+                    spec,
+                    target.with_name(f"{target.stem}.tag-{shard.slug}{target.suffix}"),
+                    self.config.swagger_spec_format,
+                    registry.cache_stats[self.env.docname],
+                    document=shard.spec,
+                    fingerprint=self.config.swagger_fingerprint_specs,
+                    digest=f"{digest}-tag-{shard.tag}",
+                )
+                count("bytes_published", path.stat().st_size)
+                relpath = path.relative_to(static_dir).as_posix()
+                registry.published[self.env.docname].append(relpath)
+                urls.append({"url": static_url + relpath, "name": shard.tag})
+        return urls or None
+
+    def _publish_search_shard(
+        self,
+        document: dict[str, Any],
+        target: Path,
+        static_dir: Path,
+        limits: SearchLimits,
+    ) -> str:
+        """Publish the search entries of *document* next to *target*; return its path."""
+        with span("shard"):
+            shard = publish_search_shard(
+                target.with_name(f"{target.stem}.search.json"),
+                openapi_search_entries(document, limits),
+                self.config.swagger_fingerprint_specs,
+            )
+        count("bytes_published", shard.stat().st_size)
+        relpath = shard.relative_to(static_dir).as_posix()
+        get_registry(self.env).published[self.env.docname].append(relpath)
+        return relpath
+
+
+def _static_url(app: Sphinx) -> str:
+    """Return the URL of the static output directory relative to the current document."""
+    path_offset = (
+        1
+        if app.builder.name == "dirhtml" and app.env.docname.split("/") != ["index"]
+        else 0
+    )
+    # The range - 1 is to skip the RST or MD document itself.
+    return (
+        "".join(
+            ["../" for _ in range(len(app.env.docname.split("/")) - 1 + path_offset)]
+        )
+        + "_static/"
+    )
+
 
-        div_id = self.options.get("id", "swagger-ui-container")
-        node = nodes.container(ids=[div_id], classes=self.options.get("classes", []))
-        self.set_source_info(node)
-        config["div_id"] = div_id
-        return [index_node, node]
+def outdated_by_specs(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    _added: set[str],
+    _changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    """Return the documents embedding a spec whose content changed since they were read.
+
+    Sphinx only compares modification times of dependencies, which misses specs
+    replaced by content with an older timestamp, e.g. when restored from an archive.
+    """
+    outdated: list[str] = []
+    for spec, docs in get_registry(env).spec_docs.items():
+        path = Path(spec)
+        digest = spec_cache.digest(path) if path.is_file() else ""
+        changed = [docname for docname, seen in docs.items() if seen != digest]
+        if changed:
+            logger.info(
+                "Spec changed, re-reading %d documents: %s.", len(changed), spec
+            )
+            outdated.extend(changed)
+    return outdated
+
+
+def outdated_by_needs(
+    app: Sphinx,
+    env: BuildEnvironment,
+    _added: set[str],
+    _changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    """Return the documents read by a builder that needed less than the active one.
+
+    Documents read by e.g. ``linkcheck`` did not publish their specs, so an HTML
+    build reusing the environment must read them again.
+    """
+    needs = get_build_needs(app)
+    outdated = [
+        docname
+        for docname, read_with in get_registry(env).needs.items()
+        if not read_with.covers(needs)
+    ]
+    if outdated:
+        logger.info(
+            "Specs were not processed for this builder, re-reading %d documents.",
+            len(outdated),
+        )
+    return outdated
+
+
+def configure_spec_cache(app: Sphinx) -> None:
+    """Point the spec cache at the doctree directory and reset its statistics.
+
+    What earlier builds of this process derived from specs is forgotten.
+    """
+    spec_cache.configure(
+        app.config.swagger_spec_cache_max_bytes,
+        Path(app.doctreedir) / "swagger_plugin",
+        app.config.swagger_stream_index_min_bytes,
+    )
+    get_registry(app.env).cache_stats.clear()
+    get_registry(app.env).profiles.clear()
+    forget_scanned_specs()
+    forget_shaken_specs()
+
+
+def finish_spec_cache(app: Sphinx, exception: Exception | None) -> None:
+    """Save the spec digests for the next build and log the cache hit and miss counts.
+
+    Search lines on disk of specs no document embeds anymore, or of other
+    search limits, are removed.
+    """
+    spec_cache.save_digests()
+    if exception is None:
+        spec_cache.prune_disk(
+            {
+                digest
+                for docs in get_registry(app.env).spec_docs.values()
+                for digest in docs.values()
+            },
+            search_limits(app.config),
+        )
+    total: Counter[str] = Counter()
+    for stats in get_registry(app.env).cache_stats.values():
+        total.update(stats)
+    if not total:
+        return
+    logger.info(
+        "Swagger spec cache: %d hits, %d disk hits, %d misses.",
+        total["hits"],
+        total["disk_hits"],
+        total["misses"],
+    )
+
+
+def _build_report_enabled(app: Sphinx) -> bool:
+    return bool(
+        app.config.swagger_build_report
+        or app.config.swagger_build_report_json
+        or app.config.swagger_build_trace
+    )
+
+
+def write_build_report(app: Sphinx, exception: Exception | None) -> None:
+    """Log the time spent per spec and write the JSON report and trace files."""
+    if exception is not None or not _build_report_enabled(app):
+        return
+    profiles = [
+        profile
+        for profiles in get_registry(app.env).profiles.values()
+        for profile in profiles
+    ]
+    if app.config.swagger_build_report:
+        logger.info("Swagger build report (ms):")
+        for line in format_summary(summarize(profiles)):
+            logger.info(line)
+    outdir = Path(app.builder.outdir)
+    if app.config.swagger_build_report_json:
+        path = outdir / app.config.swagger_build_report_json
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(path, profiles_json(profiles))
+    if app.config.swagger_build_trace:
+        path = outdir / app.config.swagger_build_trace
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(path, chrome_trace(profiles))
+
+
+def finish_publication(app: Sphinx, exception: Exception | None) -> None:
+    """Remove outdated fingerprinted specs and write the cache header snippets."""
+    if exception is not None or not get_build_needs(app).publish:
+        return
+    formats = app.config.swagger_cache_headers
+    if not app.config.swagger_fingerprint_specs:
+        if formats:
+            logger.warning(
+                "swagger_cache_headers requires swagger_fingerprint_specs, "
+                "no cache header snippets are written."
+            )
+        return
+
+    outdir = Path(app.builder.outdir)
+    static_dir = outdir / "_static"
+    published = {
+        relpath
+        for relpaths in get_registry(app.env).published.values()
+        for relpath in relpaths
+    }
+    for path in remove_stale_fingerprints(
+        static_dir, (static_dir / relpath for relpath in published)
+    ):
+        logger.info("Removed outdated spec from _static output path: %s.", path)
+    if "headers" in formats:
+        write_headers_file(outdir / HEADERS_FILE, headers_rules(published))
+    if "nginx" in formats:
+        write_nginx_file(outdir / NGINX_FILE)
+
+
+def precompress_published(app: Sphinx, exception: Exception | None) -> None:
+    """Write gzip siblings of the published specs and mirrored assets."""
+    if (
+        exception is not None
+        or not app.config.swagger_precompress
+        or not get_build_needs(app).publish
+    ):
+        return
+    static_dir = Path(app.builder.outdir) / "_static"
+    paths = [
+        static_dir / relpath
+        for relpaths in get_registry(app.env).published.values()
+        for relpath in relpaths
+    ]
+    if app.config.swagger_mirror_external_resources:
+        paths.extend(static_dir / Path(uri).name for uri in _asset_uris(app))
+    # Only written for pages with inline directives, precompress skips it otherwise.
+    paths.append(static_dir / LOADER_NAME)
+    results = precompress(
+        paths, Path(app.doctreedir) / "swagger_plugin" / "precompress.json"
+    )
+    compressed = [result for result in results if result.compressed_size is not None]
+    if not compressed:
+        return
+    size = sum(result.size for result in compressed)
+    compressed_size = sum(result.compressed_size or 0 for result in compressed)
+    logger.info(
+        "Precompressed %d files (%d written): %d -> %d bytes, %d bytes saved.",
+        len(compressed),
+        sum(result.written for result in compressed),
+        size,
+        compressed_size,
+        size - compressed_size,
+    )
+
+
+def _asset_uris(app: Sphinx) -> tuple[str, str, str]:
+    return (
+        app.config.swagger_present_uri,
+        app.config.swagger_bundle_uri,
+        app.config.swagger_css_uri,
+    )
+
+
+def mirror_external_resources(app: Sphinx, env: BuildEnvironment) -> None:
+    """Mirror the Swagger UI assets into the static output directory once per build.
+
+    Once all documents are read, so builds without any directive fetch nothing.
+    """
+    if not app.config.swagger_mirror_external_resources:
+        return
+    if not get_build_needs(app).publish or not any(get_registry(env).configs.values()):
+        return
+    cache_dir = app.config.swagger_mirror_cache_dir
+    mirror_assets(
+        _asset_uris(app),
+        Path(app.builder.outdir) / "_static",
+        Path(cache_dir) if cache_dir else default_cache_dir(),
+    )
 
 
 def add_css_js(
@@ -163,18 +601,13 @@ def add_css_js(
     _doctree: nodes.document,
 ) -> None:
     """Add Swagger CSS and JS to pages with swagger-plugin directive."""
-    configs = app.env.metadata[pagename].get("swagger_plugin", [])
+    configs = get_registry(app.env).configs.get(pagename, [])
 
     if not configs:
         return
     if configs[0]["full_page"]:
         return
 
-    with open(_HERE / "inline_template.j2", encoding="utf-8") as handle:
-        template = jinja2.Template(handle.read())
-
-    content = template.render({"specs": configs})
-
     if app.config.swagger_mirror_external_resources:
         # Change references of external resources to mirrored local names
         # folder "_static/" is added by Sphinx when the file is added as a static file.
@@ -189,38 +622,86 @@ def add_css_js(
     app.add_js_file(swagger_present_uri)
     app.add_js_file(swagger_bundle_uri)
     app.add_css_file(swagger_css_uri)
-    app.add_js_file(None, body=content)
+    app.add_js_file(LOADER_NAME)
 
 
-def render(app: Sphinx) -> Iterator[tuple[Any, ...]]:
-    """Render the swagger HTML pages."""
-    for pagename, context in app.env.metadata.items():
-        configs = context.get("swagger_plugin", [])
-        if not configs:
-            continue
-        config = configs[0]
-        if not config["full_page"]:
-            continue
+def _has_inline_directives(env: BuildEnvironment) -> bool:
+    return any(
+        configs and not configs[0]["full_page"]
+        for configs in get_registry(env).configs.values()
+    )
 
-        template_path = _HERE / "full_page_template.j2"
-        with template_path.open(encoding="utf-8") as handle:
-            template = jinja2.Template(handle.read())
 
+def write_loader(app: Sphinx, env: BuildEnvironment) -> None:
+    """Write the script mounting Swagger UI into the containers of all pages.
+
+    It is written once all documents are read, before any page refers to it,
+    and only if a page has an inline directive.
+    """
+    if not get_build_needs(app).publish:
+        return
+    loader = Path(app.builder.outdir) / "_static" / LOADER_NAME
+    if not _has_inline_directives(env):
+        loader.unlink(missing_ok=True)
+        return
+    profile = Profile(LOADER_NAME) if _build_report_enabled(app) else None
+    with profiling(profile), span("render"):
+        content = get_template(app, "loader_template.j2").render(
+            defaults=app.config.swagger_default_options
+        )
+    if profile is not None:
+        get_registry(env).profiles.setdefault(LOADER_NAME, []).append(profile)
+    write_if_changed(loader, content.encode("utf-8"))
+
+
+def render(app: Sphinx) -> Iterator[tuple[Any, ...]]:
+    """Render the swagger HTML pages whose inputs changed since they were written."""
+    registry = get_registry(app.env)
+    # Sphinx only collects pages from HTML builders.
+    builder = cast(StandaloneHTMLBuilder, app.builder)
+    template = get_template(app, "full_page_template.j2")
+    manifest = PageManifest(Path(app.doctreedir) / "swagger_plugin" / "full_pages.json")
+    for pagename in sorted(registry.full_pages):
+        config = registry.configs[pagename][0]
         params = {
-            "options": config["swagger_options"],
+            "options": app.config.swagger_default_options | config["swagger_options"],
             "css_uri": app.config.swagger_css_uri,
             "bundle_uri": app.config.swagger_bundle_uri,
             "present_uri": app.config.swagger_present_uri,
             "page_title": config["page_title"],
             "url_path": config["url_path"],
+            "urls": config.get("urls"),
         }
+        outfile = Path(builder.get_outfilename(pagename))
+        digest = inputs_digest(params, template)
+        if manifest.up_to_date(outfile, digest):
+            continue
 
         yield pagename, params, template
+        # Sphinx asks for the next page after writing this one.
+        manifest.record(outfile, digest)
+    manifest.save()
 
 
 def setup(app: Sphinx) -> dict[str, Any]:
     """Setup this plugin."""
-    app.add_node(SwaggerSearchIndex, html=(_visit_swagger_search_index_html, None))
+    # Other builders may reuse doctrees read for HTML, so they skip the node as well.
+    skip = (visit_swagger_search_index, None)
+    app.add_node(
+        SwaggerSearchIndex, html=skip, latex=skip, man=skip, texinfo=skip, text=skip
+    )
+    # Other builders render the container like any other, as it is one.
+    app.add_node(
+        SwaggerContainer, html=(visit_swagger_container, depart_swagger_container)
+    )
+    app.add_node(
+        SwaggerOverview,
+        html=(visit_swagger_overview, None),
+        latex=skip,
+        man=skip,
+        texinfo=skip,
+        text=skip,
+    )
 
     app.add_config_value(
         "swagger_present_uri",
@@ -247,6 +728,230 @@ def setup(app: Sphinx) -> dict[str, Any]:
         "the build time and the size of the output directory. Defaults to False.",
     )
 
+    app.add_config_value(
+        "swagger_mirror_cache_dir",
+        None,
+        "",
+        (str, type(None)),
+        "Directory in which mirrored resources are cached and revalidated between builds. "
+        "It can be shared by several projects. Defaults to "
+        "'$XDG_CACHE_HOME/swagger-plugin-for-sphinx/assets'.",
+    )
+    app.add_config_value(
+        "swagger_spec_format",
+        "source",
+        "env",
+        ENUM(*SPEC_FORMATS),
+        "Format in which specs are published: 'source' copies the spec as it is, "
+        "'json' publishes the parsed spec as minified JSON. Defaults to 'source'.",
+    )
+    app.add_config_value(
+        "swagger_fingerprint_specs",
+        False,
+        "env",
+        bool,
+        "If set to True, specs are published under a name containing a hash of their "
+        "content, e.g. 'openapi.3f2a9c0b17d4.yaml', so browsers can cache them forever. "
+        "Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_cache_headers",
+        (),
+        "",
+        ENUM(*CACHE_HEADER_FORMATS),
+        "Server configuration snippets marking fingerprinted specs as immutable: "
+        "'headers' writes a '_headers' file, 'nginx' writes 'swagger-plugin-nginx.conf' "
+        "into the output directory. Defaults to none.",
+    )
+    app.add_config_value(
+        "swagger_bundle_refs",
+        True,
+        "env",
+        bool,
+        "If set to True, references to other files in a spec are resolved at build time "
+        "and the spec is published as one document. Defaults to True.",
+    )
+    app.add_config_value(
+        "swagger_lazy_load",
+        False,
+        "env",
+        bool,
+        "If set to True, Swagger UI is only loaded for inline specs that are close to the "
+        "viewport or whose placeholder is clicked, as with the 'lazy' directive option. "
+        "Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_inline_spec_max_bytes",
+        0,
+        "env",
+        int,
+        "Specs of inline directives whose minified JSON is at most this many bytes are "
+        "embedded into the page instead of being fetched by Swagger UI. Defaults to 0, "
+        "which disables embedding.",
+    )
+    app.add_config_value(
+        "swagger_search_max_operations",
+        None,
+        "env",
+        (int, type(None)),
+        "Maximum number of operations of a spec added to the search index. "
+        "Defaults to None, which adds all operations.",
+    )
+    app.add_config_value(
+        "swagger_search_max_schemas",
+        None,
+        "env",
+        (int, type(None)),
+        "Maximum number of schemas of a spec added to the search index. "
+        "Defaults to None, which adds all schemas.",
+    )
+    app.add_config_value(
+        "swagger_search_description_length",
+        DEFAULT_DESCRIPTION_LENGTH,
+        "env",
+        int,
+        "Descriptions added to the search index are truncated to this many characters; "
+        "0 leaves them out. Defaults to 500.",
+    )
+    app.add_config_value(
+        "swagger_search_shards",
+        False,
+        "env",
+        bool,
+        "If set to True, the search entries of each inline spec are published as a "
+        "separate JSON file, and a search box above the Swagger UI container queries "
+        "them and links to the matching operations. Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_search_global_index",
+        True,
+        "env",
+        bool,
+        "If set to False, spec text is not added to the Sphinx search index, which keeps "
+        "it small, e.g. when swagger_search_shards is used. Defaults to True.",
+    )
+    app.add_config_value(
+        "swagger_spec_cache_max_bytes",
+        DEFAULT_MAX_BYTES,
+        "",
+        int,
+        "Upper bound, in bytes of spec source, for parsed specs kept in memory "
+        "between directives and builds of the same process. Defaults to 256 MiB.",
+    )
+
+    app.add_config_value(
+        "swagger_default_options",
+        {},
+        "html",
+        dict,
+        "Swagger UI options for all directives, which the swagger-options of a "
+        "directive extend. Defaults to none.",
+    )
+    app.add_config_value(
+        "swagger_publish_method",
+        "copy",
+        "",
+        ENUM(*PLACE_METHODS),
+        "How specs published as they are get into the output directory: 'copy', "
+        "'hardlink' or 'reflink'. Links fall back to copies where they are not "
+        "possible. Defaults to 'copy'.",
+    )
+    app.add_config_value(
+        "swagger_prune_components",
+        False,
+        "env",
+        bool,
+        "If set to True, components that are not referenced outside the components "
+        "are removed from published specs. Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_strip_extensions",
+        [],
+        "env",
+        list,
+        "Glob patterns of vendor extensions, such as 'x-internal-*', that are removed "
+        "from published specs. Defaults to none.",
+    )
+    app.add_config_value(
+        "swagger_max_example_bytes",
+        0,
+        "env",
+        int,
+        "Examples larger than this number of bytes as JSON are removed from published "
+        "specs. Defaults to 0, which keeps all examples.",
+    )
+    app.add_config_value(
+        "swagger_static_overview",
+        False,
+        "env",
+        bool,
+        "If set to True, inline directives show a static list of the spec's operations "
+        "until Swagger UI has loaded. Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_precompress",
+        False,
+        "",
+        bool,
+        "If set to True, gzip compressed copies with a .gz suffix are written next to "
+        "published specs and mirrored assets, for hosts serving precompressed files. "
+        "Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_stream_index_min_bytes",
+        DEFAULT_STREAM_MIN_BYTES,
+        "",
+        int,
+        "JSON specs of at least this many bytes are not parsed for the search index, "
+        "only the fields it uses are read, in chunks, which bounds memory use. "
+        "Defaults to 64 MiB; 0 always parses the whole spec.",
+    )
+    app.add_config_value(
+        "swagger_preparse_workers",
+        0,
+        "",
+        int,
+        "Number of processes that parse the specs of the documents to read before "
+        "reading starts. Defaults to 0, which parses each spec when it is first read.",
+    )
+    app.add_config_value(
+        "swagger_build_report",
+        False,
+        "",
+        bool,
+        "If set to True, the time spent per spec is logged at the end of the build. "
+        "Defaults to False.",
+    )
+    app.add_config_value(
+        "swagger_build_report_json",
+        None,
+        "",
+        (str, type(None)),
+        "Path, relative to the output directory, the timings of the build are written "
+        "to as JSON. Defaults to None, which writes no report.",
+    )
+    app.add_config_value(
+        "swagger_build_trace",
+        None,
+        "",
+        (str, type(None)),
+        "Path, relative to the output directory, the timings of the build are written "
+        "to in the Chrome trace event format. Defaults to None, which writes no trace.",
+    )
+
+    app.connect("builder-inited", init_build_needs)
+    app.connect("builder-inited", configure_spec_cache)
+    app.connect("env-updated", mirror_external_resources)
+    app.connect("env-updated", write_loader)
+    app.connect("env-merge-info", merge_info)
+    app.connect("env-purge-doc", purge_doc)
+    app.connect("env-before-read-docs", preparse_specs)
+    app.connect("env-get-outdated", outdated_by_specs)
+    app.connect("env-get-outdated", outdated_by_needs)
+    app.connect("build-finished", finish_publication)
+    app.connect("build-finished", precompress_published)
+    app.connect("build-finished", finish_spec_cache)
+    app.connect("build-finished", write_build_report)
     app.connect("html-collect-pages", render)
     app.connect("html-page-context", add_css_js)
 
@@ -254,5 +959,7 @@ def setup(app: Sphinx) -> dict[str, Any]:
 
     return {
         "version": version("swagger_plugin_for_sphinx"),
+        "env_version": 6,
         "parallel_read_safe": True,
+        "parallel_write_safe": True,
     }
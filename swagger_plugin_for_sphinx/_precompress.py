@@ -0,0 +1,88 @@
+"""Write gzip compressed siblings of published files for static hosting."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from swagger_plugin_for_sphinx._fileutil import (
+    read_manifest,
+    write_atomic,
+    write_manifest,
+)
+
+GZIP_SUFFIX = ".gz"
+
+
+@dataclass(frozen=True, slots=True)
+class Compressed:
+    """The outcome of precompressing one file."""
+
+    path: Path
+    digest: str
+    size: int
+    # None if compression does not make the file smaller.
+    compressed_size: int | None
+    # Whether the sibling was written, as opposed to being up to date.
+    written: bool
+
+
+def gzip_sibling(path: Path) -> Path:
+    """Return the path of the compressed sibling of *path*."""
+    return path.with_name(path.name + GZIP_SUFFIX)
+
+
+def _up_to_date(sibling: Path, compressed_size: int | None) -> bool:
+    if compressed_size is None:
+        return not sibling.exists()
+    return sibling.is_file() and sibling.stat().st_size == compressed_size
+
+
+def _compress(path: Path, known: object) -> Compressed:
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    sibling = gzip_sibling(path)
+    if isinstance(known, list) and len(known) == 2 and known[0] == digest:
+        compressed_size = known[1] if isinstance(known[1], int) else None
+        if _up_to_date(sibling, compressed_size):
+            return Compressed(path, digest, len(data), compressed_size, False)
+    # A fixed mtime keeps the output identical for identical input.
+    payload = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(payload) >= len(data):
+        sibling.unlink(missing_ok=True)
+        return Compressed(path, digest, len(data), None, False)
+    write_atomic(sibling, payload)
+    return Compressed(path, digest, len(data), len(payload), True)
+
+
+def precompress(paths: Iterable[Path], manifest: Path) -> list[Compressed]:
+    """Write a gzip sibling next to each file of *paths*, in a thread pool.
+
+    Files whose content digest and sibling size are recorded in *manifest* are
+    not compressed again. Siblings are only written if they are smaller. The
+    siblings of *paths* that do not exist anymore are removed.
+    """
+    known = read_manifest(manifest)
+    unique = []
+    for path in dict.fromkeys(paths):
+        if path.is_file():
+            unique.append(path)
+        else:
+            gzip_sibling(path).unlink(missing_ok=True)
+    with ThreadPoolExecutor(
+        max_workers=min(len(unique), os.cpu_count() or 1) or 1
+    ) as pool:
+        results = list(
+            pool.map(lambda path: _compress(path, known.get(str(path))), unique)
+        )
+    recorded: dict[str, object] = {
+        str(result.path): [result.digest, result.compressed_size] for result in results
+    }
+    if recorded != known:
+        write_manifest(manifest, recorded)
+    return results
@@ -0,0 +1,95 @@
+"""Parse the specs of the documents to read in a process pool before reading."""
+
+from __future__ import annotations
+
+import multiprocessing
+import re
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+from sphinx.util import logging
+
+from swagger_plugin_for_sphinx._build_needs import get_build_needs
+from swagger_plugin_for_sphinx._openapi_index import SearchLimits, search_limits
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+
+logger = logging.getLogger(__name__)
+_FORK = "fork" in multiprocessing.get_all_start_methods()
+
+# The argument and options of the directive in reStructuredText and MyST sources.
+_DIRECTIVE = re.compile(
+    r"^[ \t]*(?:\.\.[ \t]+swagger-plugin::|(?:`{3,}|:{3,})\{swagger-plugin\})"
+    r"[ \t]+(\S+)((?:\n[ \t]*:[\w-]+:.*)*)",
+    re.MULTILINE,
+)
+
+
+def referenced_specs(env: BuildEnvironment, docnames: Iterable[str]) -> list[Path]:
+    """Return the existing spec files shown inline by directives in *docnames*.
+
+    Each file is returned once. Specs only shown as full pages are left out,
+    as their text is not indexed. This is a plain text scan, directives in
+    included files or generated sources are not found. Missed specs are
+    parsed when they are read.
+    """
+    specs: dict[Path, None] = {}
+    for docname in docnames:
+        try:
+            source = env.doc2path(docname).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        for argument, options in _DIRECTIVE.findall(source):
+            if ":full-page:" in options:
+                continue
+            path = Path(env.relfn2path(argument, docname)[1]).resolve()
+            if path.is_file():
+                specs[path] = None
+    return list(specs)
+
+
+def _search_lines(path: Path, limits: SearchLimits) -> list[str]:
+    # Runs in a forked worker, whose spec cache also writes the lines to disk.
+    return spec_cache.search_lines(path, limits=limits)
+
+
+def preparse_specs(app: Sphinx, env: BuildEnvironment, docnames: list[str]) -> None:
+    """Fill the spec cache with the search lines of the specs of *docnames*.
+
+    The specs are parsed in parallel. Only the search lines are sent back, as
+    sending the parsed specs costs about as much as parsing them here. Specs
+    whose search lines are cached, or that are parsed already, are skipped.
+    """
+    workers = app.config.swagger_preparse_workers
+    needs = get_build_needs(app)
+    if workers < 1 or not needs.search_index:
+        return
+    if not _FORK:
+        logger.info("Specs are not pre-parsed, this platform cannot fork processes.")
+        return
+    limits = search_limits(app.config)
+    pending = [
+        path
+        for path in referenced_specs(env, docnames)
+        if not spec_cache.has_search_lines(path, limits)
+        and not spec_cache.contains(path)
+    ]
+    # A single spec is parsed as fast by the directive, without starting processes.
+    if len(pending) < 2:
+        return
+
+    workers = min(workers, len(pending))
+    # Fork like Sphinx's parallel builds, spawned workers would run the main module again.
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        futures: dict[Path, Future[list[str]]] = {
+            path: pool.submit(_search_lines, path, limits) for path in pending
+        }
+        for path, future in futures.items():
+            if future.exception() is not None:
+                # The directive parses the spec again and reports the error.
+                continue
+            spec_cache.add_search_lines(path, limits, future.result())
+    logger.info("Pre-parsed %d specs in %d processes.", len(pending), workers)
@@ -0,0 +1,241 @@
+"""Publish specs into the static output directory."""
+
+from __future__ import annotations
+
+import datetime
+import glob
+import hashlib
+import json
+import re
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import yaml
+from sphinx.util import logging
+
+from swagger_plugin_for_sphinx._fileutil import place_file, write_atomic
+from swagger_plugin_for_sphinx._precompress import gzip_sibling
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+from swagger_plugin_for_sphinx._spec_loader import detect_file_format
+
+logger = logging.getLogger(__name__)
+
+SPEC_FORMATS = ("source", "json")
+FINGERPRINT_LENGTH = 12
+_FINGERPRINT = re.compile(f"[0-9a-f]{{{FINGERPRINT_LENGTH}}}")
+
+# Specs published by this process, by target, format, content digest and method.
+_published: dict[tuple[str, str, bool, str | None, str], Path] = {}
+
+
+def _json_default(value: Any) -> Any:
+    # YAML parses unquoted timestamps, JSON has no such type.
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def minified_json(spec: dict[str, Any]) -> bytes:
+    """Serialize *spec* as compact JSON."""
+    return json.dumps(
+        spec,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+        default=_json_default,
+    ).encode("utf-8")
+
+
+def serialized_spec(spec: dict[str, Any], source: Path) -> bytes:
+    """Serialize *spec* in the format of its *source* file, for human readers."""
+    if detect_file_format(source) == "json":
+        text = json.dumps(spec, indent=2, ensure_ascii=False, default=_json_default)
+        return (text + "\n").encode("utf-8")
+    return yaml.dump(
+        spec,
+        Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+        sort_keys=False,
+        allow_unicode=True,
+    ).encode("utf-8")
+
+
+def inline_spec(
+    source: Path,
+    max_bytes: int,
+    stats: Counter[str] | None = None,
+    *,
+    document: dict[str, Any] | None = None,
+) -> str | None:
+    """Return the spec as JSON for embedding into a ``<script>``, if small enough.
+
+    *document* replaces the parsed *source*, e.g. with its bundled form.
+    Returns ``None`` if the spec is larger than *max_bytes* as minified JSON or
+    cannot be represented as JSON.
+    """
+    if max_bytes <= 0:
+        return None
+    # Minified JSON is rarely larger than its source, don't parse sources far above the limit.
+    if document is None and source.stat().st_size > 2 * max_bytes:
+        return None
+    try:
+        payload = minified_json(
+            spec_cache.load(source, stats) if document is None else document
+        )
+    except (TypeError, ValueError):
+        return None
+    if len(payload) > max_bytes:
+        return None
+    # Keep the HTML parser from ending the script element inside a string, the
+    # escape is valid in JSON and JavaScript alike.
+    return payload.decode("utf-8").replace("<", "\\u003c")
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Write *data* to *path* unless it already has that content."""
+    if (
+        path.is_file()
+        and path.stat().st_size == len(data)
+        and path.read_bytes() == data
+    ):
+        return False
+    write_atomic(path, data)
+    return True
+
+
+def fingerprinted(target: Path, digest: str) -> Path:
+    """Return *target* with the start of the content *digest* before its suffix."""
+    return target.with_name(
+        f"{target.stem}.{digest[:FINGERPRINT_LENGTH]}{target.suffix}"
+    )
+
+
+def _write_payload(target: Path, payload: bytes, fingerprint: bool) -> Path:
+    if fingerprint:
+        target = fingerprinted(target, hashlib.sha256(payload).hexdigest())
+    write_if_changed(target, payload)
+    return target
+
+
+def _publish(
+    source: Path,
+    target: Path,
+    spec_format: str,
+    stats: Counter[str] | None,
+    document: dict[str, Any] | None,
+    fingerprint: bool,
+    method: str,
+) -> Path:
+    if spec_format == "json":
+        try:
+            payload = minified_json(
+                spec_cache.load(source, stats) if document is None else document
+            )
+        except (TypeError, ValueError) as exc:
+            logger.warning(
+                "Cannot publish %s as JSON, publishing it as is: %s", source, exc
+            )
+        else:
+            size = source.stat().st_size
+            logger.info(
+                "Adding to _static output path: %s as minified JSON (%d -> %d bytes, %+.0f%%).",
+                source,
+                size,
+                len(payload),
+                (len(payload) - size) / max(size, 1) * 100,
+            )
+            return _write_payload(target.with_suffix(".json"), payload, fingerprint)
+
+    if document is not None:
+        payload = serialized_spec(document, source)
+        size = source.stat().st_size
+        logger.info(
+            "Adding to _static output path: %s, rewritten (%d -> %d bytes, %+.0f%%).",
+            source,
+            size,
+            len(payload),
+            (len(payload) - size) / max(size, 1) * 100,
+        )
+        return _write_payload(target, payload, fingerprint)
+
+    if fingerprint:
+        target = fingerprinted(target, spec_cache.digest(source))
+    how = place_file(source, target, method)
+    logger.info("Adding to _static output path: %s (%s).", source, how)
+    return target
+
+
+def publish_spec(
+    source: Path,
+    target: Path,
+    spec_format: str,
+    stats: Counter[str] | None = None,
+    *,
+    document: dict[str, Any] | None = None,
+    fingerprint: bool = False,
+    digest: str | None = None,
+    method: str = "copy",
+) -> Path:
+    """Publish the spec *source* as *target* and return the path actually written.
+
+    With the ``json`` format, the parsed spec is written as minified JSON next
+    to *target*, with a ``.json`` suffix, so browsers need not parse YAML.
+    Specs that cannot be represented as JSON are published as they are.
+    *document* replaces the parsed *source*, e.g. with its bundled form, and
+    is serialized in the format of *source* unless JSON is requested.
+
+    With *fingerprint*, the file name contains a hash of the published content,
+    so it can be cached by browsers forever. If *digest* identifies the content
+    of the spec and all files it references, a spec already published by this
+    process is not published again.
+
+    Specs published as they are, are copied, hard linked or reflinked as
+    *method* says, see :func:`place_file`.
+    """
+    key = (str(target), spec_format, fingerprint, digest, method)
+    if digest is not None:
+        published = _published.get(key)
+        if published is not None and published.is_file():
+            return published
+    published = _publish(
+        source, target, spec_format, stats, document, fingerprint, method
+    )
+    if digest is not None:
+        _published[key] = published
+    return published
+
+
+def publish_search_shard(
+    target: Path, entries: list[dict[str, str]], fingerprint: bool = False
+) -> Path:
+    """Write the search *entries* of a spec as minified JSON and return the path written."""
+    return _write_payload(target, minified_json({"entries": entries}), fingerprint)
+
+
+def _original_stem(path: Path) -> str | None:
+    stem, _, fingerprint = path.stem.rpartition(".")
+    return stem if stem and _FINGERPRINT.fullmatch(fingerprint) else None
+
+
+def remove_stale_fingerprints(
+    static_dir: Path, published: Iterable[Path]
+) -> list[Path]:
+    """Remove earlier fingerprinted versions of the *published* specs.
+
+    Only files named like a fingerprinted version of a published spec are
+    removed, other files in *static_dir* are left alone.
+    """
+    keep = set(published)
+    removed: list[Path] = []
+    for path in keep:
+        stem = _original_stem(path)
+        if stem is None:
+            continue
+        for candidate in path.parent.glob(f"{glob.escape(stem)}.*{path.suffix}"):
+            if candidate not in keep and _original_stem(candidate) == stem:
+                candidate.unlink()
+                # Precompressed copies go with the file.
+                gzip_sibling(candidate).unlink(missing_ok=True)
+                removed.append(candidate.relative_to(static_dir))
+    return removed
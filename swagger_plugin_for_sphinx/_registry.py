@@ -0,0 +1,106 @@
+"""Plugin state stored in the Sphinx build environment."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+
+from swagger_plugin_for_sphinx._build_needs import BuildNeeds
+from swagger_plugin_for_sphinx._perf import Profile
+
+_ATTRIBUTE = "swagger_plugin_registry"
+
+
+@dataclass(slots=True)
+class SwaggerRegistry:
+    """Everything the plugin records while reading documents.
+
+    All entries are keyed by document name, so a document's state can be
+    purged before it is read again and merged from parallel read workers.
+    """
+
+    # The configuration of each directive, per document.
+    configs: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    # Absolute spec path to the embedding documents and the spec digest they read.
+    spec_docs: dict[str, dict[str, str]] = field(default_factory=dict)
+    # Spec cache hits and misses of the current build, per document.
+    cache_stats: dict[str, Counter[str]] = field(default_factory=dict)
+    # Published spec paths relative to the static output directory, per document.
+    published: dict[str, list[str]] = field(default_factory=dict)
+    # What the builder that read each document needed from its specs.
+    needs: dict[str, BuildNeeds] = field(default_factory=dict)
+    # Documents replaced by a full Swagger UI page.
+    full_pages: set[str] = field(default_factory=set)
+    # Timings of the directives and page renders of the current build, per document.
+    profiles: dict[str, list[Profile]] = field(default_factory=dict)
+
+    def add_config(self, docname: str, config: dict[str, Any]) -> None:
+        """Record the configuration of a directive in *docname*."""
+        configs = self.configs.setdefault(docname, [])
+        configs.append(config)
+        # The first directive of a document decides whether it is a full page.
+        if configs[0]["full_page"]:
+            self.full_pages.add(docname)
+
+    def purge(self, docname: str) -> None:
+        """Forget everything recorded for *docname*."""
+        self.configs.pop(docname, None)
+        self.cache_stats.pop(docname, None)
+        self.published.pop(docname, None)
+        self.needs.pop(docname, None)
+        self.full_pages.discard(docname)
+        self.profiles.pop(docname, None)
+        for spec, docs in list(self.spec_docs.items()):
+            docs.pop(docname, None)
+            if not docs:
+                del self.spec_docs[spec]
+
+    def merge(self, docnames: Iterable[str], other: SwaggerRegistry) -> None:
+        """Take over the entries of *docnames* from a parallel read worker."""
+        merged = set(docnames)
+        for docname in merged:
+            if docname in other.configs:
+                self.configs[docname] = other.configs[docname]
+            if docname in other.cache_stats:
+                self.cache_stats[docname] = other.cache_stats[docname]
+            if docname in other.published:
+                self.published[docname] = other.published[docname]
+            if docname in other.needs:
+                self.needs[docname] = other.needs[docname]
+            if docname in other.full_pages:
+                self.full_pages.add(docname)
+            if docname in other.profiles:
+                self.profiles[docname] = other.profiles[docname]
+        for spec, docs in other.spec_docs.items():
+            for docname, digest in docs.items():
+                if docname in merged:
+                    self.spec_docs.setdefault(spec, {})[docname] = digest
+
+
+def get_registry(env: BuildEnvironment) -> SwaggerRegistry:
+    """Return the registry of *env*, creating it on first use."""
+    registry: SwaggerRegistry | None = getattr(env, _ATTRIBUTE, None)
+    if registry is None:
+        registry = SwaggerRegistry()
+        setattr(env, _ATTRIBUTE, registry)
+    return registry
+
+
+def purge_doc(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    """Remove a document from the registry before it is read again."""
+    get_registry(env).purge(docname)
+
+
+def merge_info(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: Iterable[str],
+    other: BuildEnvironment,
+) -> None:
+    """Merge the registry of a parallel read worker."""
+    get_registry(env).merge(docnames, get_registry(other))
@@ -0,0 +1,301 @@
+"""Content-addressed cache for parsed OpenAPI documents and their search lines."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sphinx.errors import ExtensionError
+
+from swagger_plugin_for_sphinx._fileutil import (
+    read_manifest,
+    write_atomic,
+    write_manifest,
+)
+from swagger_plugin_for_sphinx._openapi_index import (
+    DEFAULT_SEARCH_LIMITS,
+    SEARCH_FORMAT_VERSION,
+    SearchLimits,
+    load_openapi_file,
+    load_openapi_index_fields,
+    openapi_lines_for_search,
+)
+from swagger_plugin_for_sphinx._perf import span
+from swagger_plugin_for_sphinx._spec_loader import detect_file_format
+
+_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(slots=True)
+class _Entry:
+    size: int
+    spec: dict[str, Any] | None = None
+    search_lines: dict[SearchLimits, list[str]] = field(default_factory=dict)
+
+
+def _disk_name(digest: str, limits: SearchLimits) -> str:
+    return f"{digest}.{limits.key}.v{SEARCH_FORMAT_VERSION}.json"
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of the file at *path*."""
+    sha = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class SpecCache:
+    """Byte-bounded LRU of parsed specs, keyed by the SHA-256 of the spec content.
+
+    Derived search lines are additionally persisted as JSON files in
+    :attr:`cache_dir`, so forked read workers and later builds can reuse them
+    without parsing the spec again. So are the digests of the files with their
+    modification time and size, so later builds need not hash unchanged files.
+    Lookups count ``hits``, ``disk_hits`` and ``misses`` into the optional
+    *stats* counter. Returned objects are shared and must not be mutated by
+    callers.
+    """
+
+    def __init__(
+        self, max_bytes: int, stream_min_bytes: int = DEFAULT_STREAM_MIN_BYTES
+    ) -> None:
+        """Create an empty cache retaining at most *max_bytes* of spec source.
+
+        Search lines of JSON specs of at least *stream_min_bytes* are extracted
+        from the fields they use, read in chunks, unless the spec is parsed
+        anyway. 0 always parses the whole spec.
+        """
+        self.max_bytes = max_bytes
+        self.stream_min_bytes = stream_min_bytes
+        self.cache_dir: Path | None = None
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._total_bytes = 0
+        self._digests: dict[Path, tuple[int, int, str]] = {}
+        self._lock = threading.RLock()
+
+    def configure(
+        self,
+        max_bytes: int,
+        cache_dir: Path | None,
+        stream_min_bytes: int = DEFAULT_STREAM_MIN_BYTES,
+    ) -> None:
+        """Apply the limits of a new build."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.stream_min_bytes = stream_min_bytes
+            self.cache_dir = cache_dir
+            self._evict()
+            if cache_dir is not None:
+                self._load_digests(cache_dir / "digests.json")
+
+    def _load_digests(self, path: Path) -> None:
+        for name, known in read_manifest(path).items():
+            if (
+                isinstance(known, list)
+                and len(known) == 3
+                and isinstance(known[0], int)
+                and isinstance(known[1], int)
+                and isinstance(known[2], str)
+            ):
+                # Digests computed by this process are at least as recent.
+                self._digests.setdefault(Path(name), (known[0], known[1], known[2]))
+
+    def save_digests(self) -> None:
+        """Persist the digests of the files that still exist, if they changed."""
+        if self.cache_dir is None:
+            return
+        with self._lock:
+            known = dict(self._digests)
+        manifest: dict[str, object] = {
+            str(path): list(entry) for path, entry in known.items() if path.is_file()
+        }
+        path = self.cache_dir / "digests.json"
+        if manifest != read_manifest(path):
+            write_manifest(path, manifest)
+
+    def digest(self, path: Path) -> str:
+        """Return the content digest of *path*, skipping hashing if mtime and size match."""
+        stat = path.stat()
+        with self._lock:
+            known = self._digests.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def load(self, path: Path, stats: Counter[str] | None = None) -> dict[str, Any]:
+        """Return the parsed spec at *path*."""
+        stats = Counter() if stats is None else stats
+        digest = self.digest(path)
+        with self._lock:
+            entry = self._lookup(digest)
+            if entry and entry.spec is not None:
+                stats["hits"] += 1
+                return entry.spec
+        with span("parse"):
+            spec = load_openapi_file(path)
+        stats["misses"] += 1
+        with self._lock:
+            self._store(digest, path).spec = spec
+        return spec
+
+    def search_lines(
+        self,
+        path: Path,
+        stats: Counter[str] | None = None,
+        limits: SearchLimits = DEFAULT_SEARCH_LIMITS,
+    ) -> list[str]:
+        """Return the search index lines for the spec at *path*, bounded by *limits*."""
+        stats = Counter() if stats is None else stats
+        digest = self.digest(path)
+        with self._lock:
+            entry = self._lookup(digest)
+            if entry and limits in entry.search_lines:
+                stats["hits"] += 1
+                return entry.search_lines[limits]
+        lines = self._read_disk(digest, limits)
+        if lines is not None:
+            stats["disk_hits"] += 1
+            with self._lock:
+                self._store(digest, path).search_lines[limits] = lines
+            return lines
+        spec = self._index_fields(path, digest, stats)
+        with span("index"):
+            lines = openapi_lines_for_search(spec, limits)
+        self._write_disk(digest, limits, lines)
+        with self._lock:
+            self._store(digest, path).search_lines[limits] = lines
+        return lines
+
+    def contains(self, path: Path) -> bool:
+        """Return whether the parsed spec at *path* is in memory."""
+        digest = self.digest(path)
+        with self._lock:
+            entry = self._entries.get(digest)
+            return entry is not None and entry.spec is not None
+
+    def has_search_lines(self, path: Path, limits: SearchLimits) -> bool:
+        """Return whether the search lines of *path* are in memory or on disk."""
+        digest = self.digest(path)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and limits in entry.search_lines:
+                return True
+        disk_path = self._disk_path(digest, limits)
+        return disk_path is not None and disk_path.is_file()
+
+    def add_search_lines(
+        self, path: Path, limits: SearchLimits, search_lines: list[str]
+    ) -> None:
+        """Retain the search lines of *path*, computed and stored on disk elsewhere."""
+        digest = self.digest(path)
+        with self._lock:
+            self._store(digest, path).search_lines[limits] = search_lines
+
+    def _index_fields(
+        self, path: Path, digest: str, stats: Counter[str]
+    ) -> dict[str, Any]:
+        """Return the parsed spec, or only its search fields for large JSON specs."""
+        with self._lock:
+            entry = self._lookup(digest)
+        if (entry and entry.spec is not None) or not self._streams(path):
+            return self.load(path, stats)
+        with span("parse"):
+            try:
+                fields = load_openapi_index_fields(path)
+            except ExtensionError:
+                # Report errors, e.g. of YAML specs with a JSON extension, like a full load.
+                return self.load(path, stats)
+        stats["misses"] += 1
+        return fields
+
+    def _streams(self, path: Path) -> bool:
+        if not 0 < self.stream_min_bytes <= path.stat().st_size:
+            return False
+        return detect_file_format(path) == "json"
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self._total_bytes = 0
+
+    def _lookup(self, digest: str) -> _Entry | None:
+        entry = self._entries.get(digest)
+        if entry:
+            self._entries.move_to_end(digest)
+        return entry
+
+    def _store(self, digest: str, path: Path) -> _Entry:
+        entry = self._entries.get(digest)
+        if entry:
+            self._entries.move_to_end(digest)
+            return entry
+        entry = _Entry(size=path.stat().st_size)
+        # Oversized specs are still returned to the caller, just never retained.
+        if entry.size <= self.max_bytes:
+            self._entries[digest] = entry
+            self._total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.size
+
+    def _disk_path(self, digest: str, limits: SearchLimits) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / "search" / _disk_name(digest, limits)
+
+    def _read_disk(self, digest: str, limits: SearchLimits) -> list[str] | None:
+        path = self._disk_path(digest, limits)
+        if path is None or not path.is_file():
+            return None
+        try:
+            with path.open(encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, list) or not all(isinstance(x, str) for x in data):
+            return None
+        return data
+
+    def prune_disk(self, digests: Iterable[str], limits: SearchLimits) -> int:
+        """Remove the search lines on disk of other specs, limits or versions; return how many."""
+        if self.cache_dir is None:
+            return 0
+        keep = {_disk_name(digest, limits) for digest in digests}
+        removed = 0
+        for path in (self.cache_dir / "search").glob("*.json"):
+            if path.name not in keep:
+                with contextlib.suppress(OSError):
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def _write_disk(self, digest: str, limits: SearchLimits, lines: list[str]) -> None:
+        path = self._disk_path(digest, limits)
+        if path is None:
+            return
+        # The disk cache is an optimization, a read-only doctree dir must not fail the build.
+        with contextlib.suppress(OSError):
+            write_atomic(path, json.dumps(lines, ensure_ascii=False).encode("utf-8"))
+
+
+spec_cache = SpecCache(DEFAULT_MAX_BYTES)
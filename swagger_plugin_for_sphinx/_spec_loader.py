@@ -0,0 +1,119 @@
+"""Format detection and pluggable parser backends for OpenAPI documents."""
+
+from __future__ import annotations
+
+import importlib
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import yaml
+
+SpecFormat = Literal["json", "yaml"]
+JsonLoads = Callable[[bytes], Any]
+
+_JSON_SUFFIXES = frozenset((".json",))
+_YAML_SUFFIXES = frozenset((".yaml", ".yml"))
+_BOM = b"\xef\xbb\xbf"
+# Enough of a file to find its first non-whitespace byte.
+_HEAD_SIZE = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class _JsonBackend:
+    name: str
+    loads: JsonLoads
+    priority: int
+
+
+_JSON_BACKENDS: dict[str, _JsonBackend] = {}
+
+
+def register_json_backend(
+    name: str, loads: Callable[[bytes], Any], *, priority: int = 0
+) -> None:
+    """Register a JSON parser for OpenAPI documents.
+
+    *loads* receives the raw bytes of the document and must raise a
+    :class:`ValueError` for invalid input. The backend with the highest
+    *priority* is used; registering an existing *name* replaces it.
+    """
+    _JSON_BACKENDS[name] = _JsonBackend(name, loads, priority)
+
+
+def json_backend_names() -> list[str]:
+    """Return the registered JSON backends, preferred first."""
+    backends = sorted(_JSON_BACKENDS.values(), key=lambda b: b.priority, reverse=True)
+    return [backend.name for backend in backends]
+
+
+def yaml_loader() -> type[yaml.SafeLoader] | type[yaml.CSafeLoader]:
+    """Return the libyaml based safe loader if available, else the pure Python one."""
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def detect_format(path: Path, raw: bytes) -> SpecFormat:
+    """Guess the format from the file extension or the first non-whitespace byte."""
+    suffix = path.suffix.lower()
+    if suffix in _JSON_SUFFIXES:
+        return "json"
+    if suffix in _YAML_SUFFIXES:
+        return "yaml"
+    head = raw[len(_BOM) :] if raw.startswith(_BOM) else raw
+    head = head.lstrip()[:1]
+    return "json" if head in {b"{", b"["} else "yaml"
+
+
+def detect_file_format(path: Path) -> SpecFormat:
+    """Like :func:`detect_format`, reading only the start of the file if needed."""
+    if path.suffix.lower() in _JSON_SUFFIXES | _YAML_SUFFIXES:
+        return detect_format(path, b"")
+    with path.open("rb") as handle:
+        return detect_format(path, handle.read(_HEAD_SIZE))
+
+
+def _parse_json(raw: bytes, backend: str | None) -> Any:
+    name = backend or json_backend_names()[0]
+    return _JSON_BACKENDS[name].loads(raw)
+
+
+def _parse_yaml(raw: bytes) -> Any:
+    return yaml.load(raw.decode("utf-8-sig"), Loader=yaml_loader())
+
+
+def parse_spec(raw: bytes, path: Path, *, json_backend: str | None = None) -> Any:
+    """Parse *raw* as JSON or YAML, depending on :func:`detect_format`.
+
+    If the detected format does not parse, the other format is tried before
+    the original error is raised, as JSON documents are valid YAML and
+    extensions are not always accurate.
+    """
+    if detect_format(path, raw) == "json":
+        try:
+            return _parse_json(raw, json_backend)
+        except ValueError as exc:
+            try:
+                return _parse_yaml(raw)
+            except yaml.YAMLError:
+                raise exc from None
+    try:
+        return _parse_yaml(raw)
+    except yaml.YAMLError as exc:
+        try:
+            return _parse_json(raw, json_backend)
+        except ValueError:
+            raise exc from None
+
+
+def _register_default_backends() -> None:
+    register_json_backend("json", json.loads)
+    try:
+        orjson = importlib.import_module("orjson")
+    except ImportError:
+        return
+    register_json_backend("orjson", orjson.loads, priority=10)  # pragma: no cover
+
+
+_register_default_backends()
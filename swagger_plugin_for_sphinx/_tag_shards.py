@@ -0,0 +1,119 @@
+"""Split a spec into one self-contained spec per tag."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from swagger_plugin_for_sphinx._components import (
+    component_roots,
+    prune_components,
+    reachable_components,
+)
+from swagger_plugin_for_sphinx._openapi_index import HTTP_METHODS
+
+# Swagger UI lists operations without tags under this name.
+DEFAULT_TAG = "default"
+_UNSAFE = re.compile(r"[^\w-]+")
+
+
+@dataclass(frozen=True, slots=True)
+class TagShard:
+    """The operations of one tag, with the components they reference."""
+
+    tag: str
+    # Unique among the shards of a spec and safe for file names.
+    slug: str
+    spec: dict[str, Any]
+
+
+def operation_tags(operation: dict[str, Any]) -> list[str]:
+    """Return the tags of *operation*, or the default tag if it has none."""
+    tags = operation.get("tags")
+    if isinstance(tags, list):
+        names = [tag for tag in tags if isinstance(tag, str)]
+        if names:
+            return names
+    return [DEFAULT_TAG]
+
+
+def tag_order(spec: dict[str, Any]) -> list[str]:
+    """Return the tags of the operations, in the order of the spec's tag list first."""
+    used: dict[str, None] = {}
+    paths = spec.get("paths")
+    for item in paths.values() if isinstance(paths, dict) else ():
+        if not isinstance(item, dict):
+            continue
+        for method, operation in item.items():
+            if method.lower() in HTTP_METHODS and isinstance(operation, dict):
+                used.update(dict.fromkeys(operation_tags(operation)))
+    declared = [
+        tag["name"]
+        for tag in spec.get("tags") or ()
+        if isinstance(tag, dict) and tag.get("name") in used
+    ]
+    return list(dict.fromkeys([*declared, *used]))
+
+
+def _paths_of_tag(paths: dict[str, Any], tag: str) -> dict[str, Any]:
+    selected: dict[str, Any] = {}
+    for path, item in paths.items():
+        if not isinstance(item, dict):
+            continue
+        operations = [
+            method
+            for method, operation in item.items()
+            if method.lower() in HTTP_METHODS
+            and isinstance(operation, dict)
+            and tag in operation_tags(operation)
+        ]
+        if operations:
+            # Path level fields like parameters apply to the selected operations as well.
+            selected[path] = {
+                key: value
+                for key, value in item.items()
+                if key.lower() not in HTTP_METHODS or key in operations
+            }
+    return selected
+
+
+def _slug(tag: str, taken: set[str]) -> str:
+    base = _UNSAFE.sub("-", tag).strip("-").lower() or "tag"
+    slug, index = base, 1
+    while slug in taken:
+        index += 1
+        slug = f"{base}-{index}"
+    taken.add(slug)
+    return slug
+
+
+def split_by_tag(spec: dict[str, Any]) -> list[TagShard]:
+    """Return a spec per tag of the operations of *spec*, in the order of its tags.
+
+    Operations with several tags are part of each of their shards, operations
+    without tags are part of the ``default`` shard. Webhooks are left out.
+    """
+    paths = spec.get("paths")
+    if not isinstance(paths, dict):
+        return []
+    shards: list[TagShard] = []
+    taken: set[str] = set()
+    for tag in tag_order(spec):
+        selected = {
+            "paths": _paths_of_tag(paths, tag),
+            "tags": [
+                item
+                for item in spec.get("tags") or ()
+                if isinstance(item, dict) and item.get("name") == tag
+            ],
+            "webhooks": None,
+        }
+        shard = {
+            key: selected.get(key, value)
+            for key, value in spec.items()
+            if selected.get(key, True)
+        }
+        keep = reachable_components(shard, component_roots(shard))
+        shards.append(TagShard(tag, _slug(tag, taken), prune_components(shard, keep)))
+    return shards
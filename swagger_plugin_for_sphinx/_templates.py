@@ -0,0 +1,42 @@
+"""Compiled Jinja templates shared by all pages of a build."""
+
+from __future__ import annotations
+
+import functools
+from pathlib import Path
+
+import jinja2
+from sphinx.application import Sphinx
+from sphinx.util.osutil import ensuredir
+
+# Projects override a template by placing a file of the same name in this
+# folder of one of their ``templates_path`` entries.
+OVERRIDE_FOLDER = "swagger_plugin_for_sphinx"
+
+
+@functools.lru_cache(maxsize=8)
+def _environment(search_path: tuple[str, ...], cache_dir: str) -> jinja2.Environment:
+    ensuredir(cache_dir)
+    return jinja2.Environment(
+        loader=jinja2.ChoiceLoader(
+            [
+                jinja2.FileSystemLoader(search_path),
+                jinja2.PackageLoader("swagger_plugin_for_sphinx", ""),
+            ]
+        ),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+    )
+
+
+def get_template(app: Sphinx, name: str) -> jinja2.Template:
+    """Return the compiled template *name*, preferring overrides of the project.
+
+    Templates are compiled once per build configuration and their bytecode is
+    kept next to the doctrees, so later builds skip compilation as well.
+    """
+    search_path = tuple(
+        str(Path(app.confdir, path, OVERRIDE_FOLDER))
+        for path in app.config.templates_path
+    )
+    cache_dir = str(Path(app.doctreedir) / "swagger_plugin" / "jinja")
+    return _environment(search_path, cache_dir).get_template(name)
@@ -0,0 +1,290 @@
+"""Remove parts of a spec that Swagger UI does not need before it is published."""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+from sphinx.config import Config
+from sphinx.util import logging
+
+from swagger_plugin_for_sphinx._components import (
+    component_roots,
+    prune_components,
+    reachable_components,
+)
+
+logger = logging.getLogger(__name__)
+
+# Values of spec objects holding data, which are left as they are.
+_DATA_KEYS = frozenset(("default", "enum", "const", "value"))
+# Maps of names to spec objects, whose names are neither keywords nor extensions.
+_NAME_MAPS = frozenset(
+    (
+        "$defs",
+        "callbacks",
+        "content",
+        "definitions",
+        "dependentSchemas",
+        "encoding",
+        "headers",
+        "links",
+        "mapping",
+        "patternProperties",
+        "properties",
+        "scopes",
+        "securityDefinitions",
+        "security",
+        "variables",
+        "webhooks",
+    )
+)
+# Swagger 2.0 maps of names to reusable objects at the top of a spec.
+_ROOT_NAME_MAPS = frozenset(("parameters", "responses"))
+
+# What a value is, which decides how its keys are read.
+_ROOT = "root"
+_OBJECT = "object"
+# A map of names, e.g. the properties of a schema.
+_NAMES = "names"
+# The components of a spec, whose sections are maps of names.
+_SECTIONS = "sections"
+# The responses of an operation, where "default" is a response, not data.
+_RESPONSES = "responses"
+
+
+@dataclass(frozen=True, slots=True)
+class ShakeOptions:
+    """What to remove from specs before they are published."""
+
+    # Remove components that nothing outside the components references.
+    prune: bool = False
+    # Glob patterns of the vendor extensions to remove, such as "x-internal-*".
+    extensions: tuple[str, ...] = ()
+    # Remove examples larger than this as JSON; 0 keeps all examples.
+    max_example_bytes: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether anything is removed at all."""
+        return self.prune or bool(self.extensions) or self.max_example_bytes > 0
+
+    @property
+    def key(self) -> str:
+        """Return a representation for cache keys."""
+        return f"{self.prune}-{self.max_example_bytes}-{','.join(self.extensions)}"
+
+
+def shake_options(config: Config) -> ShakeOptions:
+    """Return the shake options set in the Sphinx *config*."""
+    return ShakeOptions(
+        prune=config.swagger_prune_components,
+        extensions=tuple(config.swagger_strip_extensions),
+        max_example_bytes=config.swagger_max_example_bytes,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ShakenSpec:
+    """A spec with the unused parts removed, and how many of each were removed."""
+
+    spec: dict[str, Any]
+    components: int
+    extensions: int
+    examples: int
+
+
+# Specs shaken in this build, by the digest of their content and the options.
+_shaken: dict[str, ShakenSpec] = {}
+
+
+def _component_count(spec: dict[str, Any]) -> int:
+    components = spec.get("components")
+    sections = [
+        *(components.values() if isinstance(components, dict) else ()),
+        spec.get("definitions"),
+        spec.get("parameters"),
+        spec.get("responses"),
+    ]
+    return sum(len(section) for section in sections if isinstance(section, dict))
+
+
+def _child_context(context: str, key: str) -> str:
+    """Return what the value of *key* is, in a value of the *context* kind."""
+    if context == _SECTIONS:
+        return _NAMES
+    if context in {_NAMES, _RESPONSES}:
+        return _OBJECT
+    if key == "components":
+        return _SECTIONS
+    if context == _ROOT and key in _ROOT_NAME_MAPS:
+        return _NAMES
+    if key == "responses":
+        return _RESPONSES
+    return _NAMES if key in _NAME_MAPS else _OBJECT
+
+
+def _is_example_object(example: Any) -> bool:
+    return isinstance(example, dict) and (
+        "value" in example or "externalValue" in example
+    )
+
+
+class _Stripper:
+    """Copy a spec without the configured extensions and oversized examples."""
+
+    def __init__(self, extensions: Sequence[str], max_example_bytes: int) -> None:
+        """Strip keys matching *extensions* and examples above *max_example_bytes*."""
+        self._extensions = extensions
+        self._max_example_bytes = max_example_bytes
+        self.extensions = 0
+        self.examples = 0
+        # References to the oversized examples of the components, removed with them.
+        self._removed_refs: set[str] = set()
+
+    def _stripped(self, key: str) -> bool:
+        return any(fnmatch.fnmatchcase(key, pattern) for pattern in self._extensions)
+
+    def _oversized(self, example: Any) -> bool:
+        if self._max_example_bytes <= 0:
+            return False
+        size = len(json.dumps(example, separators=(",", ":"), default=str))
+        return size > self._max_example_bytes
+
+    def _oversized_entry(self, item: Any) -> bool:
+        """Return whether *item* of a map of examples is removed."""
+        if _is_example_object(item):
+            # Example objects hold their data in "value", Swagger 2.0 examples hold it directly.
+            return self._oversized(item.get("value"))
+        if isinstance(item, dict) and item.get("$ref") in self._removed_refs:
+            return True
+        return self._oversized(item)
+
+    def _examples(self, examples: Any) -> Any:
+        """Return *examples* without the oversized ones, or None if none is left."""
+        if isinstance(examples, list):
+            # The examples of a schema are data.
+            kept: Any = [item for item in examples if not self._oversized(item)]
+        elif isinstance(examples, dict):
+            kept = {
+                name: self._copy(item, _OBJECT) if _is_example_object(item) else item
+                for name, item in examples.items()
+                if not self._oversized_entry(item)
+            }
+        else:
+            return examples
+        self.examples += len(examples) - len(kept)
+        return kept if kept or not examples else None
+
+    def _strip(self, key: str) -> bool:
+        """Return whether the extension *key* is stripped, and count it if so."""
+        stripped = self._stripped(key)
+        self.extensions += stripped
+        return stripped
+
+    def _copy_value(self, context: str, key: str, value: Any) -> tuple[bool, Any]:
+        """Return whether to keep the *value* of *key*, and its copy."""
+        if key.startswith("x-"):
+            # Extensions hold arbitrary data, not spec objects.
+            return not self._strip(key), value
+        if key == "examples" and context != _RESPONSES:
+            # Includes the examples section of the components.
+            kept = self._examples(value)
+            return kept is not None, kept
+        if context not in {_ROOT, _OBJECT}:
+            return True, self._copy(value, _child_context(context, key))
+        if key in _DATA_KEYS:
+            return True, value
+        if key == "example":
+            oversized = self._oversized(value)
+            self.examples += oversized
+            return not oversized, value
+        return True, self._copy(value, _child_context(context, key))
+
+    def _copy(self, node: Any, context: str) -> Any:
+        if isinstance(node, list):
+            return [self._copy(item, context) for item in node]
+        if not isinstance(node, dict):
+            return node
+        result: dict[Any, Any] = {}
+        for key, value in node.items():
+            if context == _NAMES or not isinstance(key, str):
+                # Names are kept, whatever they look like. YAML reads response codes as numbers.
+                result[key] = self._copy(value, _OBJECT)
+                continue
+            keep, copied = self._copy_value(context, key, value)
+            if keep:
+                result[key] = copied
+        return result
+
+    def copy(self, spec: dict[str, Any]) -> dict[str, Any]:
+        """Return a copy of *spec* without stripped parts, sharing data values."""
+        components = spec.get("components")
+        examples = components.get("examples") if isinstance(components, dict) else None
+        if isinstance(examples, dict):
+            self._removed_refs = {
+                f"#/components/examples/{name}"
+                for name, item in examples.items()
+                if _is_example_object(item) and self._oversized(item.get("value"))
+            }
+        return cast(dict[str, Any], self._copy(spec, _ROOT))
+
+
+def shake_spec(spec: dict[str, Any], options: ShakeOptions) -> ShakenSpec:
+    """Return *spec* without what *options* remove, leaving *spec* unchanged."""
+    stripper = _Stripper(options.extensions, options.max_example_bytes)
+    stripping = bool(options.extensions) or options.max_example_bytes > 0
+    shaken = stripper.copy(spec) if stripping else spec
+    removed = 0
+    if options.prune:
+        pruned = prune_components(
+            shaken, reachable_components(shaken, component_roots(shaken))
+        )
+        removed = _component_count(shaken) - _component_count(pruned)
+        shaken = pruned
+    return ShakenSpec(shaken, removed, stripper.extensions, stripper.examples)
+
+
+def _json_size(spec: dict[str, Any]) -> int:
+    text = json.dumps(spec, separators=(",", ":"), ensure_ascii=False, default=str)
+    return len(text.encode("utf-8"))
+
+
+def shake_spec_once(
+    source: Path,
+    load: Callable[[], dict[str, Any]],
+    options: ShakeOptions,
+    digest: str,
+) -> ShakenSpec:
+    """Return the spec *load* returns without what *options* remove.
+
+    *digest* identifies the content of the spec and *options*, see
+    :func:`publish_spec`. A spec is shaken and logged once per build, further
+    directives for it get the same result.
+    """
+    shaken = _shaken.get(digest)
+    if shaken is not None:
+        return shaken
+    spec = load()
+    shaken = _shaken[digest] = shake_spec(spec, options)
+    # Sizes as minified JSON, so they do not include what minifying saves.
+    logger.info(
+        "Removed %d unused components, %d extensions and %d examples from %s "
+        "(%d -> %d bytes as minified JSON).",
+        shaken.components,
+        shaken.extensions,
+        shaken.examples,
+        source,
+        _json_size(spec),
+        _json_size(shaken.spec),
+    )
+    return shaken
+
+
+def forget_shaken_specs() -> None:
+    """Forget the specs shaken by earlier builds of this process."""
+    _shaken.clear()
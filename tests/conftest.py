@@ -2,11 +2,84 @@
 
 from __future__ import annotations
 
+import hashlib
 import shutil
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Any
 
 import pytest
 import yaml
+from sphinx.application import Sphinx
+from typing_extensions import override
+
+SphinxRunner = Callable[..., Sphinx]
+
+
+@pytest.fixture
+def sphinx_runner(tmp_path: Path) -> SphinxRunner:
+    """Build a project whose api page holds the given directive."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    build = tmp_path / "build"
+    build.mkdir()
+
+    def run(
+        directive: str,
+        swagger_present_uri: str | None = None,
+        swagger_bundle_uri: str | None = None,
+        swagger_css_uri: str | None = None,
+        swagger_mirror_external_resources: bool | None = None,
+        sphinx_builder: str = "html",
+        **config_values: Any,
+    ) -> Sphinx:
+        code = ["extensions = ['swagger_plugin_for_sphinx']"]
+        code.extend(f"{key} = {value!r}" for key, value in config_values.items())
+        if swagger_present_uri:
+            code.append(f"swagger_present_uri = '{swagger_present_uri}'")
+        if swagger_bundle_uri:
+            code.append(f"swagger_bundle_uri = '{swagger_bundle_uri}'")
+        if swagger_css_uri:
+            code.append(f"swagger_css_uri = '{swagger_css_uri}'")
+        if swagger_mirror_external_resources:
+            code.append(
+                f"swagger_mirror_external_resources = {swagger_mirror_external_resources}"
+            )
+
+        conf = docs / "conf.py"
+        with open(conf, "w+", encoding="utf-8") as file:
+            file.write("\n".join(code))
+
+        index = docs / "index.rst"
+        index.write_text(
+            "Project\n=======\n\n.. toctree::\n   api.rst",
+            encoding="utf-8",
+        )
+        api = docs / "api.rst"
+        api.write_text(
+            f"API\n===\n\n{directive}\n",
+            encoding="utf-8",
+        )
+
+        spec = Path(__file__).parent / "openapi.yml"
+        shutil.copyfile(str(spec), str(docs / "openapi.yaml"))
+        shutil.copyfile(str(spec), str(docs / "other.yaml"))
+
+        app = Sphinx(docs, docs, build, build / ".doctrees", sphinx_builder)
+        app.build()
+        return app
+
+    return run
+
+
+def read_api_html(tmp_path: Path) -> str:
+    """Return the api page built by ``sphinx_runner``."""
+    build = tmp_path / "build"
+    with open(build / "api.html", encoding="utf-8") as file:
+        return file.read()
 
 
 @pytest.fixture
@@ -49,3 +122,61 @@ def _adjust_title(path: Path, title: str) -> None:
     data["info"]["title"] = title
     with path.open("w", encoding="utf-8") as file:
         yaml.dump(data, file, Dumper=yaml.Dumper)
+
+
+@dataclass(slots=True)
+class AssetServer:
+    """A local stand-in for the CDN serving the Swagger UI assets."""
+
+    base_url: str
+    files: dict[str, bytes] = field(default_factory=dict)
+    requests: list[tuple[str, int]] = field(default_factory=list)
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+
+@pytest.fixture
+def asset_server() -> Iterator[AssetServer]:
+    """Serve files with ETag revalidation and record each request's status."""
+    server_state: list[AssetServer] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            state = server_state[0]
+            name = self.path.lstrip("/")
+            data = state.files.get(name)
+            if data is None:
+                state.requests.append((name, 404))
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = f'"{hashlib.sha256(data).hexdigest()}"'
+            status = 304 if self.headers.get("If-None-Match") == etag else 200
+            state.requests.append((name, status))
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(data) if status == 200 else 0))
+            self.end_headers()
+            if status == 200:
+                self.wfile.write(data)
+
+        @override
+        def log_message(self, format: str, *args: object) -> None:  # noqa: FTU002
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    state = AssetServer(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    state.files.update(
+        {
+            "swagger-ui-standalone-preset.js": b"// preset",
+            "swagger-ui-bundle.js": b"// bundle",
+            "swagger-ui.css": b"/* css */",
+        }
+    )
+    server_state.append(state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state
+    server.shutdown()
+    server.server_close()
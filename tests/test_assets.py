@@ -0,0 +1,58 @@
+"""Tests for mirroring the Swagger UI assets."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sphinx.errors import ExtensionError
+
+from swagger_plugin_for_sphinx._assets import (
+    default_cache_dir,
+    fetch_asset,
+    mirror_assets,
+)
+from tests.conftest import AssetServer
+
+
+def test_default_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "swagger-plugin-for-sphinx" / "assets"
+
+
+def test_fetch_revalidates_with_etag(asset_server: AssetServer, tmp_path: Path) -> None:
+    uri = asset_server.url("swagger-ui.css")
+    first = fetch_asset(uri, tmp_path)
+    second = fetch_asset(uri, tmp_path)
+    assert first == second
+    assert first.read_bytes() == b"/* css */"
+    assert asset_server.requests == [("swagger-ui.css", 200), ("swagger-ui.css", 304)]
+
+    asset_server.files["swagger-ui.css"] = b"/* new css */"
+    assert fetch_asset(uri, tmp_path).read_bytes() == b"/* new css */"
+    assert asset_server.requests[-1] == ("swagger-ui.css", 200)
+
+
+def test_fetch_uses_cache_on_failure(asset_server: AssetServer, tmp_path: Path) -> None:
+    uri = asset_server.url("swagger-ui.css")
+    cached = fetch_asset(uri, tmp_path)
+    del asset_server.files["swagger-ui.css"]
+    assert fetch_asset(uri, tmp_path) == cached
+    assert cached.read_bytes() == b"/* css */"
+
+
+def test_fetch_unreachable(tmp_path: Path) -> None:
+    with pytest.raises(ExtensionError, match="Could not download"):
+        fetch_asset("http://127.0.0.1:1/swagger-ui.css", tmp_path)
+
+
+def test_mirror_assets_shared_cache(asset_server: AssetServer, tmp_path: Path) -> None:
+    uris = [asset_server.url(name) for name in sorted(asset_server.files)]
+    cache = tmp_path / "cache"
+    for project in ("one", "two"):
+        mirror_assets(uris + uris[:1], tmp_path / project / "_static", cache)
+        for name, data in asset_server.files.items():
+            assert (tmp_path / project / "_static" / name).read_bytes() == data
+
+    statuses = sorted(status for _, status in asset_server.requests)
+    assert statuses == [200, 200, 200, 304, 304, 304]
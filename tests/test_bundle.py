@@ -0,0 +1,179 @@
+"""Tests for bundling specs split across files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from sphinx.errors import ExtensionError
+
+from swagger_plugin_for_sphinx import _bundle
+from swagger_plugin_for_sphinx._bundle import bundle_spec, may_have_external_refs
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(dedent(text), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        (b"$ref: '#/components/schemas/Pet'", False),
+        (b'{"$ref": "#/definitions/Pet"}', False),
+        (b"$ref: pet.yaml", True),
+        (b'{"$ref":"./pet.json#/Pet"}', True),
+        (b"description: no references", False),
+    ],
+)
+def test_may_have_external_refs(raw: bytes, expected: bool) -> None:
+    assert may_have_external_refs(raw) is expected
+
+
+def test_bundle_without_external_refs(tmp_path: Path) -> None:
+    spec = _write(
+        tmp_path / "openapi.yaml",
+        """
+        openapi: 3.0.3
+        paths: {}
+        components:
+          schemas:
+            Pet: {$ref: '#/components/schemas/Animal'}
+        """,
+    )
+    assert bundle_spec(spec) == (None, [])
+
+
+def test_external_refs_across_chunks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(_bundle, "_CHUNK_SIZE", 64)
+    spec = tmp_path / "openapi.json"
+    # The reference starts in the first chunk and ends in the second.
+    spec.write_bytes(
+        b'{"openapi": "3.0.3", "x": "' + b"a" * 30 + b'", "$ref": "a.json"}'
+    )
+    assert _bundle._file_may_have_external_refs(spec)
+
+    scanned: list[bytes] = []
+    scan = _bundle.may_have_external_refs
+
+    def record(raw: bytes) -> bool:
+        scanned.append(raw)
+        return scan(raw)
+
+    monkeypatch.setattr(_bundle, "may_have_external_refs", record)
+    local = tmp_path / "local.json"
+    local.write_bytes(b'{"paths": {}, "x": "' + b"a" * 200 + b'", "$ref": "#/a"}')
+    assert not _bundle._file_may_have_external_refs(local)
+    assert len(scanned) == 4
+    # Remembered by digest, the spec is not scanned again.
+    assert not _bundle._file_may_have_external_refs(local)
+    assert len(scanned) == 4
+    # Until the next build.
+    _bundle.forget_scanned_specs()
+    assert not _bundle._file_may_have_external_refs(local)
+    assert len(scanned) == 8
+
+
+def test_bundle(tmp_path: Path) -> None:
+    spec = _write(
+        tmp_path / "openapi.yaml",
+        """
+        openapi: 3.0.3
+        paths:
+          /pets:
+            $ref: paths/pets.yaml
+        components:
+          schemas:
+            Local: {type: string}
+            External:
+              $ref: https://example.com/schema.json
+        """,
+    )
+    pets = _write(
+        tmp_path / "paths" / "pets.yaml",
+        """
+        get:
+          description: List pets
+          responses:
+            '200':
+              content:
+                application/json:
+                  schema:
+                    $ref: ../schemas.yaml#/Pets
+        """,
+    )
+    schemas = _write(
+        tmp_path / "schemas.yaml",
+        """
+        Pets:
+          type: array
+          items: {$ref: '#/Pet'}
+        Pet:
+          properties:
+            tag: {$ref: 'openapi.yaml#/components/schemas/Local'}
+        """,
+    )
+    bundled, files = bundle_spec(spec)
+
+    assert files == [pets.resolve(), schemas.resolve()]
+    assert bundled is not None
+    schema = bundled["paths"]["/pets"]["get"]["responses"]["200"]["content"][
+        "application/json"
+    ]["schema"]
+    assert schema["type"] == "array"
+    assert schema["items"]["properties"]["tag"] == {
+        "$ref": "#/components/schemas/Local"
+    }
+    assert bundled["components"]["schemas"]["External"] == {
+        "$ref": "https://example.com/schema.json"
+    }
+
+
+def test_bundle_hoists_cycles(tmp_path: Path) -> None:
+    spec = _write(
+        tmp_path / "openapi.yaml",
+        """
+        openapi: 3.0.3
+        paths: {}
+        components:
+          schemas:
+            Node: {type: string}
+            Tree: {$ref: 'tree.yaml#/Node'}
+        """,
+    )
+    _write(
+        tmp_path / "tree.yaml",
+        """
+        Node:
+          properties:
+            children:
+              type: array
+              items: {$ref: '#/Node'}
+        """,
+    )
+    bundled, _ = bundle_spec(spec)
+
+    assert bundled is not None
+    schemas = bundled["components"]["schemas"]
+    assert schemas["Node"] == {"type": "string"}
+    reference = {"$ref": "#/components/schemas/Node2"}
+    assert schemas["Tree"]["properties"]["children"]["items"] == reference
+    assert schemas["Node2"] == schemas["Tree"]
+    assert schemas["Node2"] is not schemas["Tree"]
+
+
+def test_bundle_missing_file(tmp_path: Path) -> None:
+    spec = _write(tmp_path / "openapi.yaml", "paths: {$ref: missing.yaml}\n")
+    with pytest.raises(ExtensionError, match="Referenced file not found"):
+        bundle_spec(spec)
+
+
+def test_bundle_unresolvable_pointer(tmp_path: Path) -> None:
+    spec = _write(tmp_path / "openapi.yaml", "paths: {$ref: 'other.yaml#/a/b'}\n")
+    _write(tmp_path / "other.yaml", "a: {}\n")
+    with pytest.raises(ExtensionError, match="Unresolvable reference"):
+        bundle_spec(spec)
@@ -0,0 +1,50 @@
+"""Tests for the cache header snippets."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from swagger_plugin_for_sphinx._cache_headers import (
+    headers_rules,
+    nginx_rules,
+    write_headers_file,
+)
+
+
+def test_headers_rules() -> None:
+    rules = headers_rules(["b.3f2a9c0b17d4.json", "a/a.3f2a9c0b17d4.yaml"])
+    assert rules.splitlines() == [
+        "# BEGIN swagger-plugin-for-sphinx",
+        "/_static/a/a.3f2a9c0b17d4.yaml",
+        "  Cache-Control: public, max-age=31536000, immutable",
+        "/_static/b.3f2a9c0b17d4.json",
+        "  Cache-Control: public, max-age=31536000, immutable",
+        "# END swagger-plugin-for-sphinx",
+    ]
+
+
+_LOCATION = re.compile(r'location ~ "(.+)"')
+
+
+def test_nginx_rules() -> None:
+    location = _LOCATION.search(nginx_rules())
+    assert location is not None
+    regex = re.compile(location.group(1))
+    assert regex.search("/docs/_static/api/openapi.3f2a9c0b17d4.yaml")
+    assert not regex.search("/docs/_static/api/openapi.yaml")
+    assert not regex.search("/docs/_static/api/openapi.3f2a9c0b17.yaml")
+
+
+def test_write_headers_file_keeps_project_rules(tmp_path: Path) -> None:
+    path = tmp_path / "_headers"
+    path.write_text("/*\n  X-Frame-Options: DENY", encoding="utf-8")
+
+    assert write_headers_file(path, headers_rules(["old.3f2a9c0b17d4.json"]))
+    assert write_headers_file(path, headers_rules(["new.3f2a9c0b17d4.json"]))
+    assert not write_headers_file(path, headers_rules(["new.3f2a9c0b17d4.json"]))
+
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("/*\n  X-Frame-Options: DENY\n# BEGIN")
+    assert "old." not in text
+    assert text.count("/_static/new.3f2a9c0b17d4.json") == 1
@@ -0,0 +1,117 @@
+"""Tests for finding the components parts of a spec reference."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from swagger_plugin_for_sphinx._components import (
+    component_roots,
+    prune_components,
+    reachable_components,
+)
+
+
+def _spec() -> dict[str, Any]:
+    return {
+        "openapi": "3.0.3",
+        "paths": {
+            "/pets": {
+                "get": {
+                    "parameters": [{"$ref": "#/components/parameters/limit"}],
+                    "responses": {
+                        "200": {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Pets"}
+                                }
+                            }
+                        }
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Pets": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/Pet"},
+                },
+                "Pet": {
+                    "properties": {
+                        "parent": {"$ref": "#/components/schemas/Pet"},
+                        "tag": {"$ref": "#/components/schemas/Tag~1Name/properties/x"},
+                    }
+                },
+                "Tag/Name": {"properties": {"x": {"type": "string"}}},
+                "Unused": {"$ref": "#/components/schemas/Pet"},
+            },
+            "parameters": {"limit": {"in": "query"}, "offset": {"in": "query"}},
+            "securitySchemes": {"key": {"type": "apiKey"}},
+        },
+    }
+
+
+def test_reachable_components() -> None:
+    spec = _spec()
+    assert reachable_components(spec, component_roots(spec)) == {
+        ("components", "schemas", "Pets"),
+        ("components", "schemas", "Pet"),
+        ("components", "schemas", "Tag/Name"),
+        ("components", "parameters", "limit"),
+    }
+
+
+def test_prune_components() -> None:
+    spec = _spec()
+    pruned = prune_components(spec, {("components", "schemas", "Pet")})
+    assert pruned["components"] == {
+        "schemas": {"Pet": spec["components"]["schemas"]["Pet"]},
+        "securitySchemes": {"key": {"type": "apiKey"}},
+    }
+    assert pruned["paths"] is spec["paths"]
+    assert "Unused" in spec["components"]["schemas"]
+
+
+def test_prune_swagger_components() -> None:
+    spec = {
+        "swagger": "2.0",
+        "paths": {"/a": {"get": {"parameters": [{"$ref": "#/parameters/id"}]}}},
+        "parameters": {"id": {"in": "path"}},
+        "definitions": {"Unused": {}},
+        "securityDefinitions": {"key": {"type": "apiKey"}},
+    }
+    pruned = prune_components(spec, reachable_components(spec, component_roots(spec)))
+    assert pruned == {key: value for key, value in spec.items() if key != "definitions"}
+
+
+def test_reachable_discriminated_components() -> None:
+    pet = {"allOf": [{"$ref": "#/components/schemas/Pet"}]}
+    spec = {
+        "paths": {
+            "/pets": {"get": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+            "/owners": {"get": {"schema": {"$ref": "#/components/schemas/Owner"}}},
+        },
+        "components": {
+            "schemas": {
+                "Pet": {"discriminator": {"propertyName": "type"}},
+                "Cat": pet,
+                "Dog": pet,
+                "Owner": {
+                    "discriminator": {
+                        "propertyName": "kind",
+                        "mapping": {
+                            "person": "Person",
+                            "company": "#/components/schemas/Company",
+                        },
+                    }
+                },
+                "Person": {},
+                "Company": {},
+                "Robot": {"allOf": [{"$ref": "#/components/schemas/Owner"}]},
+            }
+        },
+    }
+    assert reachable_components(spec, component_roots(spec)) == {
+        ("components", "schemas", name)
+        for name in ("Pet", "Cat", "Dog", "Owner", "Person", "Company")
+    }
@@ -0,0 +1,39 @@
+"""Tests for skipping full pages whose inputs did not change."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import jinja2
+
+from swagger_plugin_for_sphinx._full_pages import PageManifest, inputs_digest
+
+
+def test_inputs_digest(tmp_path: Path) -> None:
+    (tmp_path / "page.j2").write_text("{{ title }}", encoding="utf-8")
+    environment = jinja2.Environment(loader=jinja2.FileSystemLoader(tmp_path))
+    template = environment.get_template("page.j2")
+
+    digest = inputs_digest({"title": "API"}, template)
+    assert digest == inputs_digest({"title": "API"}, template)
+    assert digest != inputs_digest({"title": "Other"}, template)
+    (tmp_path / "page.j2").write_text("<h1>{{ title }}</h1>", encoding="utf-8")
+    assert digest != inputs_digest({"title": "API"}, template)
+    assert inputs_digest({"title": "API"}, jinja2.Template("{{ title }}")) is None
+
+
+def test_page_manifest(tmp_path: Path) -> None:
+    path = tmp_path / "doctrees" / "full_pages.json"
+    page = tmp_path / "api.html"
+    page.write_text("<html></html>", encoding="utf-8")
+    manifest = PageManifest(path)
+    assert not manifest.up_to_date(page, "digest")
+    manifest.record(page, "digest")
+    manifest.save()
+
+    manifest = PageManifest(path)
+    assert manifest.up_to_date(page, "digest")
+    assert not manifest.up_to_date(page, "other")
+    assert not manifest.up_to_date(page, None)
+    page.write_text("<html>Rewritten</html>", encoding="utf-8")
+    assert not PageManifest(path).up_to_date(page, "digest")
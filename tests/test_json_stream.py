@@ -0,0 +1,144 @@
+"""Tests for reading selected fields of JSON documents in chunks."""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from swagger_plugin_for_sphinx import _json_stream
+from swagger_plugin_for_sphinx._json_stream import (
+    ANY,
+    KEEP,
+    Selection,
+    load_json_fields,
+)
+from swagger_plugin_for_sphinx._openapi_index import (
+    load_openapi_file,
+    load_openapi_index_fields,
+    openapi_lines_for_search,
+    openapi_search_entries,
+)
+
+_SELECTION: dict[str, Selection] = {
+    "info": {"title": KEEP, "version": KEEP},
+    "paths": {ANY: {ANY: {"summary": KEEP, "tags": KEEP}}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 256 * 1024])
+@pytest.mark.parametrize(
+    "document,expected",
+    [
+        ({}, {}),
+        (
+            {"info": {"title": 'A "quoted" {title}', "version": 1.25, "x": [1]}},
+            {"info": {"title": 'A "quoted" {title}', "version": 1.25}},
+        ),
+        (
+            {
+                "openapi": "3.1.0",
+                "info": "not an object",
+                "paths": {
+                    "/a": {
+                        "parameters": [{"name": "id"}],
+                        "get": {
+                            "summary": "Ünïcödé \\  ",
+                            "tags": ["a", None, True, -1e-3],
+                            "responses": {"200": {"description": "[{"}},
+                        },
+                    },
+                    "/b": [],
+                },
+                "components": {"schemas": {"Deep": {"a": [[[{}]]]}}},
+            },
+            {
+                "info": None,
+                "paths": {
+                    "/a": {
+                        "parameters": None,
+                        "get": {
+                            "summary": "Ünïcödé \\  ",
+                            "tags": ["a", None, True, -1e-3],
+                        },
+                    },
+                    "/b": None,
+                },
+            },
+        ),
+    ],
+)
+def test_load_json_fields(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    chunk_size: int,
+    document: dict[str, Any],
+    expected: dict[str, Any],
+) -> None:
+    monkeypatch.setattr(_json_stream, "_CHUNK_SIZE", chunk_size)
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(document, indent=1), encoding="utf-8-sig")
+    assert load_json_fields(path, _SELECTION) == expected
+
+
+@pytest.mark.parametrize(
+    "text", ["", "[]", '{"info": {"title": "a"}', '{"paths": {"/a": [}}', "{} {}"]
+)
+def test_load_json_fields_invalid(tmp_path: Path, text: str) -> None:
+    path = tmp_path / "spec.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError, match="JSON document"):
+        load_json_fields(path, _SELECTION)
+
+
+def _large_spec(operations: int) -> dict[str, Any]:
+    # Responses and schema properties are not indexed and make up most of the spec.
+    example = {"items": [{"id": index, "name": "x" * 40} for index in range(30)]}
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Large", "version": "1"},
+        "paths": {
+            f"/items{index}": {
+                "get": {
+                    "summary": f"Get items {index}",
+                    "description": "Returns items",
+                    "responses": {"200": {"description": "OK", "example": example}},
+                }
+            }
+            for index in range(operations)
+        },
+        "components": {
+            "schemas": {
+                f"Item{index}": {"title": f"Item {index}", "properties": example}
+                for index in range(operations)
+            }
+        },
+    }
+
+
+def _traced(load: Callable[[Path], Any], path: Path) -> tuple[Any, int]:
+    tracemalloc.start()
+    try:
+        return load(path), tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_index_fields_memory_is_bounded(tmp_path: Path) -> None:
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(_large_spec(2000)), encoding="utf-8")
+    size = path.stat().st_size
+
+    fields, peak = _traced(load_openapi_index_fields, path)
+    spec, full_peak = _traced(load_openapi_file, path)
+
+    # Only the indexed fields are held, a small part of the spec and its parsed form.
+    assert size > 5 * 1024 * 1024
+    assert peak < size / 2
+    assert peak < full_peak / 10
+    assert openapi_lines_for_search(fields) == openapi_lines_for_search(spec)
+    assert openapi_search_entries(fields) == openapi_search_entries(spec)
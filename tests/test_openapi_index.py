@@ -8,8 +8,10 @@ import pytest
 from sphinx.errors import ExtensionError
 
 from swagger_plugin_for_sphinx._openapi_index import (
+    SearchLimits,
     load_openapi_file,
     openapi_lines_for_search,
+    openapi_search_entries,
 )
 
 
@@ -163,6 +165,26 @@ def test_openapi_lines_description_truncated() -> None:
     assert len(excerpt[0]) == 500
 
 
+def test_openapi_lines_limits() -> None:
+    spec = {
+        "paths": {
+            "/x": {"get": {"summary": "X", "description": "About x"}},
+            "/y": {"get": {"summary": "Y"}, "post": {"summary": "Z"}},
+        },
+        "components": {
+            "schemas": {"A": {"description": "First"}, "B": {}, "C": {}},
+        },
+    }
+    limits = SearchLimits(max_operations=2, max_schemas=1, description_length=0)
+    assert openapi_lines_for_search(spec, limits) == [
+        "GET /x — X",
+        "GET /y — Y",
+        "Schema A",
+    ]
+    limits = SearchLimits(description_length=5)
+    assert "Ab..." in openapi_lines_for_search(spec, limits)
+
+
 def test_openapi_lines_extra_description_line() -> None:
     lines = openapi_lines_for_search(
         {
@@ -195,3 +217,37 @@ def test_load_json(tmp_path: Path) -> None:
     j.write_text('{"info": {"title": "T"}, "paths": {}}', encoding="utf-8")
     spec = load_openapi_file(j)
     assert openapi_lines_for_search(spec) == ["T"]
+
+
+def test_openapi_search_entries() -> None:
+    spec = {
+        "paths": {
+            "/pets/{id}": {
+                "get": {
+                    "operationId": "show Pet",
+                    "summary": "Show",
+                    "description": "One pet",
+                    "tags": ["pet store", "other"],
+                },
+                "delete": {"summary": "Delete"},
+            },
+        },
+        "components": {"schemas": {"Pet": {"title": "A pet"}}},
+    }
+    assert openapi_search_entries(spec) == [
+        {
+            "title": "GET /pets/{id} — Show",
+            "text": "One pet",
+            "tag": "pet_store",
+            "operation": "show_Pet",
+        },
+        {
+            "title": "DELETE /pets/{id} — Delete",
+            "text": "",
+            "tag": "default",
+            "operation": "delete__pets__id_",
+        },
+        {"title": "Schema Pet — A pet", "text": "", "model": "Pet"},
+    ]
+    limits = SearchLimits(max_operations=1, max_schemas=0)
+    assert len(openapi_search_entries(spec, limits)) == 1
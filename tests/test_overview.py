@@ -0,0 +1,48 @@
+"""Tests for the static overview of a spec."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from swagger_plugin_for_sphinx._overview import OverviewOperation, overview
+
+_SPEC: dict[str, Any] = {
+    "info": {"title": " Pets ", "version": 1.0},
+    "tags": [{"name": "store"}, {"name": "pets"}],
+    "paths": {
+        "/pets": {
+            "parameters": [],
+            "get": {"tags": ["pets"], "summary": "List pets"},
+            "post": {"tags": ["pets", "store"], "deprecated": True},
+        },
+        "/health": {"get": {"summary": "Health"}},
+    },
+}
+
+
+def test_overview() -> None:
+    listed = overview(_SPEC, 10)
+    assert listed["title"] == "Pets"
+    assert listed["version"] == "1.0"
+    assert not listed["omitted"]
+    create = OverviewOperation("POST", "/pets", "", True)
+    assert listed["groups"] == [
+        ("store", [create]),
+        ("pets", [OverviewOperation("GET", "/pets", "List pets", False), create]),
+        ("default", [OverviewOperation("GET", "/health", "Health", False)]),
+    ]
+
+
+def test_overview_limit() -> None:
+    listed = overview(_SPEC, 2)
+    assert [tag for tag, _ in listed["groups"]] == ["pets"]
+    assert listed["omitted"] == 2
+
+
+def test_overview_without_paths() -> None:
+    assert overview({"info": "invalid"}, 10) == {
+        "title": "",
+        "version": "",
+        "groups": [],
+        "omitted": 0,
+    }
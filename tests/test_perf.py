@@ -0,0 +1,91 @@
+"""Tests for the build timings."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+
+from swagger_plugin_for_sphinx._perf import (
+    PHASES,
+    Profile,
+    Span,
+    chrome_trace,
+    count,
+    describe,
+    format_summary,
+    profiles_json,
+    profiling,
+    span,
+    summarize,
+)
+
+
+def test_nothing_recorded_without_profile() -> None:
+    with span("parse"):
+        count("lines_indexed", 3)
+        describe("openapi.yaml")
+
+
+def test_profiling() -> None:
+    profile = Profile("api")
+    with profiling(profile), span("directive"):
+        describe("openapi.yaml")
+        with span("parse"):
+            count("lines_indexed", 3)
+        count("lines_indexed", 2)
+
+    assert profile.spec == "openapi.yaml"
+    assert [item.name for item in profile.spans] == ["parse", "directive"]
+    assert profile.counters == Counter(lines_indexed=5)
+
+
+def test_summarize() -> None:
+    profiles = [
+        Profile("a", "small.yaml", spans=[Span("directive", 0, 1_000_000)]),
+        Profile(
+            "b",
+            "large.yaml",
+            spans=[Span("parse", 0, 2_000_000), Span("directive", 0, 3_000_000)],
+            counters=Counter(bytes_published=10),
+        ),
+        Profile("b", "large.yaml", spans=[Span("directive", 0, 1_000_000)]),
+        Profile("b", spans=[Span("render", 0, 500_000)]),
+    ]
+    rows = summarize(profiles)
+
+    assert [(row["spec"], row["count"], row["total"]) for row in rows] == [
+        ("large.yaml", 2, 4.0),
+        ("small.yaml", 1, 1.0),
+        ("", 1, 0.5),
+    ]
+    assert rows[0]["parse"] == 2.0
+    assert rows[0]["bytes_published"] == 10
+    lines = format_summary(rows, limit=2)
+    assert lines[0].split()[:3] == ["spec", "count", "total"]
+    assert len(lines[0].split()) == 5 + len(PHASES)
+    assert lines[1].startswith("large.yaml")
+    assert lines[-1] == "... and 1 more specs"
+
+
+def test_reports() -> None:
+    profile = Profile("api", "openapi.yaml", pid=1, tid=2)
+    profile.spans.append(Span("parse", 5_000, 2_000))
+
+    report = json.loads(profiles_json([profile]))
+    assert report["summary"][0]["parse"] == 0.002
+    assert report["profiles"][0]["spans"] == [
+        {"name": "parse", "start_ns": 5_000, "duration_ns": 2_000}
+    ]
+    trace = json.loads(chrome_trace([profile]))
+    assert trace["traceEvents"] == [
+        {
+            "name": "parse",
+            "cat": "swagger",
+            "ph": "X",
+            "ts": 5.0,
+            "dur": 2.0,
+            "pid": 1,
+            "tid": 2,
+            "args": {"docname": "api", "spec": "openapi.yaml"},
+        }
+    ]
@@ -2,79 +2,32 @@
 
 from __future__ import annotations
 
+import gzip
+import json
+import logging
+import os
 import shutil
-from collections.abc import Callable
+import subprocess
+import time
+from collections import Counter
+from html import escape
 from pathlib import Path
 from textwrap import dedent
+from typing import Any
 
 import pytest
+import yaml
+from docutils import nodes
 from sphinx.application import Sphinx
 from sphinx.errors import ExtensionError
 
-SphinxRunner = Callable[..., None]
+from swagger_plugin_for_sphinx import _publish, _tree_shake
+from swagger_plugin_for_sphinx._nodes import SwaggerSearchIndex
+from swagger_plugin_for_sphinx._registry import get_registry
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+from tests.conftest import AssetServer, SphinxRunner, read_api_html
 
-
-@pytest.fixture
-def sphinx_runner(tmp_path: Path) -> SphinxRunner:
-    docs = tmp_path / "docs"
-    docs.mkdir()
-    build = tmp_path / "build"
-    build.mkdir()
-
-    def run(
-        directive: str,
-        swagger_present_uri: str | None = None,
-        swagger_bundle_uri: str | None = None,
-        swagger_css_uri: str | None = None,
-        swagger_mirror_external_resources: bool | None = None,
-        sphinx_builder: str = "html",
-    ) -> None:
-        code = ["extensions = ['swagger_plugin_for_sphinx']"]
-        if swagger_present_uri:
-            code.append(f"swagger_present_uri = '{swagger_present_uri}'")
-        if swagger_bundle_uri:
-            code.append(f"swagger_bundle_uri = '{swagger_bundle_uri}'")
-        if swagger_css_uri:
-            code.append(f"swagger_css_uri = '{swagger_css_uri}'")
-        if swagger_mirror_external_resources:
-            code.append(
-                f"swagger_mirror_external_resources = {swagger_mirror_external_resources}"
-            )
-
-        conf = docs / "conf.py"
-        with open(conf, "w+", encoding="utf-8") as file:
-            file.write("\n".join(code))
-
-        index = docs / "index.rst"
-        index.write_text(
-            "Project\n=======\n\n.. toctree::\n   api.rst",
-            encoding="utf-8",
-        )
-        api = docs / "api.rst"
-        api.write_text(
-            f"API\n===\n\n{directive}\n",
-            encoding="utf-8",
-        )
-
-        spec = Path(__file__).parent / "openapi.yml"
-        shutil.copyfile(str(spec), str(docs / "openapi.yaml"))
-        shutil.copyfile(str(spec), str(docs / "other.yaml"))
-
-        Sphinx(
-            srcdir=str(docs),
-            confdir=str(docs),
-            outdir=str(build),
-            doctreedir=str(build / ".doctrees"),
-            buildername=sphinx_builder,
-        ).build()
-
-    return run
-
-
-def read_api_html(tmp_path: Path) -> str:
-    build = tmp_path / "build"
-    with open(build / "api.html", encoding="utf-8") as file:
-        return file.read()
+_logger = logging.getLogger(__name__)
 
 
 def test_run_empty(sphinx_runner: SphinxRunner) -> None:
@@ -129,11 +82,13 @@ def test_inline(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
     assert "sphinx" in html
     assert "https://cdn.jsdelivr.net" in html
     assert "_static/openapi.yaml" in html
-    assert "#one" in html
+    assert 'id="one"' in html
     assert "_static/other.yaml" in html
-    assert "#two" in html
-    assert html.count("SwaggerUIBundle(options") == 2
+    assert 'id="two"' in html
+    assert html.count('class="docutils container swagger-plugin-container"') == 2
     assert html.count("swagger-ui-bundle.js") == 1
+    assert html.count('src="_static/swagger-plugin-loader.js') == 1
+    assert "window.onload" not in html
 
     assert (tmp_path / "build" / "_static" / "openapi.yaml").exists()
     assert (tmp_path / "build" / "_static" / "other.yaml").exists()
@@ -154,8 +109,40 @@ def test_swagger_options(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
     assert "sphinx" in html
     assert "https://cdn.jsdelivr.net" in html
     assert "_static/openapi.yaml" in html
-    assert """var options = {...{'deepLinking': 1}};""" in html
-    assert html.count("SwaggerUIBundle(options)") == 1
+    assert 'data-swagger-options="{&quot;deepLinking&quot;: 1}"' in html
+    assert html.count('data-swagger-url="_static/openapi.yaml"') == 1
+
+
+def test_loader_script(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    sphinx_runner(
+        '.. swagger-plugin:: openapi.yaml\n   :swagger-options: {"deepLinking": 1}',
+        swagger_default_options={"filter": True},
+    )
+
+    loader = tmp_path / "build" / "_static" / "swagger-plugin-loader.js"
+    script = loader.read_text(encoding="utf-8")
+    assert 'const defaults = {"filter": true};' in script
+    assert "window.onload" not in script
+    if shutil.which("node"):
+        subprocess.run(["node", "--check", str(loader)], check=True)
+
+    html = read_api_html(tmp_path)
+    assert 'data-swagger-options="{&quot;deepLinking&quot;: 1}"' in html
+    assert "filter" not in html
+
+    sphinx_runner(
+        '.. swagger-plugin:: openapi.yaml\n   :full-page:\n   :swagger-options: {"a": null}',
+        swagger_default_options={"filter": True, "deepLinking": False},
+    )
+    line = next(
+        line
+        for line in read_api_html(tmp_path).splitlines()
+        if line.strip().startswith("config = ")
+    )
+    config = json.loads(line.split("=", 1)[1])
+    assert config == {"a": None, "deepLinking": False, "filter": True}
+    # Full pages do not use the loader.
+    assert not loader.exists()
 
 
 def test_openapi_search_index_not_in_html(
@@ -174,6 +161,296 @@ def test_openapi_search_index_not_in_html(
     assert "schema" in searchindex  # from "Schema Pet"
 
 
+def test_search_index_is_one_text_node(
+    sphinx_runner: SphinxRunner, tmp_path: Path
+) -> None:
+    app = sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml",
+        swagger_search_max_operations=1,
+        swagger_search_description_length=0,
+    )
+    doctree = app.env.get_doctree("api")
+    indexes = list(doctree.findall(SwaggerSearchIndex))
+    assert len(indexes) == 1
+    index = indexes[0]
+    assert [type(child) for child in index.children] == [nodes.Text]
+    assert index.astext().splitlines() == [
+        "Swagger Petstore 1.0.0",
+        "GET /pets — List all pets",
+        "Schema Pet",
+        "Schema Pets",
+        "Schema Error",
+    ]
+    searchindex = (tmp_path / "build" / "searchindex.js").read_text(encoding="utf-8")
+    assert "list" in searchindex
+    assert "specif" not in searchindex  # from "Info for a specific pet"
+
+
+def test_search_shards(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    app = sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml",
+        swagger_search_shards=True,
+        swagger_search_global_index=False,
+    )
+    html = read_api_html(tmp_path)
+    assert 'data-swagger-search="_static/openapi.search.json"' in html
+    shard = json.loads(
+        (tmp_path / "build" / "_static" / "openapi.search.json").read_bytes()
+    )
+    assert shard["entries"][0] == {
+        "title": "GET /pets — List all pets",
+        "text": "",
+        "tag": "pets",
+        "operation": "listPets",
+    }
+    assert not list(app.env.get_doctree("api").findall(SwaggerSearchIndex))
+    searchindex = (tmp_path / "build" / "searchindex.js").read_text(encoding="utf-8")
+    assert "pets" not in searchindex
+
+
+def test_split_by_tag(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml\n   :split-by-tag:",
+        swagger_inline_spec_max_bytes=10**6,
+    )
+    shard = tmp_path / "build" / "_static" / "openapi.tag-pets.yaml"
+    assert yaml.safe_load(shard.read_bytes())["paths"].keys() == {
+        "/pets",
+        "/pets/{petId}",
+    }
+    urls = '[{"name": "pets", "url": "_static/openapi.tag-pets.yaml"}]'
+    html = read_api_html(tmp_path)
+    assert f'data-swagger-urls="{escape(urls)}"' in html
+    assert "swagger-plugin-spec" not in html
+
+    sphinx_runner(".. swagger-plugin:: openapi.yaml\n   :full-page:\n   :split-by-tag:")
+    html = read_api_html(tmp_path)
+    assert f'config["urls"] = {urls}' in html
+    assert 'config["url"]' not in html
+
+
+def test_tag_shards_published_once(
+    sphinx_runner: SphinxRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    targets: list[str] = []
+    publish = _publish._publish
+
+    def record(source: Path, target: Path, *args: Any) -> Path:
+        targets.append(target.name)
+        return publish(source, target, *args)
+
+    monkeypatch.setattr(_publish, "_publish", record)
+    sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml\n   :split-by-tag:\n   :id: one\n\n"
+        ".. swagger-plugin:: openapi.yaml\n   :split-by-tag:\n   :id: two"
+    )
+    assert Counter(targets) == {"openapi.yaml": 1, "openapi.tag-pets.yaml": 1}
+
+
+def test_static_overview(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_static_overview=True)
+    html = read_api_html(tmp_path)
+    container = html[
+        html.index(
+            'data-swagger-url="_static/openapi.yaml" id="swagger-ui-container">'
+        ) :
+    ]
+    overview = container[: container.index("</div>")]
+    assert "<strong>Swagger Petstore</strong>" in overview
+    assert '<span class="swagger-plugin-overview-version">1.0.0</span>' in overview
+    assert "<li><code>GET</code> <code>/pets</code> List all pets</li>" in overview
+
+    sphinx_runner(".. swagger-plugin:: openapi.yaml")
+    assert "swagger-plugin-overview" not in read_api_html(tmp_path)
+
+
+def test_shake_published_spec(
+    sphinx_runner: SphinxRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    logged: list[tuple[Any, ...]] = []
+
+    def log(*args: Any) -> None:
+        logged.append(args)
+
+    monkeypatch.setattr(_tree_shake.logger, "info", log)
+    spec = yaml.safe_load((Path(__file__).parent / "openapi.yml").read_bytes())
+    spec["x-internal-owner"] = "team"
+    spec["components"]["schemas"]["Unused"] = {"type": "object"}
+    (tmp_path / "docs" / "shaken.yaml").write_text(yaml.dump(spec), encoding="utf-8")
+    sphinx_runner(
+        ".. swagger-plugin:: shaken.yaml\n   :id: first\n\n"
+        ".. swagger-plugin:: shaken.yaml\n   :id: second",
+        swagger_prune_components=True,
+        swagger_strip_extensions=["x-internal-*"],
+    )
+    # Shaken and logged once for both directives.
+    assert len(logged) == 1
+    # Components, extensions and examples removed, and the size before and after.
+    assert logged[0][1:4] == (1, 1, 0)
+    assert logged[0][5] > logged[0][6]
+    published = yaml.safe_load(
+        (tmp_path / "build" / "_static" / "shaken.yaml").read_bytes()
+    )
+    assert "x-internal-owner" not in published
+    assert set(published["components"]["schemas"]) == {"Pet", "Pets", "Error"}
+    assert (
+        "Unused"
+        in yaml.safe_load((tmp_path / "docs" / "shaken.yaml").read_bytes())[
+            "components"
+        ]["schemas"]
+    )
+
+
+def test_publish_method(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_publish_method="hardlink")
+    published = tmp_path / "build" / "_static" / "openapi.yaml"
+    assert published.samefile(tmp_path / "docs" / "openapi.yaml")
+
+
+def test_precompress(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_precompress=True)
+    sibling = tmp_path / "build" / "_static" / "openapi.yaml.gz"
+    spec = tmp_path / "docs" / "openapi.yaml"
+    assert gzip.decompress(sibling.read_bytes()) == spec.read_bytes()
+    loader = tmp_path / "build" / "_static" / "swagger-plugin-loader.js"
+    loader_sibling = loader.with_name(loader.name + ".gz")
+    assert gzip.decompress(loader_sibling.read_bytes()) == loader.read_bytes()
+
+    # Without inline directives, the loader is removed with its sibling.
+    sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml\n   :full-page:", swagger_precompress=True
+    )
+    assert not loader_sibling.exists()
+
+
+def test_stale_search_lines_are_removed(
+    sphinx_runner: SphinxRunner, tmp_path: Path
+) -> None:
+    # Search lines held in memory are not written to disk.
+    spec_cache.clear()
+    sphinx_runner(".. swagger-plugin:: openapi.yaml")
+    search = tmp_path / "build" / ".doctrees" / "swagger_plugin" / "search"
+    first = {path.name for path in search.iterdir()}
+    spec_cache.clear()
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_search_max_operations=1)
+    second = {path.name for path in search.iterdir()}
+    assert len(first) == len(second) == 1
+    assert first != second
+
+
+def test_build_report(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    spec_cache.clear()
+    sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml",
+        swagger_build_report=True,
+        swagger_build_report_json="reports/swagger.json",
+        swagger_build_trace="swagger-trace.json",
+    )
+    report = json.loads((tmp_path / "build" / "reports" / "swagger.json").read_bytes())
+    rows = {row["spec"]: row for row in report["summary"]}
+    assert set(rows) == {"openapi.yaml", ""}
+    row = rows["openapi.yaml"]
+    assert row["count"] == 1
+    assert row["total"] >= row["parse"] > 0
+    assert row["bytes_published"] == (tmp_path / "docs" / "openapi.yaml").stat().st_size
+    assert row["lines_indexed"] > 0
+    trace = json.loads((tmp_path / "build" / "swagger-trace.json").read_bytes())
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"directive", "resolve", "publish", "parse", "index", "render"} <= names
+
+
+def test_spec_cache_stats(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    spec_cache.clear()
+    contents = dedent("""
+    .. swagger-plugin:: openapi.yaml
+       :id: one
+
+    .. swagger-plugin:: other.yaml
+       :id: two
+    """)
+    app = sphinx_runner(directive=contents)
+    assert get_registry(app.env).cache_stats == {"api": Counter(hits=1, misses=1)}
+    assert list(
+        (tmp_path / "build" / ".doctrees" / "swagger_plugin" / "search").iterdir()
+    )
+
+    # A new process only finds the search lines persisted next to the doctrees.
+    spec_cache.clear()
+    app = sphinx_runner(directive=contents)
+    assert get_registry(app.env).cache_stats == {"api": Counter(hits=1, disk_hits=1)}
+
+
+def test_spec_format_json(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    contents = dedent("""
+    .. swagger-plugin:: openapi.yaml
+
+    .. swagger-plugin:: other.yaml
+       :full-page:
+    """)
+    sphinx_runner(contents, swagger_spec_format="json")
+
+    html = read_api_html(tmp_path)
+    assert "_static/openapi.json" in html
+    static = tmp_path / "build" / "_static"
+    assert not (static / "openapi.yaml").exists()
+    published = (static / "openapi.json").read_text(encoding="utf-8")
+    assert json.loads(published)["info"]["title"] == "Swagger Petstore"
+    assert "\n" not in published
+    assert (static / "other.json").exists()
+
+
+def test_inline_small_spec(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    size = (Path(__file__).parent / "openapi.yml").stat().st_size
+    app = sphinx_runner(
+        ".. swagger-plugin:: openapi.yaml", swagger_inline_spec_max_bytes=size
+    )
+
+    html = read_api_html(tmp_path)
+    assert '<script type="application/json" class="swagger-plugin-spec">{' in html
+    assert '"title":"Swagger Petstore"' in html
+    assert 'data-swagger-url="_static/openapi.yaml"' in html
+    # The inlined spec is kept in the doctree only, not in the environment as well.
+    assert "spec_json" not in get_registry(app.env).configs["api"][0]
+
+
+def test_inline_spec_above_threshold(
+    sphinx_runner: SphinxRunner, tmp_path: Path
+) -> None:
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_inline_spec_max_bytes=10)
+
+    html = read_api_html(tmp_path)
+    assert "swagger-plugin-spec" not in html
+    assert 'data-swagger-url="_static/openapi.yaml"' in html
+
+
+def test_lazy_option(sphinx_runner: SphinxRunner, tmp_path: Path) -> None:
+    contents = dedent("""
+    .. swagger-plugin:: openapi.yaml
+       :id: one
+       :lazy:
+
+    .. swagger-plugin:: other.yaml
+       :id: two
+    """)
+    sphinx_runner(contents)
+
+    html = read_api_html(tmp_path)
+    assert html.count("data-swagger-lazy") == 1
+    assert (
+        'data-swagger-lazy="" data-swagger-url="_static/openapi.yaml" id="one"' in html
+    )
+
+
+@pytest.mark.parametrize("lazy_load", [True, False])
+def test_lazy_load_config(
+    sphinx_runner: SphinxRunner, tmp_path: Path, lazy_load: bool
+) -> None:
+    sphinx_runner(".. swagger-plugin:: openapi.yaml", swagger_lazy_load=lazy_load)
+
+    html = read_api_html(tmp_path)
+    assert ("data-swagger-lazy" in html) is lazy_load
+
+
 def test_swagger_plugin_directive_same_dir(
     sphinx_runner: SphinxRunner, tmp_path: Path
 ) -> None:
@@ -181,28 +458,51 @@ def test_swagger_plugin_directive_same_dir(
 
     html = read_api_html(tmp_path)
     assert "_static/openapi.yaml" in html
-    assert "#swagger-ui-container" in html
+    assert 'id="swagger-ui-container"' in html
 
     spec = tmp_path / "build" / "_static" / "openapi.yaml"
     assert spec.exists()
 
 
 def test_swagger_plugin_mirror_resources(
-    sphinx_runner: SphinxRunner, tmp_path: Path
+    sphinx_runner: SphinxRunner,
+    tmp_path: Path,
+    asset_server: AssetServer,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    sphinx_runner(
-        ".. swagger-plugin:: openapi.yaml", swagger_mirror_external_resources=True
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    uris = (
+        asset_server.url("swagger-ui-standalone-preset.js"),
+        asset_server.url("swagger-ui-bundle.js"),
+        asset_server.url("swagger-ui.css"),
     )
+    contents = dedent("""
+    .. swagger-plugin:: openapi.yaml
+       :id: one
+
+    .. swagger-plugin:: other.yaml
+       :id: two
+    """)
+    sphinx_runner(contents, *uris, swagger_mirror_external_resources=True)
 
     html = read_api_html(tmp_path)
     assert "_static/swagger-ui-standalone-preset.js" in html
     assert "_static/swagger-ui-bundle.js" in html
     assert "_static/swagger-ui.css" in html
-    assert "https://cdn.jsdelivr.net/npm/swagger-ui-dist@latest" not in html
+    assert asset_server.base_url not in html
 
     assert (tmp_path / "build" / "_static" / "swagger-ui-standalone-preset.js").exists()
     assert (tmp_path / "build" / "_static" / "swagger-ui-bundle.js").exists()
     assert (tmp_path / "build" / "_static" / "swagger-ui.css").exists()
+    # Each asset is fetched once per build, not once per directive.
+    assert sorted(status for _, status in asset_server.requests) == [200, 200, 200]
+
+    sphinx_runner(contents, *uris, swagger_mirror_external_resources=True)
+    assert sorted(status for _, status in asset_server.requests)[3:] == [304, 304, 304]
+
+    # Nothing is fetched for projects without a directive.
+    sphinx_runner("No spec here.", *uris, swagger_mirror_external_resources=True)
+    assert len(asset_server.requests) == 6
 
 
 def test_swagger_plugin_no_mirror_resources(
@@ -235,7 +535,7 @@ def test_swagger_plugin_dirhtml(sphinx_runner: SphinxRunner, tmp_path: Path) ->
         html = file.read()
 
     assert "_static/openapi.yaml" in html
-    assert "#swagger-ui-container" in html
+    assert 'id="swagger-ui-container"' in html
 
     spec = tmp_path / "build" / "_static" / "openapi.yaml"
     assert spec.exists()
@@ -378,15 +678,15 @@ def test_subdirs(tmp_path: Path, builder: str) -> None:
     if builder == "html":
         with open(build / "subdir" / "one.html", encoding="utf-8") as file:
             html = file.read()
-            assert "#swagger-ui-container" in html
+            assert 'id="swagger-ui-container"' in html
             assert "../_static/api/one/yaml/openapi.yaml" in html
 
         with open(
             build / "subdir" / "subdirtwo" / "two.html", encoding="utf-8"
         ) as file:
             html = file.read()
-            assert "#from-docs" in html
-            assert "#from-code" in html
+            assert 'id="from-docs"' in html
+            assert 'id="from-code"' in html
             assert "../../_static/api/two/yaml/openapi.yaml" in html
             assert "../../_static/dot-dot/code/openapi.yaml" in html
 
@@ -401,3 +701,273 @@ def test_subdirs(tmp_path: Path, builder: str) -> None:
             html = file.read()
             assert "../../../_static/api/two/yaml/openapi.yaml" in html
             assert "../../../_static/dot-dot/code/openapi.yaml" in html
+
+
+def _build_reading(docs: Path, build: Path) -> list[str]:
+    """Build the project and return the documents that were read."""
+    app = Sphinx(
+        srcdir=str(docs),
+        confdir=str(docs),
+        outdir=str(build),
+        doctreedir=str(build / ".doctrees"),
+        buildername="html",
+    )
+    read: list[str] = []
+    app.connect("env-before-read-docs", lambda _app, _env, names: read.extend(names))
+    app.build()
+    return sorted(read)
+
+
+def test_incremental_rebuild_on_spec_change(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    build = tmp_path / "build"
+    spec = Path(__file__).parent / "openapi.yml"
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']", encoding="utf-8"
+    )
+    (docs / "index.rst").write_text(
+        "Project\n=======\n\n.. toctree::\n\n   one\n   two\n   three\n",
+        encoding="utf-8",
+    )
+    for name, spec_name in (("one", "one"), ("two", "two"), ("three", "two")):
+        shutil.copyfile(spec, docs / f"{spec_name}.yaml")
+        (docs / f"{name}.rst").write_text(
+            f"{name}\n=====\n\n.. swagger-plugin:: {spec_name}.yaml\n",
+            encoding="utf-8",
+        )
+
+    assert _build_reading(docs, build) == ["index", "one", "three", "two"]
+    assert not _build_reading(docs, build)
+
+    two = docs / "two.yaml"
+    two.write_text(
+        two.read_text(encoding="utf-8").replace("Swagger Petstore", "Changed"),
+        encoding="utf-8",
+    )
+    assert _build_reading(docs, build) == ["three", "two"]
+    assert "Changed" in (build / "_static" / "two.yaml").read_text(encoding="utf-8")
+
+    # Content changes are detected even if the modification time goes backwards.
+    stat = two.stat()
+    two.write_text(
+        two.read_text(encoding="utf-8").replace("Changed", "Restored"),
+        encoding="utf-8",
+    )
+    os.utime(two, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**12))
+    assert _build_reading(docs, build) == ["three", "two"]
+    assert "Restored" in (build / "_static" / "two.yaml").read_text(encoding="utf-8")
+
+
+def test_unchanged_full_pages_are_not_rewritten(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    build = tmp_path / "build"
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']", encoding="utf-8"
+    )
+    (docs / "index.rst").write_text(
+        "Project\n=======\n\n.. toctree::\n\n   one\n   two\n", encoding="utf-8"
+    )
+    shutil.copyfile(Path(__file__).parent / "openapi.yml", docs / "openapi.yaml")
+    for name in ("one", "two"):
+        (docs / f"{name}.rst").write_text(
+            f"{name}\n===\n\n.. swagger-plugin:: openapi.yaml\n   :full-page:\n",
+            encoding="utf-8",
+        )
+    _build_reading(docs, build)
+    pages = {name: build / f"{name}.html" for name in ("one", "two")}
+    written = {name: page.stat().st_mtime_ns for name, page in pages.items()}
+
+    (docs / "two.rst").write_text(
+        "two\n===\n\n.. swagger-plugin:: openapi.yaml\n   :full-page:\n"
+        "   :page-title: Two\n",
+        encoding="utf-8",
+    )
+    assert _build_reading(docs, build) == ["two"]
+    assert pages["one"].stat().st_mtime_ns == written["one"]
+    assert "<title>Two</title>" in pages["two"].read_text(encoding="utf-8")
+
+    pages["one"].unlink()
+    assert not _build_reading(docs, build)
+    assert "<title>OpenAPI Specification</title>" in pages["one"].read_text(
+        encoding="utf-8"
+    )
+
+
+def test_bundled_spec_rebuilds_on_reference_change(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    (docs / "schemas").mkdir(parents=True)
+    build = tmp_path / "build"
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']", encoding="utf-8"
+    )
+    (docs / "index.rst").write_text(
+        "Project\n=======\n\n.. swagger-plugin:: api.yaml\n", encoding="utf-8"
+    )
+    (docs / "api.yaml").write_text(
+        "openapi: 3.0.3\ninfo: {title: Split, version: '1'}\npaths: {}\n"
+        "components:\n  schemas:\n    Pet: {$ref: 'schemas/pet.yaml'}\n",
+        encoding="utf-8",
+    )
+    pet = docs / "schemas" / "pet.yaml"
+    pet.write_text("type: object\ndescription: A pet\n", encoding="utf-8")
+
+    assert _build_reading(docs, build) == ["index"]
+    published = yaml.safe_load((build / "_static" / "api.yaml").read_bytes())
+    assert published["components"]["schemas"]["Pet"] == {
+        "type": "object",
+        "description": "A pet",
+    }
+    assert not (build / "_static" / "schemas").exists()
+
+    pet.write_text("type: object\ndescription: A cat\n", encoding="utf-8")
+    assert _build_reading(docs, build) == ["index"]
+    published = yaml.safe_load((build / "_static" / "api.yaml").read_bytes())
+    assert published["components"]["schemas"]["Pet"]["description"] == "A cat"
+
+
+def test_fingerprinted_specs(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    build = tmp_path / "build"
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']\n"
+        "swagger_fingerprint_specs = True\n"
+        "swagger_cache_headers = ['headers', 'nginx']\n",
+        encoding="utf-8",
+    )
+    (docs / "index.rst").write_text(
+        "Project\n=======\n\n.. toctree::\n\n   one\n   two\n", encoding="utf-8"
+    )
+    for name in ("one", "two"):
+        (docs / f"{name}.rst").write_text(
+            f"{name}\n===\n\n.. swagger-plugin:: openapi.yaml\n", encoding="utf-8"
+        )
+    spec = docs / "openapi.yaml"
+    shutil.copyfile(Path(__file__).parent / "openapi.yml", spec)
+
+    _build_reading(docs, build)
+    published = [path.name for path in (build / "_static").glob("openapi.*.yaml")]
+    assert published == [f"openapi.{spec_cache.digest(spec)[:12]}.yaml"]
+    for name in ("one", "two"):
+        html = (build / f"{name}.html").read_text(encoding="utf-8")
+        assert f'data-swagger-url="_static/{published[0]}"' in html
+    assert f"/_static/{published[0]}" in (build / "_headers").read_text(
+        encoding="utf-8"
+    )
+    assert (build / "swagger-plugin-nginx.conf").exists()
+
+    spec.write_text(
+        spec.read_text(encoding="utf-8").replace("Swagger Petstore", "Changed"),
+        encoding="utf-8",
+    )
+    _build_reading(docs, build)
+    republished = [path.name for path in (build / "_static").glob("openapi.*.yaml")]
+    assert republished == [f"openapi.{spec_cache.digest(spec)[:12]}.yaml"]
+    assert republished != published
+    assert published[0] not in (build / "_headers").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("builder", ["text", "latex", "epub", "linkcheck"])
+def test_builder_without_swagger_ui(
+    sphinx_runner: SphinxRunner, tmp_path: Path, builder: str
+) -> None:
+    spec_cache.clear()
+    app = sphinx_runner(".. swagger-plugin:: openapi.yaml", sphinx_builder=builder)
+    registry = get_registry(app.env)
+    assert not sum(registry.cache_stats.values(), Counter())
+    assert not list(tmp_path.joinpath("build").rglob("openapi*"))
+    assert "api" in registry.spec_docs[str(tmp_path / "docs" / "openapi.yaml")]
+
+
+def test_builders_share_environment(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']", encoding="utf-8"
+    )
+    (docs / "index.rst").write_text(
+        "API\n===\n\n.. swagger-plugin:: openapi.yaml\n", encoding="utf-8"
+    )
+    shutil.copyfile(Path(__file__).parent / "openapi.yml", docs / "openapi.yaml")
+    doctrees = tmp_path / "doctrees"
+
+    def build(builder: str) -> list[str]:
+        app = Sphinx(
+            srcdir=str(docs),
+            confdir=str(docs),
+            outdir=str(tmp_path / builder),
+            doctreedir=str(doctrees),
+            buildername=builder,
+        )
+        read: list[str] = []
+        app.connect(
+            "env-before-read-docs", lambda _app, _env, names: read.extend(names)
+        )
+        app.build()
+        return read
+
+    assert build("text") == ["index"]
+    # HTML needs the spec published and indexed, which the text builder skipped.
+    assert build("html") == ["index"]
+    assert (tmp_path / "html" / "_static" / "openapi.yaml").is_file()
+    # Doctrees read for HTML contain the search text, other builders skip it.
+    assert not build("text")
+    assert "List all pets" not in (tmp_path / "text" / "index.txt").read_text(
+        encoding="utf-8"
+    )
+
+
+def _output_files(build: Path) -> dict[str, bytes]:
+    return {
+        str(path.relative_to(build)): path.read_bytes()
+        for path in sorted(build.rglob("*"))
+        if path.is_file() and ".doctrees" not in path.parts
+    }
+
+
+def test_parallel_build_matches_serial(tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    spec = Path(__file__).parent / "openapi.yml"
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']", encoding="utf-8"
+    )
+    pages = [f"page{index}" for index in range(12)]
+    (docs / "index.rst").write_text(
+        "Project\n=======\n\n.. toctree::\n\n" + "".join(f"   {p}\n" for p in pages),
+        encoding="utf-8",
+    )
+    for index, page in enumerate(pages):
+        shutil.copyfile(spec, docs / f"{page}.yaml")
+        options = "   :full-page:\n" if not index % 4 else f"   :id: spec-{index}\n"
+        (docs / f"{page}.rst").write_text(
+            f"{page}\n======\n\n.. swagger-plugin:: {page}.yaml\n{options}\n"
+            f".. swagger-plugin:: page0.yaml\n   :id: shared\n",
+            encoding="utf-8",
+        )
+
+    timings = {}
+    for name, parallel in (("serial", 1), ("parallel", max(os.cpu_count() or 1, 2))):
+        build = tmp_path / name
+        app = Sphinx(
+            srcdir=str(docs),
+            confdir=str(docs),
+            outdir=str(build),
+            doctreedir=str(build / ".doctrees"),
+            buildername="html",
+            parallel=parallel,
+        )
+        start = time.perf_counter()
+        app.build()
+        timings[name] = time.perf_counter() - start
+        assert sorted(get_registry(app.env).configs) == sorted(pages)
+
+    _logger.info(
+        "Serial build %.2fs, parallel build %.2fs, speedup %.2f.",
+        timings["serial"],
+        timings["parallel"],
+        timings["serial"] / timings["parallel"],
+    )
+    assert _output_files(tmp_path / "serial") == _output_files(tmp_path / "parallel")
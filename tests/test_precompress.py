@@ -0,0 +1,65 @@
+"""Tests for writing gzip siblings of published files."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+from swagger_plugin_for_sphinx._precompress import gzip_sibling, precompress
+
+
+def test_precompress(tmp_path: Path) -> None:
+    spec = tmp_path / "openapi.yaml"
+    spec.write_text("openapi: 3.0.0\n" * 100, encoding="utf-8")
+    manifest = tmp_path / "cache" / "precompress.json"
+
+    results = precompress([spec, spec], manifest)
+    assert len(results) == 1
+    result = results[0]
+    assert result.written
+    assert result.compressed_size == gzip_sibling(spec).stat().st_size < result.size
+    assert gzip.decompress(gzip_sibling(spec).read_bytes()) == spec.read_bytes()
+    recorded = json.loads(manifest.read_bytes())
+    assert recorded == {str(spec): [result.digest, result.compressed_size]}
+
+    mtime = manifest.stat().st_mtime_ns
+    result = precompress([spec], manifest)[0]
+    assert not result.written
+    assert manifest.stat().st_mtime_ns == mtime
+
+    gzip_sibling(spec).unlink()
+    result = precompress([spec], manifest)[0]
+    assert result.written
+    assert gzip_sibling(spec).exists()
+
+
+def test_precompress_changed(tmp_path: Path) -> None:
+    spec = tmp_path / "openapi.yaml"
+    spec.write_text("openapi: 3.0.0\n" * 100, encoding="utf-8")
+    manifest = tmp_path / "precompress.json"
+    precompress([spec], manifest)
+
+    spec.write_text("openapi: 3.1.0\n" * 100, encoding="utf-8")
+    result = precompress([spec], manifest)[0]
+    assert result.written
+    assert gzip.decompress(gzip_sibling(spec).read_bytes()) == spec.read_bytes()
+
+    # The sibling goes with its file.
+    spec.unlink()
+    assert not precompress([spec], manifest)
+    assert not gzip_sibling(spec).exists()
+
+
+def test_precompress_incompressible(tmp_path: Path) -> None:
+    data = tmp_path / "random.bin"
+    data.write_bytes(os.urandom(256))
+    missing = tmp_path / "missing.json"
+    manifest = tmp_path / "precompress.json"
+
+    results = precompress([data, missing], manifest)
+    assert len(results) == 1
+    result = results[0]
+    assert result.compressed_size is None
+    assert not gzip_sibling(data).exists()
@@ -0,0 +1,104 @@
+"""Tests for parsing specs in a process pool before reading."""
+
+from __future__ import annotations
+
+import shutil
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from sphinx.application import Sphinx
+
+from swagger_plugin_for_sphinx import _preparse
+from swagger_plugin_for_sphinx._preparse import referenced_specs
+from swagger_plugin_for_sphinx._registry import get_registry
+from swagger_plugin_for_sphinx._spec_cache import spec_cache
+
+
+def _project(tmp_path: Path, workers: int) -> Sphinx:
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "conf.py").write_text(
+        "extensions = ['swagger_plugin_for_sphinx']\n"
+        f"swagger_preparse_workers = {workers}\n",
+        encoding="utf-8",
+    )
+    (docs / "index.rst").write_text(
+        "API\n===\n\n.. toctree::\n\n   sub/page\n\n"
+        ".. swagger-plugin:: openapi.yaml\n   :id: one\n\n"
+        "..  swagger-plugin:: /openapi.yaml\n   :id: two\n",
+        encoding="utf-8",
+    )
+    (docs / "sub" / "page.rst").write_text(
+        "Page\n====\n\n.. swagger-plugin:: other.yaml\n", encoding="utf-8"
+    )
+    spec = Path(__file__).with_name("openapi.yml")
+    shutil.copyfile(spec, docs / "openapi.yaml")
+    (docs / "sub" / "other.yaml").write_text(
+        spec.read_text(encoding="utf-8").replace("Swagger Petstore", "Other"),
+        encoding="utf-8",
+    )
+    return Sphinx(
+        srcdir=str(docs),
+        confdir=str(docs),
+        outdir=str(tmp_path / "build"),
+        doctreedir=str(tmp_path / "doctrees"),
+        buildername="html",
+    )
+
+
+def test_referenced_specs(tmp_path: Path) -> None:
+    app = _project(tmp_path, 0)
+    docs = tmp_path / "docs"
+    (docs / "third.yaml").write_text("openapi: 3.0.3\n", encoding="utf-8")
+    # The scan also finds directives in MyST syntax.
+    (docs / "other.rst").write_text(
+        "```{swagger-plugin} third.yaml\n```\n\n.. swagger-plugin:: missing.yaml\n",
+        encoding="utf-8",
+    )
+    # Full pages need no search lines.
+    (docs / "full.yaml").write_text("openapi: 3.0.3\n", encoding="utf-8")
+    (docs / "full.rst").write_text(
+        ".. swagger-plugin:: full.yaml\n   :page-title: Full\n   :full-page:\n",
+        encoding="utf-8",
+    )
+    docnames = ["index", "sub/page", "other", "full", "unknown"]
+    assert referenced_specs(app.env, docnames) == [
+        (docs / "openapi.yaml").resolve(),
+        (docs / "sub" / "other.yaml").resolve(),
+        (docs / "third.yaml").resolve(),
+    ]
+
+
+def test_preparse(tmp_path: Path) -> None:
+    spec_cache.clear()
+    app = _project(tmp_path, 2)
+    app.build()
+    # The directives find every spec and its search lines already parsed.
+    assert get_registry(app.env).cache_stats == {
+        "index": Counter(hits=2),
+        "sub/page": Counter(hits=1),
+    }
+
+
+def test_preparse_skips_cached_search_lines(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    spec_cache.clear()
+    _project(tmp_path, 2).build()
+    spec_cache.clear()
+    # Nothing is left to parse, so no processes are started.
+    monkeypatch.setattr(_preparse, "ProcessPoolExecutor", None)
+    app = Sphinx(
+        srcdir=str(tmp_path / "docs"),
+        confdir=str(tmp_path / "docs"),
+        outdir=str(tmp_path / "build"),
+        doctreedir=str(tmp_path / "doctrees"),
+        buildername="html",
+        freshenv=True,
+    )
+    app.build()
+    assert get_registry(app.env).cache_stats == {
+        "index": Counter(disk_hits=1, hits=1),
+        "sub/page": Counter(disk_hits=1),
+    }
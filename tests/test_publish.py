@@ -0,0 +1,188 @@
+"""Tests for publishing specs to the output directory."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import math
+import shutil
+from pathlib import Path
+
+import pytest
+
+from swagger_plugin_for_sphinx._fileutil import place_file
+from swagger_plugin_for_sphinx._publish import (
+    fingerprinted,
+    inline_spec,
+    minified_json,
+    publish_spec,
+    remove_stale_fingerprints,
+    write_if_changed,
+)
+from swagger_plugin_for_sphinx._spec_cache import file_digest
+
+_SPEC = Path(__file__).with_name("openapi.yml")
+
+
+def test_minified_json() -> None:
+    spec = {"info": {"title": "Ünïcode"}, "paths": {}}
+    assert minified_json(spec) == '{"info":{"title":"Ünïcode"},"paths":{}}'.encode()
+
+
+def test_minified_json_dates() -> None:
+    spec = {"example": datetime.date(2020, 1, 2)}
+    assert json.loads(minified_json(spec)) == {"example": "2020-01-02"}
+
+
+@pytest.mark.parametrize("value", [object(), math.nan])
+def test_minified_json_invalid(value: object) -> None:
+    with pytest.raises((TypeError, ValueError)):
+        minified_json({"example": value})
+
+
+def test_write_if_changed(tmp_path: Path) -> None:
+    target = tmp_path / "sub" / "file.json"
+    assert write_if_changed(target, b"{}")
+    mtime = target.stat().st_mtime_ns
+    assert not write_if_changed(target, b"{}")
+    assert target.stat().st_mtime_ns == mtime
+    assert write_if_changed(target, b"[]")
+    assert target.read_bytes() == b"[]"
+
+
+def test_publish_source(tmp_path: Path) -> None:
+    target = tmp_path / "out" / "openapi.yml"
+    assert publish_spec(_SPEC, target, "source") == target
+    assert target.read_bytes() == _SPEC.read_bytes()
+
+
+def test_publish_hardlink(tmp_path: Path) -> None:
+    source = tmp_path / "spec.yaml"
+    shutil.copyfile(_SPEC, source)
+    target = tmp_path / "out" / "spec.yaml"
+    assert publish_spec(source, target, "source", method="hardlink") == target
+    assert target.samefile(source)
+
+
+def test_place_file(tmp_path: Path) -> None:
+    source = tmp_path / "spec.yaml"
+    shutil.copyfile(_SPEC, source)
+    target = tmp_path / "out" / "spec.yaml"
+    assert place_file(source, target) == "copy"
+    mtime = target.stat().st_mtime_ns
+    assert place_file(source, target) == "unchanged"
+    assert target.stat().st_mtime_ns == mtime
+
+    assert place_file(source, target, "hardlink") == "unchanged"
+    source.write_bytes(b"changed")
+    assert place_file(source, target, "hardlink") == "hardlink"
+    assert place_file(source, target, "reflink") == "unchanged"
+
+    # Replacing a hard link leaves the file it is linked to alone.
+    other = tmp_path / "other.yaml"
+    other.write_bytes(b"other")
+    assert place_file(other, target, "reflink") in {"reflink", "copy"}
+    assert target.read_bytes() == b"other"
+    assert source.read_bytes() == b"changed"
+    assert [path.name for path in target.parent.iterdir()] == ["spec.yaml"]
+
+
+def test_publish_json(tmp_path: Path) -> None:
+    target = tmp_path / "out" / "openapi.yml"
+    published = publish_spec(_SPEC, target, "json")
+    assert published == tmp_path / "out" / "openapi.json"
+    assert not target.exists()
+    assert json.loads(published.read_bytes())["info"]["title"] == "Swagger Petstore"
+    assert published.stat().st_size < _SPEC.stat().st_size
+
+
+def test_publish_json_falls_back_to_source(tmp_path: Path) -> None:
+    source = tmp_path / "spec.yaml"
+    shutil.copyfile(_SPEC, source)
+    with source.open("a", encoding="utf-8") as handle:
+        handle.write("x-number: .nan\n")
+    target = tmp_path / "out" / "spec.yaml"
+    assert publish_spec(source, target, "json") == target
+    assert target.read_bytes() == source.read_bytes()
+
+
+def test_publish_fingerprinted(tmp_path: Path) -> None:
+    target = tmp_path / "out" / "openapi.yml"
+    published = publish_spec(_SPEC, target, "source", fingerprint=True)
+    assert published == fingerprinted(target, file_digest(_SPEC))
+    assert published.name == f"openapi.{file_digest(_SPEC)[:12]}.yml"
+    assert published.read_bytes() == _SPEC.read_bytes()
+
+    published = publish_spec(_SPEC, target, "json", fingerprint=True)
+    assert published.parent == target.parent
+    assert published.name.startswith("openapi.")
+    assert published.suffix == ".json"
+    assert published.read_bytes() == minified_json(json.loads(published.read_bytes()))
+
+
+def test_publish_once_per_digest(tmp_path: Path) -> None:
+    target = tmp_path / "out" / "openapi.yml"
+    published = publish_spec(_SPEC, target, "source", digest="abc")
+    published.write_bytes(b"changed")
+    assert publish_spec(_SPEC, target, "source", digest="abc") == published
+    assert published.read_bytes() == b"changed"
+
+    publish_spec(_SPEC, target, "source", digest="def")
+    assert published.read_bytes() == _SPEC.read_bytes()
+
+
+def test_publish_once_per_method(tmp_path: Path) -> None:
+    source = tmp_path / "spec.yaml"
+    shutil.copyfile(_SPEC, source)
+    target = tmp_path / "out" / "spec.yaml"
+    publish_spec(source, target, "source", digest="abc")
+    target.write_bytes(b"changed")
+    assert publish_spec(source, target, "source", digest="abc") == target
+    assert target.read_bytes() == b"changed"
+
+    publish_spec(source, target, "source", digest="abc", method="hardlink")
+    assert target.samefile(source)
+
+
+def test_remove_stale_fingerprints(tmp_path: Path) -> None:
+    current = tmp_path / "openapi.3f2a9c0b17d4.yml"
+    stale = tmp_path / "openapi.ba9876543210.yml"
+    unrelated = [
+        tmp_path / "openapi.yml",
+        tmp_path / "openapi.notahexdigest.yml",
+        tmp_path / "openapi.ba9876543210.json",
+        tmp_path / "other.ba9876543210.yml",
+    ]
+    for path in (current, stale, stale.with_name(stale.name + ".gz"), *unrelated):
+        path.write_bytes(b"")
+    assert remove_stale_fingerprints(tmp_path, [current]) == [Path(stale.name)]
+    assert not stale.with_name(stale.name + ".gz").exists()
+    assert current.exists()
+    assert not stale.exists()
+    assert all(path.exists() for path in unrelated)
+
+
+def test_inline_spec() -> None:
+    embedded = inline_spec(_SPEC, 10**6)
+    assert embedded is not None
+    assert json.loads(embedded)["info"]["title"] == "Swagger Petstore"
+    assert inline_spec(_SPEC, 100) is None
+    assert inline_spec(_SPEC, 0) is None
+
+
+def test_inline_spec_escapes_script_end(tmp_path: Path) -> None:
+    source = tmp_path / "spec.json"
+    source.write_text(
+        '{"info": {"title": "</script><!-- x"}, "paths": {}}', encoding="utf-8"
+    )
+    embedded = inline_spec(source, 10**6)
+    assert embedded is not None
+    assert "</" not in embedded
+    assert "<!--" not in embedded
+    assert json.loads(embedded)["info"]["title"] == "</script><!-- x"
+
+
+def test_inline_spec_not_json(tmp_path: Path) -> None:
+    source = tmp_path / "spec.yaml"
+    source.write_text("x-number: .nan\n", encoding="utf-8")
+    assert inline_spec(source, 10**6) is None
@@ -0,0 +1,236 @@
+"""Tests for the parsed-spec cache."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from swagger_plugin_for_sphinx import _spec_cache
+from swagger_plugin_for_sphinx._openapi_index import (
+    DEFAULT_SEARCH_LIMITS,
+    SEARCH_FORMAT_VERSION,
+    SearchLimits,
+)
+from swagger_plugin_for_sphinx._spec_cache import SpecCache, file_digest
+
+_SPEC = Path(__file__).with_name("openapi.yml")
+
+
+@pytest.fixture
+def spec(tmp_path: Path) -> Path:
+    path = tmp_path / "openapi.yml"
+    shutil.copyfile(_SPEC, path)
+    return path
+
+
+def test_load_is_cached(spec: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    stats: Counter[str] = Counter()
+    first = cache.load(spec, stats)
+    second = cache.load(spec, stats)
+    assert first is second
+    assert stats == Counter(misses=1, hits=1)
+
+
+def test_same_content_shares_entry(spec: Path, tmp_path: Path) -> None:
+    other = tmp_path / "copy.yml"
+    shutil.copyfile(spec, other)
+    cache = SpecCache(max_bytes=10**6)
+    stats: Counter[str] = Counter()
+    assert cache.load(spec, stats) is cache.load(other, stats)
+    assert stats == Counter(misses=1, hits=1)
+
+
+def test_changed_content_is_reparsed(spec: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    assert cache.load(spec)["info"]["title"] == "Swagger Petstore"
+    spec.write_text(
+        spec.read_text(encoding="utf-8").replace("Swagger Petstore", "Changed"),
+        encoding="utf-8",
+    )
+    assert cache.load(spec)["info"]["title"] == "Changed"
+
+
+def test_digest_fast_path(spec: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    digest = cache.digest(spec)
+    assert digest == file_digest(spec)
+
+    def fail(_path: Path) -> str:
+        raise AssertionError("file was hashed again")
+
+    monkeypatch.setattr(_spec_cache, "file_digest", fail)
+    assert cache.digest(spec) == digest
+
+
+def test_digests_persisted(
+    spec: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "cache"
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, cache_dir)
+    digest = cache.digest(spec)
+    cache.save_digests()
+
+    def fail(_path: Path) -> str:
+        raise AssertionError("file was hashed again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_spec_cache, "file_digest", fail)
+        fresh = SpecCache(max_bytes=10**6)
+        fresh.configure(10**6, cache_dir)
+        assert fresh.digest(spec) == digest
+
+    spec.write_text("openapi: 3.0.0\n", encoding="utf-8")
+    os.utime(spec, ns=(1, 1))
+    fresh = SpecCache(max_bytes=10**6)
+    fresh.configure(10**6, cache_dir)
+    assert fresh.digest(spec) == file_digest(spec) != digest
+
+
+def test_lru_eviction(spec: Path, tmp_path: Path) -> None:
+    size = spec.stat().st_size
+    other = tmp_path / "other.yml"
+    other.write_text(
+        spec.read_text(encoding="utf-8").replace("Petstore", "Rockstore"),
+        encoding="utf-8",
+    )
+    cache = SpecCache(max_bytes=size + 10)
+    stats: Counter[str] = Counter()
+    cache.load(spec, stats)
+    cache.load(other, stats)
+    cache.load(spec, stats)
+    assert stats == Counter(misses=3)
+
+
+def test_oversized_spec_not_retained(spec: Path) -> None:
+    cache = SpecCache(max_bytes=1)
+    stats: Counter[str] = Counter()
+    cache.load(spec, stats)
+    cache.load(spec, stats)
+    assert stats == Counter(misses=2)
+
+
+def test_search_lines_persisted_on_disk(spec: Path, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, cache_dir)
+    stats: Counter[str] = Counter()
+    lines = cache.search_lines(spec, stats)
+    assert "GET /pets — List all pets" in lines
+    key = f"{DEFAULT_SEARCH_LIMITS.key}.v{SEARCH_FORMAT_VERSION}"
+    assert (cache_dir / "search" / f"{file_digest(spec)}.{key}.json").is_file()
+    assert cache.search_lines(spec, stats) is lines
+
+    fresh = SpecCache(max_bytes=10**6)
+    fresh.configure(10**6, cache_dir)
+    assert fresh.search_lines(spec, stats) == lines
+    assert stats == Counter(misses=1, hits=1, disk_hits=1)
+
+
+def test_search_lines_of_other_versions_are_ignored(
+    spec: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, tmp_path / "cache")
+    cache.search_lines(spec)
+    monkeypatch.setattr(_spec_cache, "SEARCH_FORMAT_VERSION", SEARCH_FORMAT_VERSION + 1)
+
+    fresh = SpecCache(max_bytes=10**6)
+    fresh.configure(10**6, tmp_path / "cache")
+    stats: Counter[str] = Counter()
+    fresh.search_lines(spec, stats)
+    assert stats == Counter(misses=1)
+    assert fresh.prune_disk({file_digest(spec)}, DEFAULT_SEARCH_LIMITS) == 1
+
+
+def test_search_lines_per_limits(spec: Path, tmp_path: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, tmp_path / "cache")
+    stats: Counter[str] = Counter()
+    limited = cache.search_lines(spec, stats, SearchLimits(max_operations=1))
+    assert [line for line in limited if line.startswith("GET ")] == [
+        "GET /pets — List all pets"
+    ]
+    assert len(cache.search_lines(spec, stats)) > len(limited)
+    assert cache.search_lines(spec, stats, SearchLimits(max_operations=1)) is limited
+    assert len(list((tmp_path / "cache" / "search").iterdir())) == 2
+
+
+def test_prune_disk(spec: Path, tmp_path: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, tmp_path / "cache")
+    limited = SearchLimits(max_operations=1)
+    cache.search_lines(spec, limits=limited)
+    cache.search_lines(spec)
+    digest = file_digest(spec)
+    assert cache.prune_disk({digest, "other"}, DEFAULT_SEARCH_LIMITS) == 1
+    search = tmp_path / "cache" / "search"
+    assert [path.name for path in search.iterdir()] == [
+        f"{digest}.{DEFAULT_SEARCH_LIMITS.key}.v{SEARCH_FORMAT_VERSION}.json"
+    ]
+    assert cache.prune_disk(set(), DEFAULT_SEARCH_LIMITS) == 1
+    assert not list(search.iterdir())
+
+
+def test_add_search_lines(spec: Path, tmp_path: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, tmp_path / "cache")
+    assert not cache.has_search_lines(spec, DEFAULT_SEARCH_LIMITS)
+    cache.add_search_lines(spec, DEFAULT_SEARCH_LIMITS, ["Parsed elsewhere"])
+    assert cache.has_search_lines(spec, DEFAULT_SEARCH_LIMITS)
+    assert not cache.contains(spec)
+
+    stats: Counter[str] = Counter()
+    assert cache.search_lines(spec, stats) == ["Parsed elsewhere"]
+    assert stats == Counter(hits=1)
+
+    fresh = SpecCache(max_bytes=10**6)
+    fresh.configure(10**6, tmp_path / "cache")
+    limited = SearchLimits(max_operations=1)
+    fresh.search_lines(spec, limits=limited)
+    # Only the search lines on disk are known to a new process.
+    fresh.clear()
+    assert fresh.has_search_lines(spec, limited)
+    assert not fresh.has_search_lines(spec, DEFAULT_SEARCH_LIMITS)
+
+
+def test_large_json_spec_is_streamed(spec: Path, tmp_path: Path) -> None:
+    json_spec = tmp_path / "openapi.json"
+    json_spec.write_text(json.dumps(SpecCache(10**6).load(spec)), encoding="utf-8")
+    cache = SpecCache(max_bytes=10**6, stream_min_bytes=1)
+    stats: Counter[str] = Counter()
+
+    assert cache.search_lines(json_spec, stats) == cache.search_lines(spec, stats)
+    assert stats == Counter(misses=2)
+    # Only the search fields were read, the spec itself is parsed when needed.
+    assert not cache.contains(json_spec)
+    assert cache.contains(spec)
+
+
+def test_corrupt_disk_entry_is_ignored(spec: Path, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    key = f"{DEFAULT_SEARCH_LIMITS.key}.v{SEARCH_FORMAT_VERSION}"
+    entry = cache_dir / "search" / f"{file_digest(spec)}.{key}.json"
+    entry.parent.mkdir(parents=True)
+    entry.write_text("{not json", encoding="utf-8")
+    cache = SpecCache(max_bytes=10**6)
+    cache.configure(10**6, cache_dir)
+    stats: Counter[str] = Counter()
+    assert "Schema Pet" in cache.search_lines(spec, stats)
+    assert stats == Counter(misses=1)
+
+
+def test_clear(spec: Path) -> None:
+    cache = SpecCache(max_bytes=10**6)
+    stats: Counter[str] = Counter()
+    cache.load(spec, stats)
+    cache.clear()
+    os.utime(spec)
+    cache.load(spec, stats)
+    assert stats == Counter(misses=2)
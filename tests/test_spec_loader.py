@@ -0,0 +1,104 @@
+"""Tests for the spec loader backends."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from swagger_plugin_for_sphinx import _spec_loader, register_json_backend
+from swagger_plugin_for_sphinx._spec_loader import (
+    detect_file_format,
+    detect_format,
+    json_backend_names,
+    parse_spec,
+    yaml_loader,
+)
+
+
+@pytest.fixture
+def restore_backends() -> Iterator[None]:
+    backends = dict(_spec_loader._JSON_BACKENDS)
+    yield
+    _spec_loader._JSON_BACKENDS.clear()
+    _spec_loader._JSON_BACKENDS.update(backends)
+
+
+@pytest.mark.parametrize(
+    "name,raw,expected",
+    [
+        ("spec.json", b"a: b", "json"),
+        ("spec.JSON", b"a: b", "json"),
+        ("spec.yaml", b"{}", "yaml"),
+        ("spec.yml", b"{}", "yaml"),
+        ("spec", b"  \n{}", "json"),
+        ("spec.txt", b"\xef\xbb\xbf[]", "json"),
+        ("spec", b"openapi: 3.0.0", "yaml"),
+        ("spec", b"", "yaml"),
+    ],
+)
+def test_detect_format(name: str, raw: bytes, expected: str) -> None:
+    assert detect_format(Path(name), raw) == expected
+
+
+def test_detect_file_format(tmp_path: Path) -> None:
+    spec = tmp_path / "spec"
+    spec.write_bytes(b" " * 100 + b'{"openapi": "3.0.0"}')
+    assert detect_file_format(spec) == "json"
+    assert detect_file_format(tmp_path / "missing.yaml") == "yaml"
+
+
+def test_yaml_loader_prefers_libyaml() -> None:
+    if yaml.__with_libyaml__:
+        assert yaml_loader() is yaml.CSafeLoader
+    else:
+        assert yaml_loader() is yaml.SafeLoader
+
+
+def test_yaml_is_not_parsed_as_json(restore_backends: None) -> None:
+    def fail(_raw: bytes) -> Any:
+        raise AssertionError("JSON parser called for YAML")
+
+    register_json_backend("fail", fail, priority=100)
+    assert parse_spec(b"a: 1", Path("spec.yaml")) == {"a": 1}
+
+
+def test_json_is_not_parsed_as_yaml(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(_raw: bytes) -> Any:
+        raise AssertionError("YAML parser called for JSON")
+
+    monkeypatch.setattr(_spec_loader, "_parse_yaml", fail)
+    assert parse_spec(b'{"a": 1}', Path("spec.json")) == {"a": 1}
+
+
+def test_fallback_to_other_format() -> None:
+    assert parse_spec(b"a: 1", Path("spec.json")) == {"a": 1}
+    assert parse_spec(b'{"a":\t1}', Path("spec.yaml")) == {"a": 1}
+    assert parse_spec(b"{a: 1}", Path("spec")) == {"a": 1}
+
+
+def test_original_error_raised() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        parse_spec(b"{", Path("spec.json"))
+    with pytest.raises(yaml.YAMLError):
+        parse_spec(b"a: [", Path("spec.yaml"))
+
+
+def test_register_json_backend(restore_backends: None) -> None:
+    calls: list[bytes] = []
+
+    def loads(raw: bytes) -> Any:
+        calls.append(raw)
+        return json.loads(raw)
+
+    register_json_backend("custom", loads, priority=100)
+    assert json_backend_names()[0] == "custom"
+    assert parse_spec(b"{}", Path("spec.json")) == {}
+    assert calls == [b"{}"]
+
+    assert parse_spec(b"{}", Path("spec.json"), json_backend="json") == {}
+    assert len(calls) == 1
@@ -0,0 +1,81 @@
+"""Tests for splitting specs by tag."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from swagger_plugin_for_sphinx._tag_shards import split_by_tag
+
+
+def _operation(tags: list[str] | None, schema: str) -> dict[str, Any]:
+    operation: dict[str, Any] = {
+        "responses": {"200": {"$ref": f"#/components/responses/{schema}"}}
+    }
+    if tags is not None:
+        operation["tags"] = tags
+    return operation
+
+
+def test_split_by_tag() -> None:
+    spec: dict[str, Any] = {
+        "openapi": "3.1.0",
+        "info": {"title": "Store", "version": "1"},
+        "tags": [{"name": "users"}, {"name": "pet store"}, {"name": "unused"}],
+        "security": [{"key": []}],
+        "paths": {
+            "/pets": {
+                "parameters": [{"name": "q", "in": "query"}],
+                "get": _operation(["pet store"], "Pet"),
+                "post": _operation(["pet store", "users"], "User"),
+            },
+            "/users": {"get": _operation(["users"], "User")},
+            "/health": {"get": _operation(None, "Pet")},
+        },
+        "webhooks": {"event": {"post": _operation(["users"], "User")}},
+        "components": {
+            "responses": {
+                "Pet": {"description": "A pet"},
+                "User": {"description": "A user"},
+            },
+            "securitySchemes": {"key": {"type": "apiKey"}},
+        },
+    }
+    shards = split_by_tag(spec)
+
+    assert [(shard.tag, shard.slug) for shard in shards] == [
+        ("users", "users"),
+        ("pet store", "pet-store"),
+        ("default", "default"),
+    ]
+    users, pets, default = (shard.spec for shard in shards)
+    assert list(users) == ["openapi", "info", "tags", "security", "paths", "components"]
+    assert users["tags"] == [{"name": "users"}]
+    assert users["paths"] == {
+        "/pets": {
+            "parameters": [{"name": "q", "in": "query"}],
+            "post": spec["paths"]["/pets"]["post"],
+        },
+        "/users": spec["paths"]["/users"],
+    }
+    assert users["components"] == {
+        "responses": {"User": {"description": "A user"}},
+        "securitySchemes": {"key": {"type": "apiKey"}},
+    }
+    assert list(pets["paths"]["/pets"]) == ["parameters", "get", "post"]
+    assert set(pets["components"]["responses"]) == {"Pet", "User"}
+    assert "tags" not in default
+    assert default["paths"] == {"/health": spec["paths"]["/health"]}
+
+
+def test_split_by_tag_unique_slugs() -> None:
+    spec = {
+        "paths": {
+            "/a": {"get": _operation(["A b"], "X"), "put": _operation(["a-b"], "X")},
+            "/b": {"get": _operation(["!!"], "X")},
+        }
+    }
+    assert [shard.slug for shard in split_by_tag(spec)] == ["a-b", "a-b-2", "tag"]
+
+
+def test_split_without_paths() -> None:
+    assert not split_by_tag({"openapi": "3.0.3"})
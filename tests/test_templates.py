@@ -0,0 +1,41 @@
+"""Tests for the shared template environment."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+from sphinx.application import Sphinx
+
+from swagger_plugin_for_sphinx._templates import OVERRIDE_FOLDER, get_template
+
+
+def _app(tmp_path: Path, templates_path: list[str]) -> Sphinx:
+    return cast(
+        Sphinx,
+        SimpleNamespace(
+            confdir=tmp_path,
+            doctreedir=tmp_path / ".doctrees",
+            config=SimpleNamespace(templates_path=templates_path),
+        ),
+    )
+
+
+def test_template_compiled_once(tmp_path: Path) -> None:
+    app = _app(tmp_path, [])
+    template = get_template(app, "loader_template.j2")
+    assert get_template(app, "loader_template.j2") is template
+    assert list((tmp_path / ".doctrees" / "swagger_plugin" / "jinja").iterdir())
+
+
+def test_template_override(tmp_path: Path) -> None:
+    folder = tmp_path / "_templates" / OVERRIDE_FOLDER
+    folder.mkdir(parents=True)
+    (folder / "loader_template.j2").write_text(
+        "custom {{ defaults }}", encoding="utf-8"
+    )
+
+    app = _app(tmp_path, ["_templates"])
+    assert get_template(app, "loader_template.j2").render(defaults={}) == "custom {}"
+    assert "<html>" in get_template(app, "full_page_template.j2").render(options={})
@@ -0,0 +1,147 @@
+"""Tests for removing unused parts of specs before they are published."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from swagger_plugin_for_sphinx._tree_shake import ShakeOptions, shake_spec
+
+
+def _spec() -> dict[str, Any]:
+    return {
+        "openapi": "3.0.3",
+        "x-internal-owner": "team",
+        "paths": {
+            "/pets": {
+                "get": {
+                    "x-codegen-name": "list",
+                    "responses": {
+                        200: {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Pet"},
+                                    "example": {"name": "x" * 100},
+                                    "examples": {
+                                        "small": {"value": {"name": "Tom"}},
+                                        "large": {"value": {"name": "x" * 100}},
+                                        "shared": {"$ref": "#/components/examples/Pet"},
+                                    },
+                                }
+                            }
+                        }
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "properties": {
+                        "x-codegen-id": {"type": "string"},
+                        "example": {"type": "string", "default": {"x-codegen-a": 1}},
+                    },
+                    "examples": [{"name": "Tom"}, {"name": "x" * 100}],
+                },
+                "Unused": {"type": "object"},
+            },
+            "examples": {"Pet": {"value": {"name": "x" * 100}}},
+            "x-codegen-settings": {},
+        },
+    }
+
+
+def test_shake_spec() -> None:
+    spec = _spec()
+    options = ShakeOptions(
+        prune=True, extensions=("x-codegen-*",), max_example_bytes=50
+    )
+    shaken = shake_spec(spec, options)
+    assert (shaken.components, shaken.extensions, shaken.examples) == (1, 2, 5)
+    assert spec == _spec()
+
+    expected = _spec()
+    del expected["paths"]["/pets"]["get"]["x-codegen-name"]
+    media_type = expected["paths"]["/pets"]["get"]["responses"][200]["content"][
+        "application/json"
+    ]
+    del media_type["example"]
+    del media_type["examples"]["large"]
+    del media_type["examples"]["shared"]
+    components = expected["components"]
+    del components["schemas"]["Unused"]
+    del components["examples"]
+    del components["x-codegen-settings"]
+    components["schemas"]["Pet"]["examples"] = [{"name": "Tom"}]
+    assert shaken.spec == expected
+
+
+def test_shake_spec_disabled() -> None:
+    spec = _spec()
+    assert not ShakeOptions().enabled
+    assert shake_spec(spec, ShakeOptions()).spec is spec
+
+
+def test_shake_spec_removes_empty_examples() -> None:
+    spec = {"schema": {"examples": [{"name": "x" * 100}]}}
+    shaken = shake_spec(spec, ShakeOptions(max_example_bytes=10))
+    assert shaken.spec == {"schema": {}}
+    assert spec["schema"]["examples"]
+
+
+def test_shake_spec_keeps_names() -> None:
+    spec = {
+        "paths": {
+            "/pets": {
+                "get": {
+                    "security": [{"x-codegen-key": []}],
+                    "responses": {
+                        "200": {
+                            "headers": {"x-codegen-limit": {"schema": {}}},
+                            "links": {"x-codegen-next": {"operationId": "next"}},
+                        }
+                    },
+                }
+            }
+        },
+        "components": {"securitySchemes": {"x-codegen-key": {"type": "apiKey"}}},
+    }
+    shaken = shake_spec(spec, ShakeOptions(extensions=("x-codegen-*",)))
+    assert (shaken.extensions, shaken.spec) == (0, spec)
+
+
+def test_shake_spec_descends_into_default_response() -> None:
+    schema = {"default": {"x-codegen-name": "x" * 100}}
+    response = {"x-codegen-name": "error", "example": "x" * 100, "schema": schema}
+    spec = {"paths": {"/pets": {"get": {"responses": {"default": response}}}}}
+    shaken = shake_spec(
+        spec, ShakeOptions(extensions=("x-codegen-*",), max_example_bytes=10)
+    )
+    assert (shaken.extensions, shaken.examples) == (1, 1)
+    expected = {
+        "paths": {"/pets": {"get": {"responses": {"default": {"schema": schema}}}}}
+    }
+    assert shaken.spec == expected
+
+
+def test_shake_spec_removes_component_examples() -> None:
+    spec = {
+        "components": {
+            "examples": {
+                "Big": {"summary": "big", "value": {"name": "x" * 100}},
+                "Small": {"value": {"name": "Tom"}, "x-codegen-name": "small"},
+                "External": {"externalValue": "https://example.com/pet.json"},
+            }
+        }
+    }
+    shaken = shake_spec(
+        spec, ShakeOptions(extensions=("x-codegen-*",), max_example_bytes=50)
+    )
+    assert (shaken.extensions, shaken.examples) == (1, 1)
+    assert shaken.spec == {
+        "components": {
+            "examples": {
+                "Small": {"value": {"name": "Tom"}},
+                "External": spec["components"]["examples"]["External"],
+            }
+        }
+    }